@@ -21,6 +21,7 @@ from typing import Optional
 import aiohttp
 import pyrogram
 
+from anjani import util
 from anjani.util.config import Config
 
 from .command_dispatcher import CommandDispatcher
@@ -45,6 +46,15 @@ class Anjani(TelegramBot, DatabaseProvider, PluginExtender, CommandDispatcher, E
         self.loop = asyncio.get_event_loop()
         self.stopping = False
 
+        util.async_helper.setup_pools(
+            {
+                "db": config.DB_POOL_SIZE,
+                "cpu": config.CPU_POOL_SIZE,
+                "blocking-http": config.HTTP_POOL_SIZE,
+                "stream": config.STREAM_POOL_SIZE,
+            }
+        )
+
         # Initialize mixins
         super().__init__()
 
@@ -72,12 +82,14 @@ class Anjani(TelegramBot, DatabaseProvider, PluginExtender, CommandDispatcher, E
 
         self.log.info("Stopping")
         if self.loaded:
+            await self._scheduler.stop()
             await self.dispatch_event("stop")
             if self.client.is_connected:
                 await self.client.stop()
 
         await self.http.close()
         await self.db.close()
+        util.async_helper.shutdown_pools()
 
         self.log.info("Running post-stop hooks")
         if self.loaded:
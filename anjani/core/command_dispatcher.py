@@ -166,7 +166,7 @@ class CommandDispatcher(MixinBase):
                             if not await cmd.filters(client, message):
                                 return False
                         else:
-                            if not await util.run_sync(cmd.filters, client, message):
+                            if not await util.run_sync(cmd.filters, client, message, pool="cpu"):
                                 return False
 
                     message.command = parts
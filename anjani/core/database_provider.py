@@ -29,14 +29,15 @@ class DatabaseProvider(MixinBase):
     db: util.db.AsyncDatabase
 
     def __init__(self: "Anjani", **kwargs: Any) -> None:
+        native = self.config.is_flag_active("native_db_driver")
         if sys.platform == "win32":
             import certifi
 
             client = util.db.AsyncClient(
-                self.config.DB_URI, connect=False, tlsCAFile=certifi.where()
+                self.config.DB_URI, connect=False, native=native, tlsCAFile=certifi.where()
             )
         else:
-            client = util.db.AsyncClient(self.config.DB_URI, connect=False)
+            client = util.db.AsyncClient(self.config.DB_URI, connect=False, native=native)
 
         self.db = client.get_database("AnjaniBot")
 
@@ -19,7 +19,19 @@ import asyncio
 import bisect
 from datetime import datetime
 from hashlib import sha256
-from typing import TYPE_CHECKING, Any, MutableMapping, MutableSequence, Optional, Tuple
+from time import perf_counter
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Awaitable,
+    Callable,
+    List,
+    MutableMapping,
+    MutableSequence,
+    Optional,
+    Sequence,
+    Tuple,
+)
 
 from pyrogram import raw
 from pyrogram.filters import Filter
@@ -42,6 +54,8 @@ EventType = (
     InlineQuery,
     Message,
 )
+FilterFunc = Callable[[Any, Any], Awaitable[bool]]
+Handler = Tuple[Listener, ListenerFunc, Optional[FilterFunc]]
 
 
 def _get_event_data(event: Any) -> MutableMapping[str, Any]:
@@ -75,13 +89,67 @@ def _unpack_args(args: Tuple[Any, ...]) -> str:
     return ", ".join([str(arg) for arg in args])
 
 
+class DispatchPlan:
+    """Precompiled listeners of a single event.
+
+    Built once whenever the listeners of an event change, so dispatching
+    doesn't need to look up the filters and functions of every listener again.
+    Listeners are grouped into bands by priority: the sequential listeners of
+    a priority get a band each, followed by a single band of all its concurrent
+    listeners, which run together.
+    """
+
+    __slots__ = ("bands", "filtered", "_index")
+
+    bands: Tuple[Tuple[Handler, ...], ...]
+    filtered: bool
+    _index: Optional[int]
+
+    def __init__(self, listeners: Sequence[Listener]) -> None:
+        bands: List[List[Handler]] = []
+        concurrent: List[Handler] = []
+        for idx, lst in enumerate(listeners):
+            handler = (lst, lst.func, lst.filters.__call__ if lst.filters else None)
+            if lst.concurrent:
+                concurrent.append(handler)
+            else:
+                bands.append([handler])
+
+            # Listeners are sorted, so this is the last one of its priority
+            if concurrent and (
+                idx + 1 == len(listeners) or listeners[idx + 1].priority != lst.priority
+            ):
+                bands.append(concurrent)
+                concurrent = []
+
+        self.bands = tuple(tuple(band) for band in bands)
+        self.filtered = any(lst.filters for lst in listeners)
+        self._index = None
+
+    def resolve_index(self, args: Tuple[Any, ...]) -> Optional[int]:
+        """Return the position of the Telegram event in the arguments used by the filters"""
+        index = self._index
+        # Events always have the same signature, so we only need to look for it once
+        if index is not None and index < len(args) and isinstance(args[index], EventType):
+            return index
+
+        for idx, arg in enumerate(args):
+            if isinstance(arg, EventType):
+                self._index = idx
+                return idx
+
+        return None
+
+
 class EventDispatcher(MixinBase):
     # Initialized during instantiation
     listeners: MutableMapping[str, MutableSequence[Listener]]
+    _dispatch_plans: MutableMapping[str, DispatchPlan]
 
     def __init__(self: "Anjani", **kwargs: Any) -> None:
         # Initialize listener map
         self.listeners = {}
+        self._dispatch_plans = {}
 
         # Propagate initialization to other mixins
         super().__init__(**kwargs)
@@ -94,6 +162,7 @@ class EventDispatcher(MixinBase):
         *,
         priority: int = 100,
         filters: Optional[Filter] = None,
+        concurrent: bool = False,
     ) -> None:
         if event in {"load", "start", "started", "stop", "stopped"} and filters is not None:
             self.log.warning("Built-in Listener can't be use with filters. Removing...")
@@ -107,13 +176,14 @@ class EventDispatcher(MixinBase):
         if filters:
             self.log.debug("Registering filter '%s' into '%s'", type(filters).__name__, event)
 
-        listener = Listener(event, func, plug, priority, filters)
+        listener = Listener(event, func, plug, priority, filters, concurrent)
 
         if event in self.listeners:
             bisect.insort(self.listeners[event], listener)
         else:
             self.listeners[event] = [listener]
 
+        self._compile_listeners(event)
         self.update_plugin_events()
 
     def unregister_listener(self: "Anjani", listener: Listener) -> None:
@@ -122,8 +192,16 @@ class EventDispatcher(MixinBase):
         if not self.listeners[listener.event]:
             del self.listeners[listener.event]
 
+        self._compile_listeners(listener.event)
         self.update_plugin_events()
 
+    def _compile_listeners(self: "Anjani", event: str) -> None:
+        listeners = self.listeners.get(event)
+        if listeners:
+            self._dispatch_plans[event] = DispatchPlan(listeners)
+        else:
+            self._dispatch_plans.pop(event, None)
+
     def register_listeners(self: "Anjani", plug: plugin.Plugin) -> None:
         for event, func in util.misc.find_prefixed_funcs(plug, "on_"):
             done = True
@@ -134,6 +212,7 @@ class EventDispatcher(MixinBase):
                     func,
                     priority=getattr(func, "_listener_priority", 100),
                     filters=getattr(func, "_listener_filters", None),
+                    concurrent=getattr(func, "_listener_concurrent", False),
                 )
                 done = True
             finally:
@@ -150,99 +229,122 @@ class EventDispatcher(MixinBase):
         self: "Anjani",
         event: str,
         *args: Any,
+        max_priority: Optional[int] = None,
         **kwargs: Any,
     ) -> Optional[Tuple[Any, ...]]:
-        results = []
+        """Dispatch an event to its listeners.
 
+        If ``max_priority`` is given, only listeners with a lower priority value are run.
+        """
         try:
-            listeners = self.listeners[event]
+            plan = self._dispatch_plans[event]
         except KeyError:
             return None
 
-        if not listeners:
-            return None
-
         self.log.debug("Dispatching event '%s' with data %s", event, args)
         EventCount.labels(event).inc()
-        with EventLatencySecond.labels(event).time():
-            match = None
-            index = None
-            is_tg_event = False
-            for lst in listeners:
-                if lst.filters:
-                    for idx, arg in enumerate(args):
-                        is_tg_event = isinstance(arg, EventType)
-                        if is_tg_event:
-                            if not await lst.filters(self.client, arg):
-                                continue
-
-                            match = arg.matches
-                            index = idx
-                            break
-
-                        self.log.error(f"'{type(arg)}' can't be used with filters.")
-                    else:
+
+        index = plan.resolve_index(args) if plan.filtered else None
+        results = []
+        start = None
+        for band in plan.bands:
+            # Bands are sorted by priority, so the rest won't run either
+            if max_priority is not None and band[0][0].priority >= max_priority:
+                break
+
+            matched = []
+            for lst, func, check in band:
+                if check is not None:
+                    if index is None:
+                        self.log.error(f"'{_unpack_args(args)}' can't be used with filters.")
                         continue
 
-                if match and index is not None:
-                    args[index].matches = match
+                    if not await check(self.client, args[index]):
+                        continue
+
+                matched.append((lst, func))
+
+            if not matched:
+                continue
 
-                result = None
+            # Only time the event once a listener actually runs
+            if start is None:
+                start = perf_counter()
+
+            if len(matched) == 1:
+                lst, func = matched[0]
                 try:
-                    result = await lst.func(*args, **kwargs)
-                except KeyError:
-                    continue
-                except StopPropagation:
-                    break
+                    outcomes = [await func(*args, **kwargs)]
                 except Exception as err:  # skipcq: PYL-W0703
-                    UnhandledError.labels("command").inc()
-                    dispatcher_error = EventDispatchError(
-                        f"raised from {type(err).__name__}: {str(err)}"
-                    ).with_traceback(err.__traceback__)
-                    if is_tg_event and args[0] is not None:
-                        data = _get_event_data(args[0])
-                        self.log.error(
-                            "Error dispatching event '%s' on %s\n"
-                            "  Data:\n"
-                            "    • Chat    -> %s (%d)\n"
-                            "    • Invoker -> %s (%d)\n"
-                            "    • Input   -> %s",
-                            event,
-                            lst.func.__qualname__,
-                            data.get("chat_title", "Unknown"),
-                            data.get("chat_id", -1),
-                            data.get("user_name", "Unknown"),
-                            data.get("user_id", -1),
-                            data.get("input"),
-                            exc_info=dispatcher_error,
-                        )
-                        await self.dispatch_alert(
-                            f"Event __{event}__ on `{lst.func.__qualname__}`",
-                            dispatcher_error,
-                            data.get("chat_id"),
-                        )
-                    else:
-                        self.log.error(
-                            "Error dispatching event '%s' on %s with data\n%s",
-                            event,
-                            lst.func.__qualname__,
-                            _unpack_args(args),
-                            exc_info=dispatcher_error,
-                        )
-                        await self.dispatch_alert(
-                            f"Event __{event}__ on `{lst.func.__qualname__}`",
-                            dispatcher_error,
-                        )
+                    outcomes = [err]
+            else:
+                outcomes = await asyncio.gather(
+                    *(func(*args, **kwargs) for _, func in matched), return_exceptions=True
+                )
+
+            # StopPropagation takes effect after the whole band is done
+            stop = False
+            for (lst, _), outcome in zip(matched, outcomes):
+                if isinstance(outcome, StopPropagation):
+                    stop = True
+                elif isinstance(outcome, KeyError):
                     continue
-                finally:
-                    if result:
-                        results.append(result)
+                elif isinstance(outcome, Exception):
+                    await self._report_listener_error(event, lst, outcome, args)
+                elif isinstance(outcome, BaseException):
+                    raise outcome
+                elif outcome:
+                    results.append(outcome)
+
+            if stop:
+                break
 
-                    match = None
-                    index = None
-                    result = None
+        if start is not None:
+            EventLatencySecond.labels(event).set(perf_counter() - start)
 
-            return tuple(results)
+        return tuple(results)
+
+    async def _report_listener_error(
+        self: "Anjani", event: str, lst: Listener, err: Exception, args: Tuple[Any, ...]
+    ) -> None:
+        UnhandledError.labels("command").inc()
+        dispatcher_error = EventDispatchError(
+            f"raised from {type(err).__name__}: {str(err)}"
+        ).with_traceback(err.__traceback__)
+        if args and isinstance(args[0], EventType):
+            data = _get_event_data(args[0])
+            self.log.error(
+                "Error dispatching event '%s' on %s\n"
+                "  Data:\n"
+                "    • Chat    -> %s (%d)\n"
+                "    • Invoker -> %s (%d)\n"
+                "    • Input   -> %s",
+                event,
+                lst.func.__qualname__,
+                data.get("chat_title", "Unknown"),
+                data.get("chat_id", -1),
+                data.get("user_name", "Unknown"),
+                data.get("user_id", -1),
+                data.get("input"),
+                exc_info=dispatcher_error,
+            )
+            await self.dispatch_alert(
+                f"Event __{event}__ on `{lst.func.__qualname__}`",
+                dispatcher_error,
+                data.get("chat_id"),
+            )
+        else:
+            self.log.error(
+                "Error dispatching event '%s' on %s with data\n%s",
+                event,
+                lst.func.__qualname__,
+                _unpack_args(args),
+                exc_info=dispatcher_error,
+            )
+            await self.dispatch_alert(
+                f"Event __{event}__ on `{lst.func.__qualname__}`",
+                dispatcher_error,
+            )
 
     async def dispatch_missed_events(self: "Anjani") -> None:
         if not self.loaded or self._TelegramBot__running:
@@ -1,4 +1,4 @@
-from prometheus_client import Counter, Gauge
+from prometheus_client import Counter, Gauge, Histogram
 
 EventCount = Counter(
     "anjani_event_count",
@@ -30,3 +30,41 @@ CommandLatencySecond = Gauge(
     labelnames=["name"],
     unit="second",
 )
+
+UpdateQueueDepth = Gauge(
+    "anjani_update_queue_depth",
+    "Number of updates waiting to be dispatched",
+)
+UpdateDropCount = Counter(
+    "anjani_update_drop",
+    "Number of updates dropped from full chat queues",
+    labelnames=["type"],
+)
+UpdateShedCount = Counter(
+    "anjani_update_shed",
+    "Number of updates dispatched only to high priority listeners",
+    labelnames=["type"],
+)
+
+ExecutorQueueDepth = Gauge(
+    "anjani_executor_queue_depth",
+    "Number of calls waiting for a free thread",
+    labelnames=["pool"],
+)
+ExecutorWaitSecond = Gauge(
+    "anjani_executor_wait",
+    "Time the last call waited for a free thread",
+    labelnames=["pool"],
+    unit="second",
+)
+
+SpamPredictionBatchSize = Histogram(
+    "anjani_spam_prediction_batch_size",
+    "Number of texts sent in a single request to the spam prediction API",
+    buckets=(1, 2, 4, 8, 16, 32, 64, 128),
+)
+SpamPredictionLatencySecond = Histogram(
+    "anjani_spam_prediction_latency",
+    "Latency of the requests to the spam prediction API",
+    unit="second",
+)
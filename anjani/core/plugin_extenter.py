@@ -97,10 +97,10 @@ class PluginExtender(MixinBase):
 
     async def reload_plugin_pkg(self: "Anjani") -> None:
         self.log.info("Reloading base plugin class...")
-        await util.run_sync(importlib.reload, plugin)
+        await util.run_sync(importlib.reload, plugin, pool="cpu")
 
         self.log.info("Reloading master plugin...")
-        await util.run_sync(importlib.reload, plugins)
+        await util.run_sync(importlib.reload, plugins, pool="cpu")
 
         self.log.info("Reloading custom master module...")
-        await util.run_sync(importlib.reload, custom_plugins)
+        await util.run_sync(importlib.reload, custom_plugins, pool="cpu")
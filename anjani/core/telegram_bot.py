@@ -49,6 +49,7 @@ from anjani.util.cache_limiter import CacheLimiter
 
 from .anjani_mixin_base import MixinBase
 from .sqlite_storage import SQLiteStorage
+from .update_scheduler import UpdateScheduler
 
 if TYPE_CHECKING:
     from .anjani_bot import Anjani
@@ -64,6 +65,7 @@ class TelegramBot(MixinBase):
     __running: bool
     _limiter: CacheLimiter
     _plugin_event_handlers: MutableMapping[str, Tuple[TgEventHandler, int]]
+    _scheduler: UpdateScheduler
 
     loaded: bool
     staff: Set[int]
@@ -132,6 +134,16 @@ class TelegramBot(MixinBase):
         self.log.info("Starting")
         await self.init_client()
 
+        self._scheduler = UpdateScheduler(
+            self.dispatch_event,
+            workers=self.config.WORKERS,
+            queue_size=self.config.UPDATE_QUEUE_SIZE,
+            chat_concurrency=self.config.UPDATE_CHAT_CONCURRENCY,
+            policy=self.config.UPDATE_OVERLOAD_POLICY,
+            shed_priority=self.config.UPDATE_SHED_PRIORITY,
+        )
+        self._scheduler.start()
+
         # Register core command handler
         self.client.add_handler(MessageHandler(self.on_command, self.command_predicate()), -1)
 
@@ -157,6 +169,7 @@ class TelegramBot(MixinBase):
             self.user = user
             # noinspection PyTypeChecker
             self.uid = user.id
+            util.tg.MEMBERS.bot_id = user.id
 
         self.staff.add(self.owner)
         self.devs.add(self.owner)
@@ -178,7 +191,7 @@ class TelegramBot(MixinBase):
         # Load text from language file
         async for language_file in get_lang_file():
             self.languages[language_file.stem] = await util.run_sync(
-                full_load, await language_file.read_text()
+                full_load, await language_file.read_text(), pool="cpu"
             )
 
         # Record start time and dispatch start event
@@ -283,7 +296,7 @@ class TelegramBot(MixinBase):
                 async def event_handler(
                     client: Client, event: EventType  # skipcq: PYL-W0613
                 ) -> None:
-                    await self.dispatch_event(name, event)
+                    self._scheduler.put(name, event)
 
                 if filters is not None:
                     handler_info = (event_type(event_handler, filters), group)
@@ -397,7 +410,6 @@ class TelegramBot(MixinBase):
         """Wrapper for `Client.get_chat` with a TTL cache."""
         return await self.client.get_chat(chat_id)
 
-    @cached(ttl=60)
     async def get_chat_member(self: "Anjani", chat_id: int, user_id: int) -> ChatMember:
-        """Wrapper for `Client.get_chat_member` with a TTL cache."""
-        return await self.client.get_chat_member(chat_id, user_id)
+        """Wrapper for `Client.get_chat_member` with the shared member cache."""
+        return await util.tg.get_chat_member(self.client, chat_id, user_id)
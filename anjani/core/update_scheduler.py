@@ -0,0 +1,220 @@
+"""Anjani update scheduler"""
+# Copyright (C) 2020 - 2023  UserbotIndo Team, <https://github.com/userbotindo.git>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import asyncio
+import logging
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, List, MutableMapping, Optional, Set, Tuple
+
+from pyrogram.types import CallbackQuery, ChatMemberUpdated, InlineQuery, Message
+
+from .metrics import UpdateDropCount, UpdateQueueDepth, UpdateShedCount
+
+Dispatcher = Callable[..., Awaitable[Any]]
+Update = Tuple[str, Any]
+
+POLICIES = {"drop", "shed"}
+
+
+def _get_chat_id(update: Any) -> Optional[int]:
+    if isinstance(update, (Message, ChatMemberUpdated)):
+        return update.chat.id if update.chat else None
+    if isinstance(update, CallbackQuery):
+        if update.message:
+            return update.message.chat.id
+
+        return update.from_user.id
+    if isinstance(update, InlineQuery):
+        return update.from_user.id
+
+    return None
+
+
+def _is_droppable(update: Update) -> bool:
+    """Plain messages can be dropped, anything else is an interaction with the bot"""
+    name, event = update
+    if name != "message":
+        return False
+
+    return not (event.text and event.text.startswith("/"))
+
+
+class UpdateScheduler:
+    """Per-chat update queues serviced round-robin across chats.
+
+    Each chat has its own queue and chats take turns to get an update
+    dispatched, so a flooded chat can't starve the others. Up to
+    ``chat_concurrency`` plain messages of a chat are dispatched at once,
+    since most of their time goes to waiting on Telegram and the spam
+    services. Anything else, like commands, runs alone so it's still
+    handled in order with the messages around it.
+
+    Once a chat has ``queue_size`` updates queued the overload policy kicks in:
+
+    - ``shed`` (the default): nothing is dropped, but while the backlog of the
+      chat is over half of ``queue_size`` its updates are dispatched only to
+      listeners with a priority lower than ``shed_priority``. Enforcement
+      listeners, the federation bans, SpamShield, SpamPredict and Lockings,
+      sit below the default so every message is still checked.
+    - ``drop``: the oldest plain message is dropped before any listener sees
+      it, keeping the memory of a flooded chat bounded.
+    """
+
+    dispatch: Dispatcher
+    workers: int
+    queue_size: int
+    chat_concurrency: int
+    policy: str
+    shed_priority: int
+    log: logging.Logger
+
+    _queues: MutableMapping[Optional[int], Deque[Update]]
+    # Number of updates of each chat being dispatched
+    _running: MutableMapping[Optional[int], int]
+    # Chats dispatching an update that has to run alone
+    _exclusive: Set[Optional[int]]
+    # Chats waiting in _ready for a worker
+    _scheduled: Set[Optional[int]]
+    _ready: "asyncio.Queue[Optional[int]]"
+    _tasks: List[asyncio.Task[None]]
+
+    def __init__(
+        self,
+        dispatch: Dispatcher,
+        *,
+        workers: int,
+        queue_size: int = 100,
+        chat_concurrency: int = 4,
+        policy: str = "shed",
+        shed_priority: int = 100,
+    ) -> None:
+        if policy not in POLICIES:
+            raise ValueError(f"Unknown overload policy '{policy}'")
+
+        self.dispatch = dispatch
+        self.workers = workers
+        self.queue_size = max(1, queue_size)
+        self.chat_concurrency = max(1, chat_concurrency)
+        self.policy = policy
+        self.shed_priority = shed_priority
+        self.log = logging.getLogger("scheduler")
+
+        self._queues = {}
+        self._running = {}
+        self._exclusive = set()
+        self._scheduled = set()
+        self._tasks = []
+
+    def __len__(self) -> int:
+        return sum(len(queue) for queue in self._queues.values())
+
+    def start(self) -> None:
+        self._ready = asyncio.Queue()
+        loop = asyncio.get_event_loop()
+        self._tasks = [loop.create_task(self._worker()) for _ in range(self.workers)]
+
+    async def stop(self) -> None:
+        """Stop all workers, pending updates are discarded"""
+        for task in self._tasks:
+            task.cancel()
+
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks.clear()
+        self._queues.clear()
+        self._running.clear()
+        self._exclusive.clear()
+        self._scheduled.clear()
+        UpdateQueueDepth.set(0)
+
+    def put(self, name: str, event: Any) -> None:
+        chat_id = _get_chat_id(event)
+        update = (name, event)
+        try:
+            queue = self._queues[chat_id]
+        except KeyError:
+            queue = self._queues[chat_id] = deque()
+
+        if self.policy == "drop" and len(queue) >= self.queue_size:
+            dropped = self._drop(queue, update)
+            UpdateDropCount.labels(dropped[0]).inc()
+            if dropped is update:
+                return
+        else:
+            UpdateQueueDepth.inc()
+
+        queue.append(update)
+        self._schedule(chat_id)
+
+    def _schedule(self, chat_id: Optional[int]) -> None:
+        """Line the chat up for a worker if its next update can start"""
+        queue = self._queues.get(chat_id)
+        if not queue or chat_id in self._scheduled or chat_id in self._exclusive:
+            return
+
+        running = self._running.get(chat_id, 0)
+        if running and (running >= self.chat_concurrency or not _is_droppable(queue[0])):
+            return
+
+        self._scheduled.add(chat_id)
+        self._ready.put_nowait(chat_id)
+
+    @staticmethod
+    def _drop(queue: Deque[Update], update: Update) -> Update:
+        """Make room for the given update, returning the dropped one"""
+        for queued in queue:
+            if _is_droppable(queued):
+                queue.remove(queued)
+                return queued
+
+        if _is_droppable(update):
+            return update
+
+        # Nothing but interactions, the oldest one is the least relevant
+        return queue.popleft()
+
+    async def _worker(self) -> None:
+        while True:
+            chat_id = await self._ready.get()
+            self._scheduled.discard(chat_id)
+            queue = self._queues[chat_id]
+            update = queue.popleft()
+            UpdateQueueDepth.dec()
+
+            name, event = update
+            kwargs = {}
+            if self.policy == "shed" and len(queue) >= self.queue_size // 2:
+                UpdateShedCount.labels(name).inc()
+                kwargs["max_priority"] = self.shed_priority
+
+            self._running[chat_id] = self._running.get(chat_id, 0) + 1
+            if not _is_droppable(update):
+                self._exclusive.add(chat_id)
+            # Go to the back of the line so other chats get their turn
+            self._schedule(chat_id)
+
+            try:
+                await self.dispatch(name, event, **kwargs)
+            except Exception as e:  # skipcq: PYL-W0703
+                self.log.error("Error dispatching '%s' update", name, exc_info=e)
+            finally:
+                self._running[chat_id] -= 1
+                if not self._running[chat_id]:
+                    del self._running[chat_id]
+                    self._exclusive.discard(chat_id)
+                    if not queue:
+                        del self._queues[chat_id]
+
+                self._schedule(chat_id)
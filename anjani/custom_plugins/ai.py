@@ -70,7 +70,7 @@ class aiPlugin(plugin.Plugin):
         headers = {"Authorization": f"Bearer {api_token}"}
         
         try:
-            response = requests.post(f"{API_BASE_URL}{model}", headers=headers, json=input_data)
+            response = await util.run_sync(requests.post, f"{API_BASE_URL}{model}", headers=headers, json=input_data, pool="blocking-http")
             response.raise_for_status()  # Check for HTTP request errors
             output = response.json()
             
@@ -15,10 +15,9 @@ from pyrogram.enums.chat_action import ChatAction
 
 from .clast import create_album_chart
 
-def create_custom_image(track_picture_url, upfp, track_name, artist_name):
-    # Fetch the image from the URL
-    response = requests.get(track_picture_url)
-    music_cover = Image.open(BytesIO(response.content))
+def create_custom_image(track_picture, upfp, track_name, artist_name):
+    # Open the fetched music cover
+    music_cover = Image.open(BytesIO(track_picture))
 
     # Open the profile picture (pfp) image and resize it as circular
     #pfp = Image.open('/app/anjani/custom_plugins/pfp.jpg')
@@ -261,7 +260,7 @@ class LastfmPlugin(plugin.Plugin):
 
     async def track_playcount(self, username: str, artist: str, title: str) -> int:
         url = f"https://ws.audioscrobbler.com/2.0/?method=track.getinfo&user={username}&artist={urllib.parse.quote(artist)}&track={urllib.parse.quote(title)}&api_key={self.bot.config.LASTFM_API_KEY}&format=json"
-        response = requests.get(url)
+        response = await util.run_sync(requests.get, url, pool="blocking-http")
         data = json.loads(response.text)
         try:
             play_count = int(data["track"]["userplaycount"])
@@ -300,7 +299,7 @@ class LastfmPlugin(plugin.Plugin):
         lastfm_api_key = self.bot.config.LASTFM_API_KEY
 
         url = f"https://ws.audioscrobbler.com/2.0/?method=user.getinfo&user={lastfm_username}&api_key={lastfm_api_key}&format=json"
-        response = requests.get(url)
+        response = await util.run_sync(requests.get, url, pool="blocking-http")
         data = json.loads(response.text)
 
         if "error" in data:
@@ -338,7 +337,7 @@ class LastfmPlugin(plugin.Plugin):
         lastfm_api_key = self.bot.config.LASTFM_API_KEY
 
         url_recent_tracks = f"https://ws.audioscrobbler.com/2.0/?method=user.getrecenttracks&user={lastfm_username}&api_key={lastfm_api_key}&format=json&limit=1"
-        response_recent_tracks = requests.get(url_recent_tracks)
+        response_recent_tracks = await util.run_sync(requests.get, url_recent_tracks, pool="blocking-http")
         data_recent_tracks = json.loads(response_recent_tracks.text)
 
         if "error" in data_recent_tracks:
@@ -353,7 +352,7 @@ class LastfmPlugin(plugin.Plugin):
 
         # Fetching track info including the image and tags
         url_track_info = f"https://ws.audioscrobbler.com/2.0/?method=track.getInfo&api_key={lastfm_api_key}&artist={urllib.parse.quote(artist)}&track={urllib.parse.quote(title)}&format=json"
-        response_track_info = requests.get(url_track_info)
+        response_track_info = await util.run_sync(requests.get, url_track_info, pool="blocking-http")
         data_track_info = json.loads(response_track_info.text)
 
         # Extracting the track's image URL if available
@@ -399,7 +398,9 @@ class LastfmPlugin(plugin.Plugin):
             else:
                 upfp = '/app/anjani/custom_plugins/pfp.jpg'
             # Generate a custom image using create_custom_image
-            custom_image = create_custom_image(track_picture_url=track_image_url, upfp=upfp, track_name=title, artist_name=artist)
+            # Fetch the cover over http, then draw on the cpu pool
+            cover = await util.run_sync(requests.get, track_image_url, pool="blocking-http")
+            custom_image = await util.run_sync(create_custom_image, track_picture=cover.content, upfp=upfp, track_name=title, artist_name=artist, pool="cpu")
             await ctx.respond(message, photo=custom_image, reply_markup=keyboard, parse_mode=ParseMode.MARKDOWN)
         else:
             await ctx.respond(message, disable_web_page_preview=True, reply_markup=keyboard, parse_mode=ParseMode.MARKDOWN)
@@ -433,7 +434,7 @@ class LastfmPlugin(plugin.Plugin):
         url = f"https://ws.audioscrobbler.com/2.0/?method=user.getweekly{chart_type}chart&user={lastfm_username}&api_key={lastfm_api_key}&format=json"
 
         # Send a GET request to fetch the data
-        response = requests.get(url)
+        response = await util.run_sync(requests.get, url, pool="blocking-http")
         data = json.loads(response.text)
 
         # Check for errors in the response
@@ -505,7 +506,7 @@ class LastfmPlugin(plugin.Plugin):
         else:  # top_option == 'albums'
             url = f"https://ws.audioscrobbler.com/2.0/?method=user.gettopalbums&user={lastfm_username}&period={lastfm_period}&api_key={lastfm_api_key}&format=json&limit=5"
 
-        response = requests.get(url)
+        response = await util.run_sync(requests.get, url, pool="blocking-http")
         data = json.loads(response.text)
 
         if "error" in data:
@@ -138,6 +138,7 @@ class Canonical(plugin.Plugin):
         await ctx.respond("Done", delete_after=5)
 
     @listener.priority(65)
+    @listener.concurrent()
     async def on_message(self, message: Message) -> None:
         """Message metric analytics"""
         if message.outgoing:
@@ -17,9 +17,11 @@
 
 import asyncio
 import re
+from functools import partial
 from hashlib import md5, sha256
 from random import randint
-from typing import Any, Callable, ClassVar, List, Literal, MutableMapping, Optional, Tuple
+from typing import Any, Callable, ClassVar, List, Literal, MutableMapping, Optional, Set, Tuple
+from zipfile import BadZipFile
 
 from pyrogram.errors import (
     ChatAdminRequired,
@@ -27,6 +29,7 @@ from pyrogram.errors import (
     MessageDeleteForbidden,
     PeerIdInvalid,
     QueryIdInvalid,
+    RPCError,
     UserAdminInvalid,
     UserNotParticipant,
 )
@@ -38,10 +41,22 @@ from pyrogram.types import (
     Message,
 )
 from pydantic import BaseModel, validator
+from pymongo import ReturnDocument, UpdateOne
+
+try:
+    from userbotindo import get_trust
+except ImportError:
+    get_trust = None
 
 from anjani import command, filters, listener, plugin, util
 from anjani.core.metrics import SpamPredictionStat
+from anjani.util import spam_classifier
 from anjani.util.misc import StopPropagation
+from anjani.util.prediction_cache import PredictionCache
+from anjani.util.prediction_client import PredictionClient
+
+
+Keyboard = List[List[InlineKeyboardButton]]
 
 
 class TextLanguage(BaseModel):
@@ -75,21 +90,85 @@ class SpamPrediction(plugin.Plugin):
     db: util.db.AsyncCollection
     user_db: util.db.AsyncCollection
     setting_db: util.db.AsyncCollection
+    setting_db_cache: util.db.SettingsCache
+    predictions: PredictionCache
+    client: Optional[PredictionClient]
+    classifier: Optional[spam_classifier.BatchPredictor]
+
+    # Notices being logged by content hash, so each text is only logged once
+    _notices: MutableMapping[str, "asyncio.Task[Optional[int]]"]
+    _outbox: "asyncio.Queue[Tuple[str, Keyboard, MutableMapping[str, Any], asyncio.Future]]"
+    _background: Set["asyncio.Task[None]"]
+    # Users not flagged as spammer yet with a trust score under __low_trust
+    low_trust: MutableMapping[int, float]
+    __sender: "asyncio.Task[None]"
 
     __predict_cost: int = 10
     __log_channel: int = -1001314588569
+    __notice_queue_size: int = 1000
+    __low_trust: float = 5.0
+    __notice_interval: float = 0.1
+    # The prediction API is only asked about local scores in between
+    __local_ham: float = 0.05
+    __local_spam: float = 0.98
 
     async def on_load(self) -> None:
-        self._api_key = self.bot.config.SPAM_PREDICTION_API
-        self._predict_url = self.bot.config.SPAM_PREDICTION_URL
+        api_key = self.bot.config.SPAM_PREDICTION_API
+        predict_url = self.bot.config.SPAM_PREDICTION_URL
+        self.client = None
+        if api_key and predict_url:
+            self.client = PredictionClient(
+                self.bot.http,
+                predict_url,
+                api_key,
+                batch_url=self.bot.config.SPAM_PREDICTION_BATCH_URL,
+                concurrency=self.bot.config.SPAM_PREDICTION_CONCURRENCY,
+                timeout=self.bot.config.SPAM_PREDICTION_TIMEOUT,
+            )
+
+        self.classifier = None
+        if path := self.bot.config.SPAM_CLASSIFIER_PATH:
+            if spam_classifier.is_available():
+                try:
+                    model = await util.run_sync(
+                        spam_classifier.SpamClassifier.load, path, pool="cpu"
+                    )
+                except (BadZipFile, OSError, KeyError, ValueError) as e:
+                    self.log.error(f"Failed to load the local spam classifier: {e}")
+                else:
+                    self.classifier = spam_classifier.BatchPredictor(model)
+            else:
+                self.log.warning("numpy is not installed, local spam classifier disabled")
 
-        if not self._api_key or not self._predict_url:
+        if not self.client and not self.classifier:
             self.bot.unload_plugin(self)
             return
 
         self.db = self.bot.db.get_collection("SPAM_DUMP")
         self.user_db = self.bot.db.get_collection("USERS")
         self.setting_db = self.bot.db.get_collection("SPAM_PREDICT_SETTING")
+        self.setting_db_cache = util.db.SettingsCache(self.setting_db)
+        self.setting_db_cache.start()
+        self.predictions = PredictionCache()
+        self._notices = {}
+        self._outbox = asyncio.Queue(self.__notice_queue_size)
+        self._background = set()
+        self.low_trust = {}
+        await self.user_db.create_index("trust", sparse=True)
+
+    async def on_start(self, _: int) -> None:
+        self.__sender = self.bot.loop.create_task(self._send_notices())
+        task = self.bot.loop.create_task(self._load_trust())
+        self._background.add(task)
+        task.add_done_callback(self._background.discard)
+
+    async def on_stop(self) -> None:
+        self.setting_db_cache.stop()
+        self.__sender.cancel()
+        for task in [*self._notices.values(), *self._background]:
+            task.cancel()
+        if self.client:
+            self.client.close()
 
     async def on_chat_migrate(self, message: Message) -> None:
         await self.db.update_one(
@@ -105,6 +184,7 @@ class SpamPrediction(plugin.Plugin):
         await self.setting_db.update_one(
             {"chat_id": chat_id}, {"$set": data[self.name]}, upsert=True
         )
+        self.setting_db_cache.invalidate(chat_id)
 
     @staticmethod
     def _build_hash(content: str) -> str:
@@ -120,7 +200,7 @@ class SpamPrediction(plugin.Plugin):
         if not uid or uid == self.bot.uid:
             return
         if randint(1, 2) == 2:  # 50% chance to collect a sample
-            await self.user_db.update_one(
+            data = await self.user_db.find_one_and_update(
                 {"_id": uid},
                 {
                     "$push": {
@@ -130,21 +210,80 @@ class SpamPrediction(plugin.Plugin):
                         }
                     }
                 },
+                projection={"pred_sample": True, "spam": True},
+                return_document=ReturnDocument.AFTER,
             )  # Do not upsert
+            if data and get_trust is not None:
+                trust = get_trust(data.get("pred_sample", []))
+                if trust is not None:
+                    await self.user_db.update_one({"_id": uid}, {"$set": {"trust": trust}})
+                    self._update_trust(uid, trust, data.get("spam", False))
+
+    def _update_trust(self, uid: int, trust: float, spam: bool) -> None:
+        if trust and trust < self.__low_trust and not spam:
+            self.low_trust[uid] = trust
+        else:
+            self.low_trust.pop(uid, None)
+
+    async def _load_trust(self) -> None:
+        """Load the low trust users and compute the trust of users sampled before it was stored"""
+        async for data in self.user_db.find(
+            {"trust": {"$lt": self.__low_trust}, "spam": {"$ne": True}}, {"trust": True}
+        ):
+            self._update_trust(data["_id"], data["trust"], False)
+
+        if get_trust is None:
+            return
+
+        updates: List[UpdateOne] = []
+        async for data in self.user_db.find(
+            {"pred_sample.0": {"$exists": True}, "trust": {"$exists": False}},
+            {"pred_sample": True, "spam": True},
+            batch_size=1000,
+        ):
+            trust = get_trust(data["pred_sample"])
+            if trust is None:
+                continue
+
+            updates.append(UpdateOne({"_id": data["_id"]}, {"$set": {"trust": trust}}))
+            self._update_trust(data["_id"], trust, data.get("spam", False))
+            if len(updates) >= 1000:
+                await self.user_db.bulk_write(updates, ordered=False)
+                updates = []
+
+        if updates:
+            await self.user_db.bulk_write(updates, ordered=False)
+
+        self.log.debug(f"Loaded {len(self.low_trust)} low trust users")
 
     async def check_spam(self, text: str) -> SpamDetectionResponse:
-        async with self.bot.http.post(
-            self._predict_url,
-            json={"text": text},
-            headers={"x-api-key": self._api_key},
-        ) as resp:
-            if resp.status != 200:
-                raise ValueError(f"Failed to get prediction: {resp.status}")
-            res = await resp.json()
-            if not res["data"]:
-                raise ValueError("Unexpected response")
-
-            return SpamDetectionResponse(**res["data"])
+        if not self.client:
+            raise ValueError("Prediction API is not configured")
+
+        return SpamDetectionResponse(**await self.client.predict(text))
+
+    async def _remote_proba(self, text: str) -> float:
+        return (await self.check_spam(text)).prediction.get_raw("spam")
+
+    async def predict(self, text: str, content_hash: str) -> float:
+        """Get the spam probability of the text.
+
+        The local classifier is asked first, then the API only when it isn't sure.
+        API predictions are cached by the content hash.
+        """
+        score = None
+        if self.classifier:
+            score = await self.classifier.predict(text)
+            if not self.client or not self.__local_ham < score < self.__local_spam:
+                return score
+
+        try:
+            return await self.predictions.get(content_hash, partial(self._remote_proba, text))
+        except ValueError:
+            if score is None:
+                raise ValueError("Failed to get prediction") from None
+
+            return score
 
     @listener.filters(
         filters.regex(r"spam_check_(?P<value>t|f)") | filters.regex(r"spam_ban_(?P<user>.*)")
@@ -286,7 +425,7 @@ class SpamPrediction(plugin.Plugin):
 
     async def _build_notice(
         self, message: Message, text: str, proba_str: str, identifier: str, content_hash: str
-    ) -> Tuple[str, List[List[InlineKeyboardButton]]]:
+    ) -> Tuple[str, Keyboard]:
         notice = (
             "#SPAM_PREDICTION\n\n"
             f"**Prediction Result**: {proba_str}\n"
@@ -317,6 +456,114 @@ class SpamPrediction(plugin.Plugin):
 
         return notice, keyb
 
+    async def _log_notice(
+        self, message: Message, text: str, probability: float, identifier: str, content_hash: str
+    ) -> Optional[int]:
+        """Get the log channel message of the text, queueing a new notice if there is none"""
+        data = await self.db.find_one({"_id": content_hash}, {"msg_id": True})
+        if data:
+            return data.get("msg_id")
+
+        notice, keyb = await self._build_notice(
+            message, text, str(probability), identifier, content_hash
+        )
+        doc = {
+            "_id": content_hash,
+            "user": identifier,
+            "spam": [],
+            "ham": [],
+            "proba": probability,
+            "date": util.time.sec(),
+            "text": text,
+        }
+        future = asyncio.get_event_loop().create_future()
+        try:
+            self._outbox.put_nowait((notice, keyb, doc, future))
+        except asyncio.QueueFull:
+            self.log.warning(f"Log channel queue is full, dropped notice {content_hash}")
+            return None
+
+        return await future
+
+    async def _send_notices(self) -> None:
+        """Send the queued notices to the log channel, sleeping through flood waits"""
+        while True:
+            notice, keyb, doc, future = await self._outbox.get()
+            if future.done():
+                continue
+
+            try:
+                while True:
+                    try:
+                        msg = await self.bot.client.send_message(
+                            chat_id=self.__log_channel,
+                            text=notice,
+                            disable_web_page_preview=True,
+                            reply_markup=InlineKeyboardMarkup(keyb),
+                        )
+                    except FloodWait as flood:
+                        await asyncio.sleep(flood.value)  # type: ignore
+                        continue
+
+                    break
+
+                await self.db.insert_one({**doc, "msg_id": msg.id})
+            except asyncio.CancelledError:
+                future.cancel()
+                raise
+            except Exception as e:  # skipcq: PYL-W0703
+                self.log.error(f"Failed to log notice {doc['_id']}: {e}")
+                if not future.done():
+                    future.set_result(None)
+            else:
+                if not future.done():
+                    future.set_result(msg.id)
+
+            await asyncio.sleep(self.__notice_interval)
+
+    def _get_notice(
+        self, message: Message, text: str, probability: float, identifier: str, content_hash: str
+    ) -> "asyncio.Task[Optional[int]]":
+        try:
+            return self._notices[content_hash]
+        except KeyError:
+            pass
+
+        task = self.bot.loop.create_task(
+            self._log_notice(message, text, probability, identifier, content_hash)
+        )
+        self._notices[content_hash] = task
+        task.add_done_callback(partial(self._notice_done, content_hash))
+        return task
+
+    def _notice_done(self, content_hash: str, task: "asyncio.Task[Optional[int]]") -> None:
+        self._notices.pop(content_hash, None)
+        if not task.cancelled() and task.exception():
+            self.log.error(f"Failed to log notice {content_hash}", exc_info=task.exception())
+
+    async def _link_notice(
+        self, alert: Message, notice: "asyncio.Task[Optional[int]]", button: Keyboard
+    ) -> None:
+        """Add the log channel link to the alert once the notice is sent"""
+        try:
+            msg_id = await asyncio.shield(notice)
+        except Exception:  # skipcq: PYL-W0703
+            return
+
+        if not msg_id:
+            return
+
+        try:
+            await alert.edit_reply_markup(
+                InlineKeyboardMarkup([[self._view_button(msg_id)], *button])
+            )
+        except RPCError as e:
+            self.log.debug(f"Failed to link notice to alert: {e}")
+
+    @staticmethod
+    def _view_button(msg_id: int) -> InlineKeyboardButton:
+        return InlineKeyboardButton("View Message", url=f"https://t.me/SpamPredictionLog/{msg_id}")
+
     async def spam_check(self, message: Message, text: str) -> None:
         text = text.strip()
         try:
@@ -324,8 +571,9 @@ class SpamPrediction(plugin.Plugin):
         except AttributeError:
             user = None
 
+        content_hash = self._build_hash(text)
         try:
-            result = await self.check_spam(text)
+            proba = await self.predict(text, content_hash)
         except ValueError:
             self.bot.log.debug("Failed to get prediction")
             return
@@ -333,57 +581,20 @@ class SpamPrediction(plugin.Plugin):
         await self.bot.log_stat("predicted")
         SpamPredictionStat.labels("predicted").inc()
 
-        probability = result.prediction.spam_score
+        probability = proba * 100
 
-        await self._collect_random_sample(result.prediction.get_raw("spam"), user)
+        await self._collect_random_sample(proba, user)
 
         if probability <= 50:
             return
 
-        content_hash = self._build_hash(text)
         identifier = self._build_hex(user)
         proba_str = str(probability)
-        msg_id = None
+        notice = None
 
-        # only log public chat
+        # only log public chat, the notice is sent in the background
         if util.tg.get_username(message.chat):
-            notice, keyb = await self._build_notice(
-                message, text, proba_str, identifier, content_hash
-            )
-
-            async with asyncio.Lock():
-                data = await self.db.find_one({"_id": content_hash})
-                if data:
-                    msg_id = data["msg_id"]
-                else:
-                    while True:
-                        try:
-                            msg = await self.bot.client.send_message(
-                                chat_id=self.__log_channel,
-                                text=notice,
-                                disable_web_page_preview=True,
-                                reply_markup=InlineKeyboardMarkup(keyb),
-                            )
-                            msg_id = msg.id
-                        except FloodWait as flood:
-                            await asyncio.sleep(flood.value)  # type: ignore
-                            continue
-
-                        await asyncio.sleep(0.1)
-                        break
-
-                    await self.db.insert_one(
-                        {
-                            "_id": content_hash,
-                            "user": identifier,
-                            "spam": [],
-                            "ham": [],
-                            "proba": probability,
-                            "msg_id": msg.id,
-                            "date": util.time.sec(),
-                            "text": text,
-                        },
-                    )
+            notice = self._get_notice(message, text, probability, identifier, content_hash)
 
         if probability >= 78:
             chat = message.chat
@@ -399,15 +610,10 @@ class SpamPrediction(plugin.Plugin):
                     # Linked channel group
                     return
 
-            target = None
-            if user:
-                try:
-                    target = await message.chat.get_member(user)
-                except (UserNotParticipant, ChatAdminRequired):
-                    pass
-                else:
-                    if util.tg.is_staff_or_admin(target):
-                        return
+            if user and (
+                util.tg.is_staff(user) or await util.tg.is_admin(self.bot.client, chat.id, user)
+            ):
+                return
 
             alert = (
                 f"❗️**MESSAGE SPAM ALERT**❗️\n\n"
@@ -431,17 +637,8 @@ class SpamPrediction(plugin.Plugin):
 
             chat = message.chat
             button = []
-            if util.tg.get_username(message.chat) and msg_id:
-                button.append(
-                    [
-                        InlineKeyboardButton(
-                            "View Message", url=f"https://t.me/SpamPredictionLog/{msg_id}"
-                        )
-                    ]
-                )
-
-            if target is not None:
-                me = await chat.get_member(self.bot.uid)
+            if user:
+                me = await util.tg.get_chat_member(self.bot.client, chat.id, self.bot.uid)
                 if me.privileges and me.privileges.can_restrict_members:
                     button.append(
                         [
@@ -451,13 +648,25 @@ class SpamPrediction(plugin.Plugin):
                         ]
                     )
 
-            await self.bot.client.send_message(
+            # Link the notice right away if it's already logged, but never wait for it
+            if notice is not None and notice.done():
+                if not notice.cancelled() and not notice.exception() and notice.result():
+                    button.insert(0, [self._view_button(notice.result())])  # type: ignore
+
+                notice = None
+
+            sent = await self.bot.client.send_message(
                 chat.id,
                 alert,
                 reply_to_message_id=reply_id,
                 reply_markup=InlineKeyboardMarkup(button),
                 message_thread_id=message.message_thread_id,
             )
+            if notice is not None:
+                task = self.bot.loop.create_task(self._link_notice(sent, notice, button))
+                self._background.add(task)
+                task.add_done_callback(self._background.discard)
+
             raise StopPropagation
 
     @command.filters(filters.staff_only)
@@ -571,10 +780,11 @@ class SpamPrediction(plugin.Plugin):
         await self.setting_db.update_one(
             {"chat_id": chat_id}, {"$set": {"setting": setting}}, upsert=True
         )
+        self.setting_db_cache.invalidate(chat_id)
 
     async def is_active(self, chat_id: int) -> bool:
         """Return SpamShield setting"""
-        data = await self.setting_db.find_one({"chat_id": chat_id})
+        data = await self.setting_db_cache.get(chat_id)
         return data.get("setting", True) if data else True
 
     @command.filters(filters.admin_only, aliases=["spampredict", "spam_predict"])
@@ -32,6 +32,17 @@ def priority(_prio: int) -> Decorator:
     return prio_decorator
 
 
+def concurrent() -> Decorator:
+    """Runs the given listener function concurrently with the other
+    concurrent listeners of the same priority, after its sequential ones."""
+
+    def concurrent_decorator(func: ListenerFunc) -> ListenerFunc:
+        setattr(func, "_listener_concurrent", True)
+        return func
+
+    return concurrent_decorator
+
+
 def filters(_filters: Filter) -> Decorator:
     """Sets filters on the given listener function."""
 
@@ -48,6 +59,7 @@ class Listener:
     plugin: Any
     priority: int
     filters: Optional[Filter]
+    concurrent: bool
 
     def __init__(
         self,
@@ -56,12 +68,14 @@ class Listener:
         plugin: Any,
         prio: int,
         listener_filter: Optional[Filter] = None,
+        concurrent: bool = False,
     ) -> None:
         self.event = event
         self.func = func
         self.plugin = plugin
         self.priority = prio
         self.filters = listener_filter
+        self.concurrent = concurrent
 
     def __lt__(self, other: "Listener") -> bool:
         return self.priority < other.priority
@@ -16,29 +16,24 @@
 
 import asyncio
 from datetime import datetime
+from time import monotonic
 from typing import (
     Any,
-    AsyncIterator,
     Dict,
     List,
     Mapping,
     MutableMapping,
     Optional,
+    Tuple,
     Union,
 )
 from uuid import uuid4
 
 from aiopath import AsyncPath
+from pymongo import ASCENDING, IndexModel, UpdateOne
 from pyrogram.enums.chat_member_status import ChatMemberStatus
 from pyrogram.enums.chat_type import ChatType
-from pyrogram.errors import (
-    BadRequest,
-    ChannelPrivate,
-    ChatAdminRequired,
-    Forbidden,
-    PeerIdInvalid,
-    UserAdminInvalid,
-)
+from pyrogram.errors import ChatAdminRequired, FloodWait, PeerIdInvalid, UserAdminInvalid
 from pyrogram.types import (
     CallbackQuery,
     Chat,
@@ -50,6 +45,8 @@ from pyrogram.types import (
 )
 
 from anjani import command, filters, listener, plugin, util
+from anjani.util.fed_cache import FedBanCache, FedIndex
+from anjani.util.propagation import BanPropagator
 
 
 class Federation(plugin.Plugin):
@@ -58,22 +55,90 @@ class Federation(plugin.Plugin):
 
     db: util.db.AsyncCollection
     chat_db: util.db.AsyncCollection
-
-    __fban_delay: float = 0.5
+    bans_db: util.db.AsyncCollection
+    ban_cache: FedBanCache
+    fed_index: FedIndex
+    propagator: BanPropagator
+
+    # Telegram allows about 30 calls per second, leave some room for the rest of the bot
+    __fban_rate: float = 20
+    __fban_concurrency: int = 8
+    # Bans read or written at once by fedbackup and fedrestore
+    __backup_chunk: int = 1000
+    __progress_interval: float = 5
 
     async def on_load(self) -> None:
         self.db = self.bot.db.get_collection("FEDERATIONS")
         self.chat_db = self.bot.db.get_collection("CHATS")
+        # One document per (fed_id, target_id), a user or a chat banned in the federation
+        self.bans_db = self.bot.db.get_collection("FED_BANS")
+        await self.bans_db.create_indexes(
+            [
+                IndexModel([("fed_id", ASCENDING), ("target_id", ASCENDING)], unique=True),
+                IndexModel([("target_id", ASCENDING), ("fed_id", ASCENDING)]),
+            ]
+        )
+        await self._migrate_bans()
+        self.ban_cache = FedBanCache(self.bans_db)
+        self.fed_index = FedIndex(self.db)
+
+        self.propagator = BanPropagator(
+            self.bot.client,
+            self.bot.db.get_collection("FBAN_JOBS"),
+            self.log,
+            rate=self.__fban_rate,
+            concurrency=self.__fban_concurrency,
+        )
+
+    async def on_start(self, _: int) -> None:
+        self.ban_cache.start()
+        self.fed_index.start()
+        await self.propagator.resume()
+
+    async def _migrate_bans(self) -> None:
+        """Move the bans embedded in the federation documents to FED_BANS"""
+        async for data in self.db.find(
+            {"$or": [{"banned": {"$exists": True}}, {"banned_chat": {"$exists": True}}]},
+            {"banned": 1, "banned_chat": 1},
+        ):
+            self.log.info(f"Migrating bans of federation {data['_id']}")
+            ops = [
+                # Don't overwrite bans made after an interrupted migration
+                UpdateOne(
+                    {"fed_id": data["_id"], "target_id": int(target)},
+                    {"$setOnInsert": {**(ban or {}), "type": ban_type}},
+                    upsert=True,
+                )
+                for ban_type, field in (("user", "banned"), ("chat", "banned_chat"))
+                for target, ban in data.get(field, {}).items()
+            ]
+            for i in range(0, len(ops), 1000):
+                await self.bans_db.bulk_write(ops[i : i + 1000], ordered=False)
+
+            await self.db.update_one(
+                {"_id": data["_id"]}, {"$unset": {"banned": "", "banned_chat": ""}}
+            )
+
+    async def on_stop(self) -> None:
+        self.ban_cache.stop()
+        self.fed_index.stop()
+        await self.propagator.stop()
 
     async def on_chat_migrate(self, message: Message) -> None:
         new_chat = message.chat.id
         old_chat = message.migrate_from_chat_id
 
-        await self.db.update_one(
-            {"chat_id": old_chat},
-            {"$set": {"chat_id": new_chat}},
+        data = await self.db.find_one_and_update(
+            {"chats": old_chat},
+            {"$set": {"chats.$": new_chat}},
+            projection={"_id": 1},
         )
+        if data:
+            self.fed_index.leave(old_chat)
+            self.fed_index.join(data["_id"], new_chat)
 
+    # Bans are enforced below the shed priority, so they still apply to a flooded chat
+    @listener.priority(65)
     async def on_chat_action(self, message: Message) -> None:
         if message.left_chat_member:
             return
@@ -81,8 +146,7 @@ class Federation(plugin.Plugin):
         chat = message.chat
         if not chat:
             return
-        fed_data = await self.get_fed_bychat(chat.id)
-        if not fed_data:
+        if not await self.get_fban_scope(chat.id):
             return
 
         if message.new_chat_members:
@@ -96,6 +160,7 @@ class Federation(plugin.Plugin):
             if fed_data:
                 # Leave the chat federation
                 await self.db.update_one({"_id": fed_data["_id"]}, {"$pull": {"chats": chat.id}})
+                self.fed_index.leave(chat.id)
 
     async def on_chat_member_update(self, update: ChatMemberUpdated) -> None:
         """Leave federation if bot is demoted"""
@@ -118,6 +183,7 @@ class Federation(plugin.Plugin):
                 self.text(chat.id, "fed-autoleave", fed_data["name"], fed_data["_id"]),
                 self.db.update_one({"_id": fed_data["_id"]}, {"$pull": {"chats": chat.id}}),
             )
+            self.fed_index.leave(chat.id)
             thread_id = await self.get_action_topic(chat.id)
             await self.bot.client.send_message(
                 chat.id,
@@ -140,6 +206,9 @@ class Federation(plugin.Plugin):
                 )
 
             data = await self.db.find_one_and_delete({"_id": arg})
+            await self.bans_db.delete_many({"fed_id": arg})
+            self.ban_cache.drop(arg)
+            self.fed_index.remove(arg)
             await query.message.edit_text(await self.text(chat.id, "fed-delete-done", data["name"]))
         elif cmd == "log":
             owner_id, fid = arg.split("_")
@@ -155,6 +224,8 @@ class Federation(plugin.Plugin):
         else:
             raise ValueError("Invalid callback data command")
 
+    @listener.priority(65)
+    @listener.concurrent()
     async def on_message(self, message: Message) -> None:
         if message.outgoing or not message.chat:
             return
@@ -196,12 +267,36 @@ class Federation(plugin.Plugin):
             res += f"- **{i['name']}** (`{i['_id']}`)\n"
         return res or None
 
-    async def _get_fed_subs_data(self, fid: str) -> AsyncIterator[Mapping[str, Any]]:
-        """Get federation that subcribe current federation"""
-        async for i in self.db.find(
-            {"subscribers": fid}, {"_id": 1, "name": 1, "banned": 1, "banned_chat": 1}
-        ):
-            yield i
+    async def get_fban_scope(self, chat: int) -> Optional[Mapping[str, str]]:
+        """Get the name of each federation whose bans apply to the chat.
+
+        That's the federation of the chat first, then the federations it
+        subscribes to, directly or through another subscription.
+        """
+        if self.fed_index.ready:
+            fid = self.fed_index.get(chat)
+            if fid is None:
+                return None
+
+            return {i: self.fed_index.name(i) or "" for i in self.fed_index.scope(fid)}
+
+        fed = await self.db.find_one({"chats": chat}, {"_id": 1, "name": 1})
+        if not fed:
+            return None
+
+        scope = {fed["_id"]: fed["name"]}
+        frontier = [fed["_id"]]
+        while frontier:
+            subscribed = frontier
+            frontier = []
+            async for i in self.db.find(
+                {"subscribers": {"$in": subscribed}}, {"_id": 1, "name": 1}
+            ):
+                if i["_id"] not in scope:
+                    scope[i["_id"]] = i["name"]
+                    frontier.append(i["_id"])
+
+        return scope
 
     async def fban_user(
         self,
@@ -212,15 +307,12 @@ class Federation(plugin.Plugin):
         reason: Optional[str] = None,
     ) -> None:
         """Fban a user"""
-        await self.db.update_one(
-            {"_id": fid},
-            {
-                "$set": {
-                    f"banned.{user}": {"name": fullname, "reason": reason, "time": datetime.now()}
-                }
-            },
+        await self.bans_db.update_one(
+            {"fed_id": fid, "target_id": user},
+            {"$set": {"type": "user", "name": fullname, "reason": reason, "time": datetime.now()}},
             upsert=True,
         )
+        self.ban_cache.add(fid, user)
 
     async def fban_chat(
         self,
@@ -231,93 +323,63 @@ class Federation(plugin.Plugin):
         reason: Optional[str] = None,
     ) -> None:
         """Fban a channel"""
-        await self.db.update_one(
-            {"_id": fid},
-            {
-                "$set": {
-                    f"banned_chat.{chat}": {
-                        "title": title,
-                        "reason": reason,
-                        "time": datetime.now(),
-                    }
-                }
-            },
+        await self.bans_db.update_one(
+            {"fed_id": fid, "target_id": chat},
+            {"$set": {"type": "chat", "title": title, "reason": reason, "time": datetime.now()}},
+            upsert=True,
         )
+        self.ban_cache.add(fid, chat)
 
     async def unfban_user(self, fid: str, user: int) -> None:
         """Remove banned user"""
-        await self.db.update_one({"_id": fid}, {"$unset": {f"banned.{user}": None}}, upsert=True)
+        await self.bans_db.delete_one({"fed_id": fid, "target_id": user})
+        self.ban_cache.discard(fid, user)
 
     async def unfban_chat(self, fid: str, chat: int) -> None:
         """Remove banned chat"""
-        await self.db.update_one(
-            {"_id": fid}, {"$unset": {f"banned_chat.{chat}": None}}, upsert=True
-        )
+        await self.bans_db.delete_one({"fed_id": fid, "target_id": chat})
+        self.ban_cache.discard(fid, chat)
+
+    async def get_fban(self, fid: str, target: int) -> Optional[MutableMapping[str, Any]]:
+        """Get the ban of a user or chat in the federation"""
+        return await self.bans_db.find_one({"fed_id": fid, "target_id": target})
 
     async def check_fban(self, target: int) -> util.db.AsyncCursor:
         """Check user banned list"""
-        return self.db.find(
-            {
-                "$or": [
-                    {f"banned.{target}": {"$exists": True}},
-                    {f"banned_chat.{target}": {"$exists": True}},
-                ]
-            },
-            {
-                "_id": 1,
-                "name": 1,
-                f"banned.{target}": 1,
-                f"banned_chat.{target}": 1,
-            },
-        )
+        return self.bans_db.find({"target_id": target})
 
     async def is_fbanned(self, chat: int, target: int) -> Optional[MutableMapping[str, Any]]:
-        def check(target: int, data: Mapping[str, Any]) -> Optional[MutableMapping[str, Any]]:
-            """Scoped check to verify if user is banned"""
-            if str(target) in data.get("banned", {}):
-                user_data = data["banned"][str(target)]
-                user_data["fed_name"] = data["name"]
-                user_data["type"] = "user"
-                return user_data
-
-            if str(target) in data.get("banned_chat", {}):
-                channel_data = data["banned_chat"][str(target)]
-                channel_data["fed_name"] = data["name"]
-                channel_data["type"] = "chat"
-                return channel_data
-
-        data = await self.db.find_one(
-            {
-                "chats": chat,
-                "$or": [
-                    {f"banned.{target}": {"$exists": True}},
-                    {f"banned_chat.{target}": {"$exists": True}},
-                ],
-            },
-            {
-                f"banned.{target}": 1,
-                f"banned_chat.{target}": 1,
-                "name": 1,
-            },
-        )
-        if data:
-            res = check(target, data)
-            if res:
-                return res
+        # Nearly nobody is banned, don't touch the database unless the cache says so
+        if self.ban_cache.ready and not self.ban_cache.is_banned(target):
+            return None
 
-        # Check if user is banned in subcribed federation
-        fid = await self.get_fed_bychat(chat)
-        if not fid:
+        scope = await self.get_fban_scope(chat)
+        if not scope:
             return None
 
-        subscribe = [res async for res in self._get_fed_subs_data(fid["_id"])]
-        if not subscribe:
+        fids = list(scope)
+        if self.ban_cache.ready:
+            fids = [fid for fid in fids if self.ban_cache.contains(fid, target)]
+            if not fids:
+                return None
+
+        bans = await self.bans_db.find({"fed_id": {"$in": fids}, "target_id": target}).to_list()
+        # Bans removed by someone else are only dropped from the cache here
+        found = {ban["fed_id"] for ban in bans}
+        for fid in fids:
+            if fid not in found:
+                self.ban_cache.discard(fid, target)
+
+        if not bans:
             return None
-        for i in subscribe:
-            res = check(target, i)
-            if res:
-                res["subfed"] = True
-                return res
+
+        # The nearest federation wins, the scope is ordered by distance
+        data = min(bans, key=lambda ban: fids.index(ban["fed_id"]))
+        data["fed_name"] = scope[data["fed_id"]]
+        if data["fed_id"] != next(iter(scope)):
+            data["subfed"] = True
+
+        return data
 
     async def fban_handler(
         self, chat: Chat, user: Union[User, Chat], data: MutableMapping[str, Any]
@@ -368,6 +430,7 @@ class Federation(plugin.Plugin):
             return await self.text(chat.id, "federation-limit")
 
         await self.db.insert_one({"_id": fed_id, "name": name, "owner": owner.id, "log": owner.id})
+        self.fed_index.put({"_id": fed_id, "name": name})
         return await self.text(chat.id, "new-federation", fed_name=name, fed_id=fed_id)
 
     async def cmd_delfed(self, ctx: command.Context) -> Optional[str]:
@@ -430,6 +493,7 @@ class Federation(plugin.Plugin):
             self.text(chat.id, "fed-chat-joined-info", data["name"]),
             self.db.update_one({"_id": fid}, {"$push": {"chats": chat.id}}),
         )
+        self.fed_index.join(fid, chat.id)
         if log := data.get("log"):
             await self.bot.client.send_message(
                 log,
@@ -457,6 +521,7 @@ class Federation(plugin.Plugin):
             self.text(chat.id, "fed-chat-leave-info", fed["name"]),
             self.db.update_one({"_id": fed["_id"]}, {"$pull": {"chats": chat.id}}),
         )
+        self.fed_index.leave(chat.id)
 
         if log := fed.get("log"):
             await self.bot.client.send_message(
@@ -572,8 +637,8 @@ class Federation(plugin.Plugin):
             data["name"],
             owner.mention,
             len(data.get("admins", [])),
-            len(data.get("banned", [])),
-            len(data.get("banned_chat", [])),
+            await self.bans_db.count_documents({"fed_id": data["_id"], "type": "user"}),
+            await self.bans_db.count_documents({"fed_id": data["_id"], "type": "chat"}),
             len(data.get("chats", [])),
             len(data.get("subscribers", [])),
         )
@@ -632,14 +697,12 @@ class Federation(plugin.Plugin):
         reason: str,
         fed_data: Mapping[str, Any],
     ) -> str:
-        update = False
-        if str(target.id) in fed_data.get("banned", {}).keys():
-            update = True
+        banned = await self.get_fban(fed_data["_id"], target.id)
 
         fullname = target.first_name + target.last_name if target.last_name else target.first_name
         await self.fban_user(fed_data["_id"], target.id, fullname=fullname, reason=reason)
 
-        if update:
+        if banned:
             return await self.text(
                 chat.id,
                 "fed-ban-info-update",
@@ -647,7 +710,7 @@ class Federation(plugin.Plugin):
                 banner.mention,
                 target.mention,
                 target.id,
-                fed_data["banned"][str(target.id)]["reason"],
+                banned["reason"],
                 reason,
             )
         return await self.text(
@@ -668,13 +731,11 @@ class Federation(plugin.Plugin):
         reason: str,
         fed_data: Mapping[str, Any],
     ) -> str:
-        update = False
-        if str(target.id) in fed_data.get("banned_chat", {}).keys():
-            update = True
+        banned = await self.get_fban(fed_data["_id"], target.id)
 
         await self.fban_chat(fed_data["_id"], target.id, title=target.title, reason=reason)
 
-        if update:
+        if banned:
             return await self.text(
                 chat.id,
                 "fed-ban-chat-info-update",
@@ -682,7 +743,7 @@ class Federation(plugin.Plugin):
                 banner.mention,
                 target.title,
                 target.id,
-                fed_data["banned_chat"][str(target.id)]["reason"],
+                banned["reason"],
                 reason,
             )
         return await self.text(
@@ -695,43 +756,29 @@ class Federation(plugin.Plugin):
             reason,
         )
 
-    async def _propagate_fban(
-        self,
-        target: Union[User, Chat],
-        chats: List[int],
-        host_fed: str,
-        sub_fed: Optional[str] = None,
-    ) -> Mapping[int, str]:
-        """Propagate fban to each chat in the list"""
-        failed = {}
-        for chat in chats:
-            try:
-                await self.bot.client.ban_chat_member(chat, target.id)
-                await asyncio.sleep(self.__fban_delay)
-            except UserAdminInvalid:
-                self.log.warning(
-                    f"Failed to fban {util.tg.get_username(target)} on subfed {sub_fed} of {host_fed}  on {chat}, user might be an admin"
-                    if sub_fed
-                    else f"Failed to fban {util.tg.get_username(target)} on {chat}, user might be an admin"
-                )
-                failed[
-                    chat
-                ] = f"failed to fban on chat {chat} caused by: user has higher admin privileges"
-            except (Forbidden, ChannelPrivate) as err:
-                self.log.warning(
-                    f"Can't fban on subfed {sub_fed} of {host_fed} at {chat} caused by {err.MESSAGE}"
-                    if sub_fed
-                    else f"Can't fban {util.tg.get_username(target)} on {chat} caused by {err.MESSAGE}"
-                )
-                failed[chat] = err.MESSAGE
-            except BadRequest as br:
-                self.log.warning(
-                    f"Failed to send fban on subfed {sub_fed} of {host_fed} at {chat} due to {br.MESSAGE}"
-                    if sub_fed
-                    else f"Failed to fban {util.tg.get_username(target)} on {chat} due to {br.MESSAGE}"
-                )
-                failed[chat] = br.MESSAGE
-        return failed
+    async def _get_propagation_chats(self, data: Mapping[str, Any]) -> List[int]:
+        """Get the chats of the federation and of its subscribers, directly or not"""
+        if self.fed_index.ready:
+            return [
+                chat
+                for fid in self.fed_index.audience(data["_id"])
+                for chat in self.fed_index.chats(fid)
+            ]
+
+        chats = list(data.get("chats", []))
+        seen = {data["_id"]}
+        frontier = [fid for fid in data.get("subscribers", []) if fid not in seen]
+        while frontier:
+            seen.update(frontier)
+            subscribers = frontier
+            frontier = []
+            async for subs in self.db.find(
+                {"_id": {"$in": subscribers}}, {"chats": 1, "subscribers": 1}
+            ):
+                chats.extend(subs.get("chats", []))
+                frontier.extend(fid for fid in subs.get("subscribers", []) if fid not in seen)
+
+        return chats
 
     async def cmd_fban(
         self, ctx: command.Context, target: Union[User, Chat, None] = None, *, reason: str = ""
@@ -784,53 +831,30 @@ class Federation(plugin.Plugin):
         else:
             return await self.text(chat.id, "err-peer-invalid")
 
-        await ctx.respond(f"Starting a federation ban for {target.id} in federation {data['name']}")
-        failed = await self._propagate_fban(target, data["chats"], data["_id"])
-
-        text = ""
-        if failed:
-            for key, err_msg in failed.items():
-                text += f"failed to fban on chat {key} caused by {err_msg}\n\n"
-            await ctx.respond(text, mode="reply", reference=ctx.response)
-
-        if data.get("subscribers", []):
-            for fed_id in data["subscribers"]:
-                subs_data = await self.get_fed(fed_id)
-                if not subs_data:
-                    continue
-                await self._propagate_fban(
-                    target, subs_data.get("chats", []), data["_id"], subs_data["_id"]
-                )
-
         await ctx.respond(string)
+        progress = await ctx.respond(
+            f"Starting a federation ban for {target.id} in federation {data['name']}",
+            mode="reply",
+            reference=ctx.response,
+        )
+        await self.propagator.submit(
+            "ban",
+            data["_id"],
+            target.id,
+            await self._get_propagation_chats(data),
+            progress=(progress.chat.id, progress.id) if progress else None,
+            log=data.get("log"),
+        )
 
         # send message to federation log
         if log := data.get("log"):
             await self.bot.client.send_message(log, string, disable_web_page_preview=True)
-            if failed:
-                await self.bot.client.send_message(log, text)
 
         return None
 
-    async def _propagate_unfban(
-        self,
-        target: Union[User, Chat],
-        chats: List[int],
-        host_fed: str,
-        sub_fed: Optional[str] = None,
-    ) -> None:
-        for chat in chats:
-            try:
-                await self.bot.client.unban_chat_member(chat, target.id)
-                await asyncio.sleep(self.__fban_delay)
-            except (BadRequest, Forbidden) as err:
-                self.log.warning(
-                    f"Failed to unfban on subfed {sub_fed} of {host_fed} due to {err.MESSAGE}"
-                    if sub_fed
-                    else f"Failed to unfban on {host_fed} due to {err.MESSAGE}"
-                )
-
-    async def cmd_unfban(self, ctx: command.Context, target: Union[User, Chat, None] = None) -> str:
+    async def cmd_unfban(
+        self, ctx: command.Context, target: Union[User, Chat, None] = None
+    ) -> Optional[str]:
         """Unban a user on federation"""
         chat = ctx.chat
         if chat.type == ChatType.PRIVATE:
@@ -855,9 +879,7 @@ class Federation(plugin.Plugin):
                 return await self.text(chat.id, "fed-no-ban-user")
             target = reply_msg.from_user or reply_msg.sender_chat
 
-        if (str(target.id) not in (data.get("banned", {}).keys())) and (
-            str(target.id) not in (data.get("banned_chat", {}).keys())
-        ):
+        if not await self.get_fban(data["_id"], target.id):
             return await self.text(chat.id, "fed-user-not-banned")
 
         if isinstance(target, User):
@@ -883,23 +905,25 @@ class Federation(plugin.Plugin):
         else:
             return ""
 
-        await ctx.respond(f"Removing federation ban for {target.id} in federation {data['name']}")
-        await self._propagate_unfban(target, data["chats"], data["_id"])
-
-        if data.get("subscribers", []):
-            for fed_id in data["subscribers"]:
-                subs_data = await self.get_fed(fed_id)
-                if not subs_data:
-                    continue
-
-                await self._propagate_unfban(
-                    target, subs_data.get("chats", []), data["_id"], subs_data["_id"]
-                )
+        await ctx.respond(text)
+        progress = await ctx.respond(
+            f"Removing federation ban for {target.id} in federation {data['name']}",
+            mode="reply",
+            reference=ctx.response,
+        )
+        await self.propagator.submit(
+            "unban",
+            data["_id"],
+            target.id,
+            await self._get_propagation_chats(data),
+            progress=(progress.chat.id, progress.id) if progress else None,
+            log=data.get("log"),
+        )
 
         if log := data.get("log"):
             await self.bot.client.send_message(log, text, disable_web_page_preview=True)
 
-        return text
+        return None
 
     @command.filters(aliases=["fstats", "fedstats"])
     async def cmd_fbanstats(self, ctx: command.Context) -> str:
@@ -912,34 +936,19 @@ class Federation(plugin.Plugin):
                 return await self.text(chat.id, "fed-invalid-user-id")
 
             data = await self.get_fed(ctx.args[1])
-            if data:
-                if str(user_id) in data.get("banned", {}):
-                    res = data["banned"][str(user_id)]
-                    return await self.text(
-                        chat.id,
-                        "fed-stat-banned",
-                        res["reason"],
-                        res["time"].strftime("%Y %b %d %H:%M UTC"),
-                    )
-                if str(user_id) in data.get("banned_chat", {}):
-                    res = data["banned_chat"][str(user_id)]
-                    return await self.text(
-                        chat.id,
-                        "fed-stat-banned-chat",
-                        res["reason"],
-                        res["time"].strftime("%Y %b %d %H:%M UTC"),
-                    )
+            if not data:
+                return await self.text(chat.id, "fed-not-found")
 
-                if str(user_id) in data.get("banned_chat", {}):
-                    res = data["banned_chat"][str(user_id)]
-                    return await self.text(
-                        chat.id,
-                        "fed-stat-banned-chat",
-                        res["reason"],
-                        res["time"].strftime("%Y %b %d %H:%M UTC"),
-                    )
+            res = await self.get_fban(data["_id"], user_id)
+            if not res:
                 return await self.text(chat.id, "fed-stat-not-banned")
-            return await self.text(chat.id, "fed-not-found")
+
+            return await self.text(
+                chat.id,
+                "fed-stat-banned" if res["type"] == "user" else "fed-stat-banned-chat",
+                res["reason"],
+                res["time"].strftime("%Y %b %d %H:%M UTC"),
+            )
 
         user = None
         user_id = None
@@ -966,24 +975,35 @@ class Federation(plugin.Plugin):
             return ""
 
         cursor = await self.check_fban(user_id)
-        fed_list = await cursor.to_list()
-        if fed_list:
+        bans = {ban["fed_id"]: ban async for ban in cursor}
+        if bans:
             text = await self.text(chat.id, "fed-stat-multi")
-            for bans in fed_list:
+            async for fed in self.db.find({"_id": {"$in": list(bans)}}, {"_id": 1, "name": 1}):
                 text += "\n" + await self.text(
                     chat.id,
                     "fed-stat-multi-info",
-                    bans["name"],
-                    bans["_id"],
-                    bans["banned_chat" if bans.get("banned_chat") else "banned"][str(user.id)][
-                        "reason"
-                    ],
+                    fed["name"],
+                    fed["_id"],
+                    bans[fed["_id"]]["reason"],
                 )
         else:
             text = await self.text(chat.id, "fed-stat-multi-not-banned")
 
         return text
 
+    async def _report_progress(self, ctx: command.Context, text: str, last: float) -> float:
+        """Edit the response with the progress, at most once per interval"""
+        now = monotonic()
+        if now - last < self.__progress_interval:
+            return last
+
+        try:
+            await ctx.respond(text)
+        except FloodWait:
+            pass  # Only informative, the next report will do
+
+        return now
+
     @command.filters(filters.private)
     async def cmd_fedbackup(self, ctx: command.Context) -> Optional[str]:
         """Backup federation ban list"""
@@ -994,25 +1014,74 @@ class Federation(plugin.Plugin):
         if not data:
             return await self.text(chat.id, "user-no-feds")
 
-        try:
-            banned = data["banned"]
-        except KeyError:
-            return await self.text(chat.id, "fed-backup-empty")
-
         file = AsyncPath(self.bot.config.DOWNLOAD_PATH + data["name"] + ".csv")
 
+        count = 0
+        last_report = monotonic()
+        lines: List[str] = []
         await file.touch()
         async with file.open("w") as f:
-            for banned_user in banned:
-                ban_data = banned[banned_user]
-                await f.write(
-                    f"{banned_user},{ban_data['name']},{ban_data['reason']},{ban_data['time']}\n"
+            async for ban in self.bans_db.find(
+                {"fed_id": data["_id"], "type": "user"},
+                {"_id": False, "target_id": True, "name": True, "reason": True, "time": True},
+                batch_size=self.__backup_chunk,
+            ):
+                lines.append(f"{ban['target_id']},{ban['name']},{ban['reason']},{ban['time']}\n")
+                if len(lines) < self.__backup_chunk:
+                    continue
+
+                await f.write("".join(lines))
+                count += len(lines)
+                lines.clear()
+                last_report = await self._report_progress(
+                    ctx, f"Backing up federation {data['name']}: {count} bans", last_report
                 )
 
-        await ctx.respond(document=str(file))
+            if lines:
+                await f.write("".join(lines))
+                count += len(lines)
+
+        if not count:
+            await file.unlink()
+            return await self.text(chat.id, "fed-backup-empty")
+
+        await ctx.respond(
+            f"Backed up {count} bans of federation {data['name']}", document=str(file)
+        )
         await file.unlink()
         return None
 
+    @staticmethod
+    def _parse_backup_line(line: str) -> Optional[Tuple[int, str, str]]:
+        """Parse a '<user_id>,<name>,<reason>,<time>' backup line"""
+        d = line.rstrip("\n").split(",")
+        if len(d) < 3:
+            return None
+
+        try:
+            target = int(d[0])
+        except ValueError:
+            return None
+
+        # The reason might contain commas as well, the time is always last
+        return target, d[1], ",".join(d[2:-1]) if len(d) > 3 else d[2]
+
+    async def _restore_bans(self, fid: str, bans: List[Tuple[int, str, str]]) -> None:
+        now = datetime.now()
+        await self.bans_db.bulk_write(
+            [
+                UpdateOne(
+                    {"fed_id": fid, "target_id": target},
+                    {"$set": {"type": "user", "name": name, "reason": reason, "time": now}},
+                    upsert=True,
+                )
+                for target, name, reason in bans
+            ],
+            ordered=False,
+        )
+        for target, _, _ in bans:
+            self.ban_cache.add(fid, target)
+
     @command.filters(filters.private)
     async def cmd_fedrestore(self, ctx: command.Context) -> Optional[str]:
         """Restore a backup bans"""
@@ -1028,19 +1097,34 @@ class Federation(plugin.Plugin):
 
         file = AsyncPath(await reply_msg.download(self.bot.config.DOWNLOAD_PATH))
 
-        fid = data["_id"]
-        tasks = []  # type: List[asyncio.Task[None]]
-        async with file.open("r") as f:
-            line: str
-            async for line in f:  # type: ignore
-                d = line.split(",")
-                task = self.bot.loop.create_task(
-                    self.fban_user(fid, int(d[0]), fullname=d[1], reason=d[2])
-                )
-                tasks.append(task)
+        count = 0
+        last_report = monotonic()
+        bans: List[Tuple[int, str, str]] = []
+        try:
+            async with file.open("r") as f:
+                line: str
+                async for line in f:  # type: ignore
+                    ban = self._parse_backup_line(line)
+                    if not ban:
+                        continue
+
+                    bans.append(ban)
+                    if len(bans) < self.__backup_chunk:
+                        continue
+
+                    await self._restore_bans(data["_id"], bans)
+                    count += len(bans)
+                    bans = []
+                    last_report = await self._report_progress(
+                        ctx, f"Restoring federation {data['name']}: {count} bans", last_report
+                    )
+
+            if bans:
+                await self._restore_bans(data["_id"], bans)
+        finally:
+            await file.unlink()
 
-        ret = await asyncio.gather(self.text(chat.id, "fed-restore-done"), file.unlink(), *tasks)
-        return ret[0]
+        return await self.text(chat.id, "fed-restore-done")
 
     @command.filters(filters.private, aliases=["myfeds"])
     async def cmd_myfed(self, ctx: command.Context) -> str:
@@ -1180,6 +1264,7 @@ class Federation(plugin.Plugin):
         curr_fed, to_subs = res
 
         await self.db.update_one({"_id": fid}, {"$push": {"subscribers": curr_fed["_id"]}})
+        self.fed_index.subscribe(to_subs["_id"], curr_fed["_id"])
         try:
             await self.bot.client.send_message(
                 to_subs["log"] or to_subs["owner"],
@@ -1198,6 +1283,7 @@ class Federation(plugin.Plugin):
         curr_fed, to_unsubs = res
 
         await self.db.update_one({"_id": fid}, {"$pull": {"subscribers": curr_fed["_id"]}})
+        self.fed_index.unsubscribe(to_unsubs["_id"], curr_fed["_id"])
         try:
             await self.bot.client.send_message(
                 to_unsubs["log"],
@@ -17,23 +17,30 @@
 
 import asyncio
 import re
+from collections import OrderedDict
 from typing import (
     Any,
     Callable,
     ClassVar,
     Coroutine,
+    Mapping,
     MutableMapping,
     Optional,
+    Pattern,
     Set,
     Tuple,
+    Union,
 )
 
 from pyrogram.errors import MediaEmpty, MessageEmpty
-from pyrogram.types import Message
+from pyrogram.types import InlineKeyboardMarkup, Message
 
 from anjani import command, filters, listener, plugin, util
 from anjani.util.tg import Types, build_button, get_message_info
 
+# Filter data (a plain string on the old schema) and its prebuilt keyboard
+Payload = Tuple[Union[str, Mapping[str, Any]], Optional[InlineKeyboardMarkup]]
+
 
 class Filters(plugin.Plugin):
     name: ClassVar[str] = "Filters"
@@ -41,10 +48,19 @@ class Filters(plugin.Plugin):
 
     db: util.db.AsyncCollection
     trigger: MutableMapping[int, Set[str]] = {}
+    # Compiled pattern of all triggers of a chat and a map of the lowered trigger to the original
+    patterns: MutableMapping[int, Tuple[Pattern[str], Mapping[str, str]]] = {}
     SEND: MutableMapping[int, Callable[..., Coroutine[Any, Any, Optional[Message]]]]
 
+    # LRU of (chat_id, trigger) to the filter data and its prebuilt keyboard
+    payloads: MutableMapping[Tuple[int, str], Payload]
+    # Bumped on every filter change, a read racing with one isn't cached
+    payloads_generation: int = 0
+    __max_payloads: int = 2048
+
     async def on_load(self) -> None:
         self.db = self.bot.db.get_collection("FILTERS")
+        self.payloads = OrderedDict()
         self.SEND = {
             Types.TEXT.value: self.bot.client.send_message,
             Types.BUTTON_TEXT.value: self.bot.client.send_message,
@@ -61,6 +77,12 @@ class Filters(plugin.Plugin):
     async def on_start(self, _: int) -> None:
         async for chat in self.db.find({}):
             self.trigger[chat["chat_id"]] = set(chat["trigger"].keys())
+            self.compile_trigger(chat["chat_id"])
+            for keyword, filt in chat["trigger"].items():
+                if len(self.payloads) >= self.__max_payloads:
+                    break
+
+                self.cache_payload(chat["chat_id"], keyword, filt)
 
     async def on_plugin_backup(self, chat_id: int) -> MutableMapping[str, Any]:
         data = await self.db.find_one({"chat_id": chat_id}, {"_id": False})
@@ -68,6 +90,7 @@ class Filters(plugin.Plugin):
 
     async def on_plugin_restore(self, chat_id: int, data: MutableMapping[str, Any]) -> None:
         await self.db.update_one({"chat_id": chat_id}, {"$set": data[self.name]}, upsert=True)
+        self.uncache_payloads(chat_id)
 
     async def on_chat_migrate(self, message: Message) -> None:
         new_chat = message.chat.id
@@ -77,8 +100,57 @@ class Filters(plugin.Plugin):
             {"chat_id": old_chat},
             {"$set": {"chat_id": new_chat}},
         )
+        if old_chat in self.trigger:
+            self.trigger[new_chat] = self.trigger.pop(old_chat)
+            self.patterns.pop(old_chat, None)
+            self.compile_trigger(new_chat)
+            self.uncache_payloads(old_chat)
+
+    def cache_payload(
+        self, chat_id: int, keyword: str, filt: Union[str, Mapping[str, Any]]
+    ) -> Payload:
+        keyb = None
+        # This checks data for old filters schema
+        if not isinstance(filt, str) and filt.get("buttons"):
+            keyb = build_button(filt["buttons"])
+
+        key = (chat_id, keyword)
+        payload = self.payloads[key] = (filt, keyb)
+        self.payloads.move_to_end(key)  # type: ignore
+        while len(self.payloads) > self.__max_payloads:
+            self.payloads.popitem(last=False)  # type: ignore
+
+        return payload
+
+    def uncache_payloads(self, chat_id: int, *keywords: str) -> None:
+        """Drop the given keywords of the chat, or all of them if none are given"""
+        if not keywords:
+            keywords = tuple(keyword for cid, keyword in self.payloads if cid == chat_id)
+
+        self.payloads_generation += 1
+        for keyword in keywords:
+            self.payloads.pop((chat_id, keyword), None)
+
+    def compile_trigger(self, chat_id: int) -> None:
+        """Combine all triggers of the chat into a single case-insensitive pattern.
+
+        Triggers are told apart by their lowered form, ``cmd_filter`` never keeps two
+        that only differ in case.
+        """
+        triggers = self.trigger.get(chat_id)
+        if not triggers:
+            self.patterns.pop(chat_id, None)
+            return
+
+        # Longest first, so a trigger never shadows a longer one starting at the same position
+        alternation = "|".join(re.escape(i) for i in sorted(triggers, key=len, reverse=True))
+        self.patterns[chat_id] = (
+            re.compile(rf"(?<!\w)(?:{alternation})(?!\w)", flags=re.IGNORECASE),
+            {i.lower(): i for i in triggers},
+        )
 
     @listener.priority(95)
+    @listener.concurrent()
     async def on_message(self, message: Message) -> None:
         if message.outgoing:
             return
@@ -89,75 +161,90 @@ class Filters(plugin.Plugin):
         if not (text or chat):
             return
 
-        chat_trigger = self.trigger.get(chat.id, [])
-        if not chat_trigger:
+        compiled = self.patterns.get(chat.id)
+        if not compiled:
             return
 
-        await self.reply_filter(message, set(chat_trigger), text)
+        await self.reply_filter(message, compiled, text)
 
-    async def reply_filter(self, message: Message, trigger: Set[str], text: str):
+    async def reply_filter(
+        self, message: Message, compiled: Tuple[Pattern[str], Mapping[str, str]], text: str
+    ):
         if not text or text.startswith("/filter") or text.startswith("/stop"):
             return  # Igonore when command triggered
-        for i in trigger:
-            pattern = r"( |^|[^\w])" + re.escape(i) + r"( |$|[^\w])"
-            if re.search(pattern, text, flags=re.IGNORECASE):
-                filt = await self.get_filter(message.chat.id, i)
-                if not filt:
-                    return
-
-                # This checks data for old filters schema
-                # TODO: deprecate old schema on v3
-                if isinstance(filt, str):
-                    await message.reply_text(filt)
+
+        pattern, triggers = compiled
+        match = pattern.search(text)
+        if not match:
+            return
+
+        i = triggers.get(match.group(0).lower())
+        if i is None:  # lower() disagrees with the regex case folding, e.g. 'ſ' and 's'
+            i = next(
+                t for t in triggers.values() if re.fullmatch(re.escape(t), match.group(0), re.I)
+            )
+
+        payload = await self.get_filter(message.chat.id, i)
+        if not payload:
+            return
+
+        filt, keyb = payload
+        # This checks data for old filters schema
+        # TODO: deprecate old schema on v3
+        if isinstance(filt, str):
+            await message.reply_text(filt)
+        else:
+            reply_to = message.reply_to_message.id if message.reply_to_message else message.id
+            types: int = filt["type"]
+            try:
+                if types in {Types.TEXT, Types.BUTTON_TEXT}:
+                    await self.SEND[types](
+                        message.chat.id,
+                        filt["text"],
+                        reply_to_message_id=reply_to,
+                        reply_markup=keyb,
+                    )
+                elif types in {Types.STICKER, Types.ANIMATION}:
+                    await self.SEND[types](
+                        message.chat.id,
+                        filt["content"],
+                        reply_to_message_id=reply_to,
+                    )
                 else:
-                    reply_to = (
-                        message.reply_to_message.id if message.reply_to_message else message.id
+                    await self.SEND[types](
+                        message.chat.id,
+                        filt["content"],
+                        caption=filt["text"],
+                        reply_to_message_id=reply_to,
+                        reply_markup=keyb,
                     )
-                    types: int = filt["type"]
-                    button = filt.get("buttons", None)
-                    if button:
-                        keyb = build_button(button)
-                    else:
-                        keyb = button
-
-                    try:
-                        if types in {Types.TEXT, Types.BUTTON_TEXT}:
-                            await self.SEND[types](
-                                message.chat.id,
-                                filt["text"],
-                                reply_to_message_id=reply_to,
-                                reply_markup=keyb,
-                            )
-                        elif types in {Types.STICKER, Types.ANIMATION}:
-                            await self.SEND[types](
-                                message.chat.id,
-                                filt["content"],
-                                reply_to_message_id=reply_to,
-                            )
-                        else:
-                            await self.SEND[types](
-                                message.chat.id,
-                                filt["content"],
-                                caption=filt["text"],
-                                reply_to_message_id=reply_to,
-                                reply_markup=keyb,
-                            )
-                    except MediaEmpty:
-                        await self.bot.client.send_message(
-                            message.chat.id, await self.text(message.chat.id, "notes-expired")
-                        )
-                    except MessageEmpty:
-                        self.log.warning(
-                            "Filter message empty on %s with data %s", message.chat.id, filt
-                        )
-                break
-
-    async def get_filter(self, chat_id: int, keyword: str) -> Optional[str]:
+            except MediaEmpty:
+                await self.bot.client.send_message(
+                    message.chat.id, await self.text(message.chat.id, "notes-expired")
+                )
+            except MessageEmpty:
+                self.log.warning("Filter message empty on %s with data %s", message.chat.id, filt)
+
+    async def get_filter(self, chat_id: int, keyword: str) -> Optional[Payload]:
+        key = (chat_id, keyword)
+        payload = self.payloads.get(key)
+        if payload is not None:
+            self.payloads.move_to_end(key)  # type: ignore
+            return payload
+
+        generation = self.payloads_generation
         data = await self.db.find_one(
             {"chat_id": chat_id, f"trigger.{keyword}": {"$exists": True}},
             {f"trigger.{keyword}": 1},
         )
-        return data["trigger"][keyword] if data else None
+        if not data:
+            return None
+
+        if generation != self.payloads_generation:
+            # The filter changed while we were reading, don't replace it with a stale one
+            return self.payloads.get(key)
+
+        return self.cache_payload(chat_id, keyword, data["trigger"][keyword])
 
     async def del_filter(self, chat_id: int, keyword: str) -> Tuple[bool, str]:
         filt = self.trigger.get(chat_id)
@@ -171,6 +258,8 @@ class Filters(plugin.Plugin):
             {"$unset": {f"trigger.{keyword}": ""}},
         )
         self.trigger[chat_id].remove(keyword)
+        self.compile_trigger(chat_id)
+        self.uncache_payloads(chat_id, keyword)
         return True, ""
 
     @command.filters(filters.admin_only)
@@ -190,29 +279,29 @@ class Filters(plugin.Plugin):
             return await self.text(chat.id, "err-illegal-trigger")
 
         text, types, content, buttons = get_message_info(ctx.msg)
+        filt = {"text": text, "type": types, "content": content, "buttons": buttons}
+        update: MutableMapping[str, Any] = {"$set": {f"trigger.{trigger}": filt}}
+
+        # Triggers match regardless of case, so one differing only in case is replaced
+        triggers = self.trigger.setdefault(chat.id, set())
+        replaced = [i for i in triggers if i != trigger and i.lower() == trigger.lower()]
+        if replaced:
+            update["$unset"] = {f"trigger.{i}": "" for i in replaced}
+
         _, ret = await asyncio.gather(
-            self.db.update_one(
-                {"chat_id": chat.id},
-                {
-                    "$set": {
-                        f"trigger.{trigger}": {
-                            "text": text,
-                            "type": types,
-                            "content": content,
-                            "buttons": buttons,
-                        }
-                    }
-                },
-                upsert=True,
-            ),
+            self.db.update_one({"chat_id": chat.id}, update, upsert=True),
             self.text(chat.id, "filters-added", trigger),
         )
 
-        if self.trigger.get(chat.id):
-            self.trigger[chat.id].add(trigger)
-        else:
-            self.trigger[chat.id] = {trigger}
+        if replaced:
+            triggers.difference_update(replaced)
+            self.uncache_payloads(chat.id, *replaced)
+
+        triggers.add(trigger)
 
+        self.compile_trigger(chat.id)
+        self.payloads_generation += 1
+        self.cache_payload(chat.id, trigger, filt)
         return ret
 
     @command.filters(filters.admin_only)
@@ -230,6 +319,8 @@ class Filters(plugin.Plugin):
     async def cmd_rmallfilter(self, ctx: command.Context) -> str:
         chat_id = ctx.chat.id
         triggers = self.trigger.pop(chat_id, None)
+        self.patterns.pop(chat_id, None)
+        self.uncache_payloads(chat_id)
         if not triggers:
             return await self.text(chat_id, "filters-chat-nofilter")
         await self.db.delete_one({"chat_id": chat_id})
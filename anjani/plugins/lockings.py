@@ -16,32 +16,18 @@
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
 import time
-import unicodedata as ud
 from collections import OrderedDict
 from datetime import datetime
-from typing import (
-    Any,
-    Callable,
-    ClassVar,
-    Coroutine,
-    List,
-    MutableMapping,
-    Optional,
-    Set,
-    Union,
-)
+from typing import Any, ClassVar, List, Mapping, MutableMapping, Optional, Tuple
 
-from pyrogram.client import Client
 from pyrogram.enums.chat_member_status import ChatMemberStatus
 from pyrogram.enums.chat_type import ChatType
 from pyrogram.enums.message_entity_type import MessageEntityType
 from pyrogram.errors import (
-    ChannelPrivate,
     ChatAdminRequired,
     ChatNotModified,
     MessageDeleteForbidden,
     MessageIdInvalid,
-    PeerIdInvalid,
     UserNotParticipant,
 )
 from pyrogram.types import Chat, ChatPermissions, Message
@@ -49,58 +35,78 @@ from pyrogram.types import Chat, ChatPermissions, Message
 from anjani import command, filters, listener, plugin, util
 
 
-async def anon(_: Client, message: Message) -> bool:
-    return bool(message.sender_chat)
-
-
-async def button(_: Client, message: Message) -> bool:
-    return bool(message.reply_markup)
-
-
-async def rtl(_: Client, message: Message) -> bool:
-    text = message.text or message.caption
-    if not text:
-        return False
-
-    checkers = await Lockings.detect_alphabet(text)
-    return "arabic" in checkers or "hebrew" in checkers
-
-
-async def url(_: Client, message: Message) -> bool:
-    if not message.entities:
-        return False
-
-    for entity in message.entities:
-        if entity.type == MessageEntityType.URL:
-            return True
-
-    return False
-
-
+# Bit of each lock type, shared by the chat locks and the message features
 LOCK_TYPES = OrderedDict(
-    sorted(
-        {
-            "audio": filters.audio,
-            "animation": filters.animation,
-            "document": filters.document,
-            "forward": filters.forwarded,
-            "photo": filters.photo,
-            "sticker": filters.sticker,
-            "video": filters.video,
-            "contact": filters.contact,
-            "location": filters.location,
-            "venue": filters.venue,
-            "game": filters.game,
-            "dice": filters.dice,
-            "button": button,
-            "inline": filters.via_bot,
-            "url": url,
-            "bots": "bots",
-            "rtl": rtl,
-            "anon": anon,
-        }.items()
+    (lock_type, 1 << index)
+    for index, lock_type in enumerate(
+        sorted(
+            {
+                "audio",
+                "animation",
+                "document",
+                "forward",
+                "photo",
+                "sticker",
+                "video",
+                "contact",
+                "location",
+                "venue",
+                "game",
+                "dice",
+                "button",
+                "inline",
+                "url",
+                "bots",
+                "rtl",
+                "anon",
+            }
+        )
     )
 )
+# Lock types matched by the media attribute of the same name
+MEDIA_LOCKS = (
+    "audio",
+    "animation",
+    "document",
+    "photo",
+    "sticker",
+    "video",
+    "contact",
+    "location",
+    "venue",
+    "game",
+    "dice",
+)
+
+
+def get_message_features(message: Message, wanted: int) -> int:
+    """Compute the lock bits matching the message, only for the ``wanted`` locks"""
+    features = 0
+    if message.media:
+        for lock_type in MEDIA_LOCKS:
+            if getattr(message, lock_type, None):
+                features |= LOCK_TYPES[lock_type]
+
+    if message.forward_date:
+        features |= LOCK_TYPES["forward"]
+    if message.reply_markup:
+        features |= LOCK_TYPES["button"]
+    if message.via_bot:
+        features |= LOCK_TYPES["inline"]
+    if message.sender_chat:
+        features |= LOCK_TYPES["anon"]
+    if message.entities and any(
+        entity.type == MessageEntityType.URL for entity in message.entities
+    ):
+        features |= LOCK_TYPES["url"]
+
+    # Script detection is the only expensive one, skip it when not locked
+    if wanted & LOCK_TYPES["rtl"]:
+        text = message.text or message.caption
+        if text and util.script.is_rtl(text):
+            features |= LOCK_TYPES["rtl"]
+
+    return features & wanted
 
 
 class Lockings(plugin.Plugin):
@@ -108,15 +114,26 @@ class Lockings(plugin.Plugin):
     helpable: ClassVar[bool] = True
 
     db: util.db.AsyncCollection
+    db_cache: util.db.SettingsCache
     restrictions: MutableMapping[str, MutableMapping[str, MutableMapping[str, bool]]]
+    # Settings document a lock mask has been computed from, by chat
+    lock_masks: MutableMapping[int, Tuple[Mapping[str, Any], int]]
 
     async def on_load(self) -> None:
+        # The rtl lock looks the letters up in the script table, build it off the loop
+        await util.run_sync(util.script.get_table, pool="cpu")
         self.db = self.bot.db.get_collection("LOCKINGS")
+        self.db_cache = util.db.SettingsCache(self.db)
+        self.db_cache.start()
+        self.lock_masks = {}
         self.restrictions = {
             "lock": self.get_restrictions("lock"),
             "unlock": self.get_restrictions("unlock"),
         }
 
+    async def on_stop(self) -> None:
+        self.db_cache.stop()
+
     async def on_chat_migrate(self, message: Message) -> None:
         new_chat = message.chat.id
         old_chat = message.migrate_from_chat_id
@@ -125,6 +142,7 @@ class Lockings(plugin.Plugin):
             {"chat_id": old_chat},
             {"$set": {"chat_id": new_chat}},
         )
+        self.db_cache.invalidate(old_chat, new_chat)
 
     async def on_plugin_backup(self, chat_id: int) -> MutableMapping[str, Any]:
         data = await self.db.find_one({"chat_id": chat_id}, {"_id": False})
@@ -132,6 +150,7 @@ class Lockings(plugin.Plugin):
 
     async def on_plugin_restore(self, chat_id: int, data: MutableMapping[str, Any]) -> None:
         await self.db.update_one({"chat_id": chat_id}, {"$set": data[self.name]}, upsert=True)
+        self.db_cache.invalidate(chat_id)
 
     @listener.priority(95)
     async def on_message(self, message: Message) -> None:
@@ -152,37 +171,28 @@ class Lockings(plugin.Plugin):
                 # Linked channel group
                 return
 
-        if user:
-            try:
-                target = await chat.get_member(user.id)
-            except (ChatAdminRequired, ChannelPrivate, PeerIdInvalid, UserNotParticipant):
-                pass
-            else:
-                if target.status in (ChatMemberStatus.ADMINISTRATOR, ChatMemberStatus.OWNER):
-                    return
+        if user and await util.tg.is_admin(self.bot.client, chat.id, user.id):
+            return
 
-        locked = await self.get_chat_restrictions(chat.id)
-        for lock_type in locked:
-            try:
-                func: Union[
-                    str, Callable[[Client, Message], Coroutine[Any, Any, bool]]
-                ] = LOCK_TYPES[lock_type]
-                if not callable(func):
-                    continue
-
-                if await func(self.bot.client, message):
-                    await message.delete()
-            except MessageDeleteForbidden:
-                await self.bot.respond(
-                    message,
-                    await self.get_text(chat.id, "lockings-failed-to-delete", lock_type=lock_type),
-                    quote=True,
-                )
-            except MessageIdInvalid:
-                continue
-            except Exception as e:  # skipcq: PYL-W0703
-                self.log.error(e, exc_info=e)
-                continue
+        locks = await self.get_lock_mask(chat.id)
+        if not locks:
+            return
+
+        matched = get_message_features(message, locks)
+        if not matched:
+            return
+
+        try:
+            await message.delete()
+        except MessageDeleteForbidden:
+            lock_type = next(name for name, bit in LOCK_TYPES.items() if matched & bit)
+            await self.bot.respond(
+                message,
+                await self.get_text(chat.id, "lockings-failed-to-delete", lock_type=lock_type),
+                quote=True,
+            )
+        except MessageIdInvalid:
+            pass
 
     async def on_chat_action(self, action: Message) -> None:
         chat = action.chat
@@ -218,10 +228,6 @@ class Lockings(plugin.Plugin):
             except UserNotParticipant:  # Bot probably kicked already
                 continue
 
-    @staticmethod
-    async def detect_alphabet(ustring: str) -> Set[str]:
-        return {ud.name(char).split(" ")[0].lower() for char in ustring if char.isalpha()}
-
     @staticmethod
     def get_mode(mode: str) -> bool:
         return mode != "lock"
@@ -274,8 +280,27 @@ class Lockings(plugin.Plugin):
         )
 
     async def get_chat_restrictions(self, chat_id: int) -> List[str]:
-        data = await self.db.find_one({"chat_id": chat_id}, {"type": 1})
-        return data["type"] if data else []
+        data = await self.db_cache.get(chat_id)
+        return data.get("type", []) if data else []
+
+    async def get_lock_mask(self, chat_id: int) -> int:
+        """Get the locks of the chat as a bitmask of LOCK_TYPES"""
+        data = await self.db_cache.get(chat_id)
+        if not data:
+            self.lock_masks.pop(chat_id, None)
+            return 0
+
+        # Settings cache returns the same document until it's changed
+        cached = self.lock_masks.get(chat_id)
+        if cached is not None and cached[0] is data:
+            return cached[1]
+
+        mask = 0
+        for lock_type in data.get("type", []):
+            mask |= LOCK_TYPES.get(lock_type, 0)
+
+        self.lock_masks[chat_id] = (data, mask)
+        return mask
 
     def unpack_permissions(
         self, permissions: MutableMapping[str, bool], mode: str, lock_type: str
@@ -297,6 +322,7 @@ class Lockings(plugin.Plugin):
             raise ValueError("Invalid mode")
 
         await self.db.update_one({"chat_id": chat_id}, {aggregation: {"type": types}}, upsert=True)
+        self.db_cache.invalidate(chat_id)
 
     @command.filters(filters.admin_only, aliases={"listlocks", "locks", "locked", "locklist"})
     async def cmd_list_locks(self, ctx: command.Context) -> str:
@@ -24,15 +24,19 @@ from aiopath import AsyncPath
 from bson.binary import Binary
 from pyrogram.enums.chat_type import ChatType
 from pyrogram.enums.parse_mode import ParseMode
+from pymongo.errors import PyMongoError
 from pyrogram.errors import (
     ChannelInvalid,
     ChannelPrivate,
+    FloodWait,
     MessageDeleteForbidden,
     MessageNotModified,
+    RPCError,
 )
 from pyrogram.raw.functions.updates.get_state import GetState
 from pyrogram.types import (
     CallbackQuery,
+    ChatMemberUpdated,
     InlineKeyboardButton,
     InlineKeyboardMarkup,
     Message,
@@ -51,10 +55,16 @@ class Main(plugin.Plugin):
 
     bot_name: str
     db: util.db.AsyncCollection
+    _prewarm_task: Optional[asyncio.Task[None]]
+
+    # Chats whose bot membership is cached on start, the most active first
+    __prewarm_chats: int = 1000
+    __prewarm_interval: float = 0.1
 
     async def on_load(self) -> None:
         self.db = self.bot.db.get_collection("SESSION")
         self.ani = self.bot.db.get_collection("ANILIST")
+        self._prewarm_task = None
 
     async def get_data(self, key: str, value: Any) -> Optional[MutableMapping[str, Any]]:
         return await self.ani.find_one({key: value})
@@ -69,6 +79,7 @@ class Main(plugin.Plugin):
             if self.bot.user.last_name
             else self.bot.user.first_name
         )
+        self._prewarm_task = self.bot.loop.create_task(self._prewarm_members())
 
         restart = await self.db.find_one({"_id": 5})
         if restart is not None:
@@ -103,7 +114,42 @@ class Main(plugin.Plugin):
         else:
             await self.send_to_log("Starting system...")
 
+    async def _prewarm_members(self) -> None:
+        """Cache the bot's own membership of the most active chats, so the
+        permission checks there don't need a call after a restart"""
+        chats = self.bot.db.get_collection("CHATS")
+        cursor = (
+            chats.find({}, {"chat_id": True})
+            .sort("last_update", direction=-1)
+            .limit(self.__prewarm_chats)
+        )
+        count = 0
+        try:
+            async for data in cursor:
+                try:
+                    await util.tg.get_chat_member(self.bot.client, data["chat_id"], "me")
+                except FloodWait as flood:
+                    await asyncio.sleep(flood.value)  # type: ignore
+                except RPCError:
+                    # Not a member anymore, or the chat is gone
+                    continue
+                except Exception as e:  # skipcq: PYL-W0703
+                    # Most likely a stale chat id that can't be resolved
+                    self.log.warning(f"Failed to prewarm chat {data['chat_id']}: {e}")
+                    continue
+                else:
+                    count += 1
+
+                await asyncio.sleep(self.__prewarm_interval)
+        except PyMongoError as e:
+            self.log.warning(f"Failed to read the chats to prewarm: {e}")
+
+        self.log.debug(f"Cached the bot membership of {count} chats")
+
     async def on_stop(self) -> None:
+        if self._prewarm_task:
+            self._prewarm_task.cancel()
+
         async with asyncio.Lock():
             file = AsyncPath("anjani/anjani.session")
             if not await file.exists():
@@ -166,6 +212,22 @@ class Main(plugin.Plugin):
 
         return pairs
 
+    @listener.priority(1)
+    async def on_chat_member_update(self, update: ChatMemberUpdated) -> None:
+        """Keep the member caches in sync before other listeners see the update"""
+        util.tg.MEMBERS.update(update)
+        util.tg.ADMINS.update(update)
+
+    @listener.priority(1)
+    async def on_chat_action(self, message: Message) -> None:
+        if message.left_chat_member and message.left_chat_member.id == self.bot.uid:
+            util.tg.MEMBERS.invalidate(message.chat.id)
+            util.tg.ADMINS.invalidate(message.chat.id)
+
+    async def on_chat_migrate(self, message: Message) -> None:
+        util.tg.MEMBERS.invalidate(message.migrate_from_chat_id)
+        util.tg.ADMINS.invalidate(message.migrate_from_chat_id)
+
     @listener.filters(filters.regex(r"help_(.*)"))
     async def on_callback_query(self, query: CallbackQuery) -> None:
         """Bot helper button"""
@@ -115,6 +115,7 @@ class Misc(plugin.Plugin):
         return out_str
 
     @listener.priority(95)
+    @listener.concurrent()
     @listener.filters(~filters.outgoing)
     async def on_message(self, message: Message) -> None:
         if message.text is not None and isinstance(message.text, str):
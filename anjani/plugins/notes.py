@@ -78,6 +78,7 @@ class Notes(plugin.Plugin):
         await self.db.update_one({"chat_id": chat_id}, {"$set": data[self.name]}, upsert=True)
 
     @listener.priority(95)
+    @listener.concurrent()
     @listener.filters(filters.regex(r"^#[\w\-]+(?!\n)$") & ~filters.outgoing)
     async def on_message(self, message: Message) -> None:
         """Notes hashtag trigger."""
@@ -31,11 +31,21 @@ class Reporting(plugin.Plugin):
     helpable = True
 
     db: util.db.AsyncCollection
+    db_cache: util.db.SettingsCache
     user_db: util.db.AsyncCollection
+    user_db_cache: util.db.SettingsCache
 
     async def on_load(self) -> None:
         self.db = self.bot.db.get_collection("CHAT_REPORTING")
+        self.db_cache = util.db.SettingsCache(self.db)
+        self.db_cache.start()
         self.user_db = self.bot.db.get_collection("USER_REPORTING")
+        self.user_db_cache = util.db.SettingsCache(self.user_db, "_id")
+        self.user_db_cache.start()
+
+    async def on_stop(self) -> None:
+        self.db_cache.stop()
+        self.user_db_cache.stop()
 
     async def on_chat_migrate(self, message: Message) -> None:
         new_chat = message.chat.id
@@ -45,6 +55,7 @@ class Reporting(plugin.Plugin):
             {"chat_id": old_chat},
             {"$set": {"chat_id": new_chat}},
         )
+        self.db_cache.invalidate(old_chat, new_chat)
 
     async def on_plugin_backup(self, chat_id: int) -> MutableMapping[str, Any]:
         report = await self.db.find_one({"chat_id": chat_id}, {"_id": False})
@@ -52,7 +63,9 @@ class Reporting(plugin.Plugin):
 
     async def on_plugin_restore(self, chat_id: int, data: MutableMapping[str, Any]) -> None:
         await self.db.update_one({"chat_id": chat_id}, {"$set": data[self.name]}, upsert=True)
+        self.db_cache.invalidate(chat_id)
 
+    @listener.concurrent()
     @listener.filters(filters.regex(r"(?i)^@admin(s)?\b") & filters.group & ~filters.outgoing)
     async def on_message(self, message: Message) -> None:
         chat = message.chat
@@ -64,12 +77,8 @@ class Reporting(plugin.Plugin):
         if not user:
             return
 
-        try:
-            invoker = await chat.get_member(user.id)
-            if invoker.status in {ChatMemberStatus.OWNER, ChatMemberStatus.ADMINISTRATOR}:
-                return  # ignore command from admins
-        except UserNotParticipant:
-            pass  # keep going when user is not a member
+        if await util.tg.is_admin(self.bot.client, chat.id, user.id):
+            return  # ignore command from admins
 
         if not message.reply_to_message:
             await message.reply(await self.text(chat.id, "no-report-user"))
@@ -87,7 +96,7 @@ class Reporting(plugin.Plugin):
             return
 
         try:
-            member = await chat.get_member(reported_user.id)
+            member = await util.tg.get_chat_member(self.bot.client, chat.id, reported_user.id)
         except UserNotParticipant:
             await message.reply_text(await self.text(chat.id, "user-not-in-chat"))
             return
@@ -98,9 +107,10 @@ class Reporting(plugin.Plugin):
 
         reply_text = await self.text(chat.id, "report-notif", reported_user.mention)
         slots = 4096 - len(reply_text)
-        async for admin in util.tg.get_chat_admins(self.bot.client, chat.id, exclude_bot=True):
-            if await self.is_active(admin.user.id, True):
-                reply_text += f"[\u200b](tg://user?id={admin.user.id})"
+        admins = await util.tg.get_admin_ids(self.bot.client, chat.id, exclude_bot=True)
+        for admin in admins or ():
+            if await self.is_active(admin, True):
+                reply_text += f"[\u200b](tg://user?id={admin})"
 
             slots -= 1
             if slots == 0:
@@ -113,16 +123,18 @@ class Reporting(plugin.Plugin):
             await self.user_db.update_one(
                 {"_id": chat_id}, {"$set": {"setting": setting}}, upsert=True
             )
+            self.user_db_cache.invalidate(chat_id)
             return
 
         await self.db.update_one({"chat_id": chat_id}, {"$set": {"setting": setting}}, upsert=True)
+        self.db_cache.invalidate(chat_id)
 
     async def is_active(self, uid: int, is_private: bool) -> bool:
         """Get current setting default to True"""
         if is_private:
-            data = await self.user_db.find_one({"_id": uid})
+            data = await self.user_db_cache.get(uid)
         else:
-            data = await self.db.find_one({"chat_id": uid})
+            data = await self.db_cache.get(uid)
         if not data:
             return True
 
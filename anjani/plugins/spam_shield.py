@@ -16,15 +16,10 @@
 
 import asyncio
 from datetime import datetime
-from json import JSONDecodeError
-from typing import Any, ClassVar, List, MutableMapping, Optional
-
-from aiohttp import (
-    ClientConnectorError,
-    ClientOSError,
-    ClientResponseError,
-    ContentTypeError,
-)
+from functools import partial
+from typing import TYPE_CHECKING, Any, ClassVar, List, MutableMapping, Optional
+
+from aiohttp import ClientResponseError
 from pyrogram.errors import (
     BadRequest,
     ChannelPrivate,
@@ -34,13 +29,13 @@ from pyrogram.errors import (
 )
 from pyrogram.types import Chat, Message, User
 
-try:
-    from userbotindo import get_trust
-except ImportError:
-    from anjani.util.misc import do_nothing as get_trust
-
 from anjani import command, filters, listener, plugin, util
+from anjani.util.circuit_breaker import CircuitBreaker
 from anjani.util.misc import StopPropagation
+from anjani.util.verdict_cache import VerdictCache
+
+if TYPE_CHECKING:
+    from anjani.internal_plugins.spam_prediction import SpamPrediction
 
 
 class SpamShield(plugin.Plugin):
@@ -48,9 +43,13 @@ class SpamShield(plugin.Plugin):
     helpable: ClassVar[bool] = True
 
     db: util.db.AsyncCollection
-    federation_db: util.db.AsyncCollection
+    db_cache: util.db.SettingsCache
+    fed_bans_db: util.db.AsyncCollection
     token: Optional[str]
     spam_protection: bool
+    verdicts: VerdictCache
+    cas_breaker: CircuitBreaker
+    sw_breaker: CircuitBreaker
 
     async def on_load(self) -> None:
         self.token = self.bot.config.SW_API
@@ -58,10 +57,21 @@ class SpamShield(plugin.Plugin):
             self.bot.log.warning("SpamWatch API token not exist")
 
         self.db = self.bot.db.get_collection("GBAN_SETTINGS")  # spamshield autoban
-        self.federation_db = self.bot.db.get_collection("FEDERATIONS")
+        self.db_cache = util.db.SettingsCache(self.db)
+        self.db_cache.start()
+        self.fed_bans_db = self.bot.db.get_collection("FED_BANS")
         self.user_db = self.bot.db.get_collection("USERS")
         self.spam_protection = "SpamPredict" in self.bot.plugins
 
+        self.verdicts = VerdictCache(self.bot.db.get_collection("SPAM_VERDICTS"))
+        await self.verdicts.setup()
+        # Both services are called on the message path, fail fast when they're down
+        self.cas_breaker = CircuitBreaker("cas", timeout=5)
+        self.sw_breaker = CircuitBreaker("spamwatch", timeout=5)
+
+    async def on_stop(self) -> None:
+        self.db_cache.stop()
+
     async def on_chat_migrate(self, message: Message) -> None:
         new_chat = message.chat.id
         old_chat = message.migrate_from_chat_id
@@ -70,6 +80,7 @@ class SpamShield(plugin.Plugin):
             {"chat_id": old_chat},
             {"$set": {"chat_id": new_chat}},
         )
+        self.db_cache.invalidate(old_chat, new_chat)
 
     async def on_plugin_backup(self, chat_id: int) -> MutableMapping[str, Any]:
         setting = await self.db.find_one({"chat_id": chat_id}, {"_id": False})
@@ -77,6 +88,7 @@ class SpamShield(plugin.Plugin):
 
     async def on_plugin_restore(self, chat_id: int, data: MutableMapping[str, Any]) -> None:
         await self.db.update_one({"chat_id": chat_id}, {"$set": data[self.name]}, upsert=True)
+        self.db_cache.invalidate(chat_id)
 
     @listener.priority(90)
     async def on_chat_action(self, message: Message) -> None:
@@ -102,6 +114,7 @@ class SpamShield(plugin.Plugin):
             return
 
     @listener.priority(65)
+    @listener.concurrent()
     @listener.filters(filters.group & ~filters.outgoing)
     async def on_message(self, message: Message) -> None:
         """Checker service for message"""
@@ -116,12 +129,13 @@ class SpamShield(plugin.Plugin):
             return
 
         if self.spam_protection:
-            sample = await self.user_db.find_one({"_id": user.id}, {"pred_sample": 1, "spam": 1})
-            if sample and not sample.get("spam", False):
-                trust = get_trust(sample.get("pred_sample", []))
-                if trust and trust < 5.0:
-                    self.log.debug(f"{user.id} has low trust score, flaging as spam")
-                    await self.user_db.update_one({"_id": user.id}, {"$set": {"spam": True}})
+            # Trust scores are kept up to date by SpamPredict as samples are collected
+            plug: Optional["SpamPrediction"] = self.bot.plugins.get("SpamPredict")  # type: ignore
+            if plug and user.id in plug.low_trust:
+                self.log.debug(f"{user.id} has low trust score, flaging as spam")
+                await self.user_db.update_one({"_id": user.id}, {"$set": {"spam": True}})
+                # Only forget the user once flagged, a failed write is retried next message
+                plug.low_trust.pop(user.id, None)
 
         try:
             me, target = await util.tg.fetch_permissions(self.bot.client, chat.id, user.id)
@@ -137,91 +151,58 @@ class SpamShield(plugin.Plugin):
         except (ChannelPrivate, ChatAdminRequired, PeerIdInvalid, UserNotParticipant):
             return
 
-    async def get_ban(self, user_id: int) -> MutableMapping[str, Any]:
-        if not self.token:
-            return {}
-
+    async def _fetch_ban(self, user_id: int) -> MutableMapping[str, Any]:
         path = f"https://api.spamwat.ch/banlist/{user_id}"
         headers = {"Authorization": f"Bearer {self.token}"}
-        try:
-            async with self.bot.http.get(path, headers=headers) as resp:
-                if resp.status in {200, 201}:
-                    return await resp.json()
-
-                if resp.status == 404:
-                    return {}
-
-                if resp.status == 401:
-                    self.log.error(
-                        "Spamwatch API error",
-                        exc_info=ClientResponseError(
-                            resp.request_info,
-                            resp.history,
-                            message="Make sure your Spamwatch API token is corret",
-                        ),
-                    )
-                    return {}
-
-                if resp.status == 403:
-                    self.log.error(
-                        "Spamwatch API error",
-                        exc_info=ClientResponseError(
-                            resp.request_info,
-                            resp.history,
-                            message="Forbidden, your token permissions is not valid",
-                        ),
-                    )
-                    return {}
-
-                if resp.status == 429:
-                    self.log.warning(
-                        "Spamwatch API error",
-                        exc_info=ClientResponseError(
-                            resp.request_info,
-                            resp.history,
-                            message="There were problems with request... Too many.",
-                        ),
-                    )
-                    return {}
+        async with self.bot.http.get(path, headers=headers) as resp:
+            if resp.status in {200, 201}:
+                return await resp.json()
 
-                self.log.error(
-                    f"Unknown Spamwatch API error: Received {resp.status}",
-                    exc_info=ClientResponseError(resp.request_info, resp.history),
-                )
+            if resp.status == 404:
                 return {}
-        except ClientConnectorError:
+
+            if resp.status == 401:
+                message = "Make sure your Spamwatch API token is corret"
+            elif resp.status == 403:
+                message = "Forbidden, your token permissions is not valid"
+            elif resp.status == 429:
+                message = "There were problems with request... Too many."
+            else:
+                message = f"Unknown Spamwatch API error: Received {resp.status}"
+
+            err = ClientResponseError(
+                resp.request_info, resp.history, status=resp.status, message=message
+            )
+            if resp.status == 429:
+                self.log.warning("Spamwatch API error", exc_info=err)
+            else:
+                self.log.error("Spamwatch API error", exc_info=err)
+
+            raise err
+
+    async def get_ban(self, user_id: int) -> MutableMapping[str, Any]:
+        """Check on SpamWatch"""
+        if not self.token:
             return {}
 
+        return await self.verdicts.get(
+            "spamwatch", user_id, partial(self.sw_breaker.call, self._fetch_ban, user_id), {}
+        )
+
+    async def _fetch_cas(self, user_id: int) -> Optional[str]:
+        async with self.bot.http.get(f"https://api.cas.chat/check?user_id={user_id}") as res:
+            data = await res.json()
+
+        if data["ok"]:
+            return f"https://cas.chat/query?u={user_id}"
+
+        return None
+
     async def cas_check(self, user: User) -> Optional[str]:
         """Check on CAS"""
-        retry = 0
-        while True:
-            try:
-                async with self.bot.http.get(
-                    f"https://api.cas.chat/check?user_id={user.id}"
-                ) as res:
-                    data = await res.json()
-                    if data["ok"]:
-                        reason = f"https://cas.chat/query?u={user.id}"
-                        return reason
-
-                    return None
-            except (ContentTypeError, JSONDecodeError):
-                if retry == 5:
-                    self.log.debug("Error parsing CAS response")
-                    return None
-
-                retry += 1
-                await asyncio.sleep(1)
-                self.log.debug("Invalid data received from CAS server, retrying...")
-            except ClientOSError:
-                if retry == 10:
-                    self.log.debug("Error connecting to CAS API")
-                    return None
-
-                retry += 1
-                await asyncio.sleep(0.5)
-                self.log.debug(f"Retrying CAS check for {user.id}")
+        return await self.verdicts.get(
+            "cas", user.id, partial(self.cas_breaker.call, self._fetch_cas, user.id)
+        )
 
     async def check_spam(self, uid: int) -> bool:
         if not self.spam_protection:
@@ -231,24 +212,24 @@ class SpamShield(plugin.Plugin):
 
     async def is_active(self, chat_id: int) -> bool:
         """Return SpamShield setting"""
-        data = await self.db.find_one({"chat_id": chat_id})
+        data = await self.db_cache.get(chat_id)
         return data["setting"] if data else True
 
     async def ban(self, chat: Chat, user: User, reason: str) -> None:
         fullname = user.first_name + user.last_name if user.last_name else user.first_name
         await asyncio.gather(
             chat.ban_member(user.id),
-            self.federation_db.update_one(
-                {"_id": "AnjaniSpamShield"},
+            self.fed_bans_db.update_one(
+                {"fed_id": "AnjaniSpamShield", "target_id": user.id},
                 {
                     "$set": {
-                        f"banned.{user.id}": {
-                            "name": fullname,
-                            "reason": "Automated fban " + reason,
-                            "time": datetime.now(),
-                        }
+                        "type": "user",
+                        "name": fullname,
+                        "reason": "Automated fban " + reason,
+                        "time": datetime.now(),
                     }
                 },
+                upsert=True,
             ),
         )
 
@@ -259,6 +240,8 @@ class SpamShield(plugin.Plugin):
         else:
             await self.db.delete_one({"chat_id": chat_id})
 
+        self.db_cache.invalidate(chat_id)
+
     async def check(self, user: User, chat: Chat, message: Message) -> bool:
         """Shield checker action."""
         cas, sw, spam = await asyncio.gather(
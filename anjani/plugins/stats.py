@@ -15,12 +15,14 @@
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
 import asyncio
-from typing import Any, ClassVar, List, Mapping, Optional
+from collections import Counter
+from typing import Any, ClassVar, List, Mapping, MutableMapping, Optional
 
+from pymongo.errors import PyMongoError
 from pyrogram.enums.parse_mode import ParseMode
 from pyrogram.types import Message
 
-from anjani import command, filters, plugin, util
+from anjani import command, filters, listener, plugin, util
 
 USEC_PER_HOUR = 60 * 60 * 1000000
 USEC_PER_DAY = USEC_PER_HOUR * 24
@@ -48,11 +50,25 @@ class PluginStats(plugin.Plugin):
 
     db: util.db.AsyncCollection
 
+    # Increments not written to the database yet
+    _pending: MutableMapping[str, int]
+    # Held while the increments are written, so reads never miss or repeat them
+    _flush_lock: asyncio.Lock
+    _flush_task: Optional[asyncio.Task[None]] = None
+    # Stops the flush loop in between flushes, cancelling it could lose the batch being written
+    _stopping: asyncio.Event
+
+    __flush_interval: int = 10
+
     async def on_load(self) -> None:
         self.db = self.bot.db.get_collection("STATS")
+        self._pending = Counter()
+        self._flush_lock = asyncio.Lock()
+        self._stopping = asyncio.Event()
         self.chats_db = self.bot.db.get_collection("CHATS")
         self.users_db = self.bot.db.get_collection("USERS")
         self.feds_db = self.bot.db.get_collection("FEDERATIONS")
+        self.fed_bans_db = self.bot.db.get_collection("FED_BANS")
 
         if await self.get("stop_time_usec") or await self.get("uptime"):
             self.log.info("Migrating stats timekeeping format")
@@ -72,9 +88,45 @@ class PluginStats(plugin.Plugin):
         if not await self.get("start_time_usec"):
             await self.put("start_time_usec", time_us)
 
-    async def on_stat_listen(self, key: str, value: int) -> None:
-        await self.inc(key, value)
+        if not self._flush_task:
+            self._flush_task = self.bot.loop.create_task(self._flush_loop())
+
+    async def on_stop(self) -> None:
+        self._stopping.set()
+        if self._flush_task:
+            await self._flush_task
+            self._flush_task = None
 
+        await self.flush()
+
+    async def on_stat_listen(self, key: str, value: int) -> None:
+        self._pending[key] += value
+
+    async def _flush_loop(self) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(self._stopping.wait(), self.__flush_interval)
+            except asyncio.TimeoutError:
+                await self.flush()
+            else:
+                return
+
+    async def flush(self) -> None:
+        """Write all pending increments with a single update"""
+        async with self._flush_lock:
+            if not self._pending:
+                return
+
+            pending, self._pending = self._pending, Counter()
+            try:
+                await self.db.update_one({"_id": 1}, {"$inc": dict(pending)}, upsert=True)
+            except PyMongoError as e:
+                self.log.error("Failed to write stats", exc_info=e)
+                # Keep them for the next flush
+                for key, value in pending.items():
+                    self._pending[key] += value
+
+    @listener.concurrent()
     async def on_message(self, message: Message) -> None:
         stat = "sent" if message.outgoing else "received"
         await self.bot.log_stat(stat)
@@ -85,8 +137,13 @@ class PluginStats(plugin.Plugin):
         await self.bot.log_stat("processed")
 
     async def get(self, key: str) -> Optional[Any]:
-        collection = await self.db.find_one({"_id": 1})
-        return collection.get(key) if collection else None
+        async with self._flush_lock:
+            collection = await self.db.find_one({"_id": 1})
+            value = collection.get(key) if collection else None
+            if key in self._pending:
+                return (value or 0) + self._pending[key]
+
+            return value
 
     async def inc(self, key: str, value: int) -> None:
         await self.db.update_one({"_id": 1}, {"$inc": {key: value}}, upsert=True)
@@ -100,8 +157,11 @@ class PluginStats(plugin.Plugin):
     @command.filters(filters.dev_only & filters.private)
     async def cmd_stats(self, ctx: command.Context) -> None:
         if ctx.input == "reset":
-            await self.db.delete_many({})
-            await self.on_load()
+            # A flush landing after the delete would bring the old counts back
+            async with self._flush_lock:
+                self._pending.clear()
+                await self.db.delete_many({})
+
             await self.on_start(util.time.usec())
             self.bot.loop.create_task(util.tg.reply_and_delete(ctx.msg, "Stats reset", 5))
             return None
@@ -138,24 +198,14 @@ class PluginStats(plugin.Plugin):
             total_users,
             total_chats,
         ) = resp
-        total_federations = 0
-        total_fbanned = 0
-        total_chat_fbanned = 0
-        pipeline: List[Mapping[str, Any]] = [
-            {
-                "$project": {
-                    "_id": 1,
-                    "name": 1,
-                    "banned_user": {"$size": {"$objectToArray": {"$ifNull": ["$banned", {}]}}},
-                    "banned_chat": {"$size": {"$objectToArray": {"$ifNull": ["$banned_chat", {}]}}},
-                }
-            }
-        ]
-
-        async for opt in self.feds_db.aggregate(pipeline=pipeline):
-            total_federations += 1
-            total_fbanned += opt.get("banned_user", 0)
-            total_chat_fbanned += opt.get("banned_chat", 0)
+        total_federations = await self.feds_db.estimated_document_count()
+        fbanned: MutableMapping[str, int] = {}
+        pipeline: List[Mapping[str, Any]] = [{"$group": {"_id": "$type", "count": {"$sum": 1}}}]
+        async for opt in self.fed_bans_db.aggregate(pipeline=pipeline):
+            fbanned[opt["_id"]] = opt["count"]
+
+        total_fbanned = fbanned.get("user", 0)
+        total_chat_fbanned = fbanned.get("chat", 0)
 
         text = f"""<b>STATS  SINCE  LAST  RESET</b>:\n
   • <b>Total Uptime Elapsed</b>: <b>{util.time.format_duration_us(uptime - downtime)}</b>
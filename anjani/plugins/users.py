@@ -19,8 +19,10 @@ import re
 from hashlib import md5
 from html import escape
 from time import time
-from typing import Any, ClassVar, List, Mapping, MutableMapping, Optional, Union
+from typing import Any, ClassVar, List, Mapping, MutableMapping, Optional, Set, Union
 
+from pymongo import UpdateOne
+from pymongo.errors import PyMongoError
 from pyrogram.enums.chat_action import ChatAction
 from pyrogram.enums.chat_type import ChatType
 from pyrogram.enums.parse_mode import ParseMode
@@ -35,6 +37,46 @@ except ImportError:
     from anjani.util.misc import do_nothing as get_trust
 
 
+class _PendingUpdate:
+    """Coalesced update of a single user or chat document"""
+
+    __slots__ = ("set", "set_on_insert", "add_to_set", "upsert", "hash")
+
+    def __init__(self) -> None:
+        self.set: MutableMapping[str, Any] = {}
+        self.set_on_insert: MutableMapping[str, Any] = {}
+        self.add_to_set: Set[int] = set()
+        self.upsert = False
+        self.hash = False
+
+    def to_operation(self, query: Mapping[str, Any], array: str) -> UpdateOne:
+        update: MutableMapping[str, Any] = {}
+        if self.set:
+            update["$set"] = self.set
+        set_on_insert = {
+            k: v
+            for k, v in self.set_on_insert.items()
+            if k not in self.set and not (k == array and self.add_to_set)
+        }
+        if set_on_insert:
+            update["$setOnInsert"] = set_on_insert
+        if self.add_to_set:
+            update["$addToSet"] = {array: {"$each": list(self.add_to_set)}}
+
+        return UpdateOne(query, update, upsert=self.upsert)
+
+    def merge(self, newer: Optional["_PendingUpdate"]) -> "_PendingUpdate":
+        """Fold a newer update of the same document into this one"""
+        if newer is not None:
+            self.set.update(newer.set)
+            self.set_on_insert.update(newer.set_on_insert)
+            self.add_to_set |= newer.add_to_set
+            self.upsert = self.upsert or newer.upsert
+            self.hash = self.hash or newer.hash
+
+        return self
+
+
 class Users(plugin.Plugin):
     name: ClassVar[str] = "Users"
 
@@ -42,48 +84,163 @@ class Users(plugin.Plugin):
     users_db: util.db.AsyncCollection
     predict_loaded: bool
 
+    # Write-behind buffers of the message tracking, flushed with bulk_write
+    _pending_users: MutableMapping[int, _PendingUpdate]
+    _pending_chats: MutableMapping[int, _PendingUpdate]
+    # Ids known to have a hash already, so we don't need to read them again
+    _hashed_users: Set[int]
+    _hashed_chats: Set[int]
+    _flush_task: Optional[asyncio.Task[None]]
+    _flush_lock: asyncio.Lock
+    # Stops the flush loop in between flushes, cancelling it could lose the batch being written
+    _stopping: asyncio.Event
+
+    __flush_interval: int = 10
+    __flush_size: int = 1000
+    __max_seen: int = 100000
+
     async def on_load(self) -> None:
         self.chats_db = self.bot.db.get_collection("CHATS")
         self.users_db = self.bot.db.get_collection("USERS")
         self.predict_loaded = "SpamPredict" in self.bot.plugins
 
+        self._pending_users = {}
+        self._pending_chats = {}
+        self._hashed_users = set()
+        self._hashed_chats = set()
+        self._flush_task = None
+        self._flush_lock = asyncio.Lock()
+        self._stopping = asyncio.Event()
+
+    async def on_start(self, _: int) -> None:
+        self._flush_task = self.bot.loop.create_task(self._flush_loop())
+
+    async def on_stop(self) -> None:
+        self._stopping.set()
+        if self._flush_task:
+            await self._flush_task
+
+        await self.flush()
+
     def hash_id(self, id: int) -> str:
         # skipcq: PTC-W1003
         return md5((str(id) + self.bot.user.username).encode()).hexdigest()  # skipcq: BAN-B324
 
-    async def build_channel_task(self, channel: Chat) -> asyncio.Task[Any]:
-        async def _do_nothing() -> None:
-            return
+    def _queue_user(self, user_id: int) -> _PendingUpdate:
+        try:
+            return self._pending_users[user_id]
+        except KeyError:
+            pending = self._pending_users[user_id] = _PendingUpdate()
+            return pending
 
-        if channel.type == ChatType.CHANNEL:
-            data = await self.chats_db.find_one({"chat_id": channel.id})
-            content = {"chat_name": channel.title, "type": "channel"}
-            if not data or "hash" not in data:
-                content["hash"] = self.hash_id(channel.id)
-            return self.bot.loop.create_task(
-                self.chats_db.update_one({"chat_id": channel.id}, {"$set": content}, upsert=True)
-            )
+    def _queue_chat(self, chat_id: int) -> _PendingUpdate:
+        try:
+            return self._pending_chats[chat_id]
+        except KeyError:
+            pending = self._pending_chats[chat_id] = _PendingUpdate()
+            return pending
 
-        return self.bot.loop.create_task(_do_nothing())
+    def queue_channel(self, channel: Chat) -> None:
+        if channel.type != ChatType.CHANNEL:
+            return
 
-    async def build_user_task(self, user: User) -> asyncio.Task:
-        data = await self.users_db.find_one({"_id": user.id})
-        content: MutableMapping[str, Any] = {
-            "username": util.tg.get_username(user),
-            "last_seen": int(time()),
-        }
-        if not data or "hash" not in data:
-            content["hash"] = self.hash_id(user.id)
-        if not data or "chats" not in data:
-            content["chats"] = []
-        return self.bot.loop.create_task(
-            self.users_db.update_one({"_id": user.id}, {"$set": content}, upsert=True)
-        )
+        pending = self._queue_chat(channel.id)
+        pending.set.update({"chat_name": channel.title, "type": "channel"})
+        pending.upsert = True
+        pending.hash = channel.id not in self._hashed_chats
+
+    def queue_forwarded_user(self, user: User) -> None:
+        pending = self._queue_user(user.id)
+        pending.set.update({"username": util.tg.get_username(user), "last_seen": int(time())})
+        # Only new documents get the empty list, the array is never reset
+        pending.set_on_insert["chats"] = []
+        pending.upsert = True
+        pending.hash = user.id not in self._hashed_users
+
+    async def _flush_loop(self) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(self._stopping.wait(), self.__flush_interval)
+            except asyncio.TimeoutError:
+                await self.flush()
+            else:
+                return
+
+    async def _filter_hashed(
+        self, collection: util.db.AsyncCollection, key: str, pending: Mapping[int, _PendingUpdate]
+    ) -> Set[int]:
+        """Return ids of the pending documents that already have a hash"""
+        ids = [i for i, update in pending.items() if update.hash]
+        if not ids:
+            return set()
+
+        cursor = collection.find({key: {"$in": ids}, "hash": {"$exists": True}}, {key: 1})
+        return {doc[key] async for doc in cursor}
+
+    async def _write(
+        self,
+        collection: util.db.AsyncCollection,
+        key: str,
+        array: str,
+        batch: Mapping[int, _PendingUpdate],
+        hashed: Set[int],
+    ) -> bool:
+        if not batch:
+            return True
+
+        try:
+            has_hash = await self._filter_hashed(collection, key, batch)
+            new_hashed = []
+            ops = []
+            for i, pending in batch.items():
+                if pending.hash:
+                    if i not in has_hash:
+                        pending.set["hash"] = self.hash_id(i)
+                    new_hashed.append(i)
+                ops.append(pending.to_operation({key: i}, array))
+
+            await collection.bulk_write(ops, ordered=False)
+        except PyMongoError as e:
+            self.log.error(f"Failed to write {len(batch)} {collection.name} documents", exc_info=e)
+            return False
+
+        # Seen sets only prevent rehashing, so it's safe to drop them when they grow too big
+        if len(hashed) > self.__max_seen:
+            hashed.clear()
+        hashed.update(new_hashed)
+        return True
+
+    @staticmethod
+    def _requeue(
+        pending: MutableMapping[int, _PendingUpdate], batch: Mapping[int, _PendingUpdate]
+    ) -> None:
+        # Updates queued since the batch was taken are newer, so they win
+        for i, update in batch.items():
+            pending[i] = update.merge(pending.get(i))
+
+    async def flush(self) -> None:
+        """Write every pending user and chat update in bulk, failed writes are queued again"""
+        async with self._flush_lock:
+            users, chats = self._pending_users, self._pending_chats
+            if not users and not chats:
+                return
+
+            self._pending_users, self._pending_chats = {}, {}
+            users_done, chats_done = await asyncio.gather(
+                self._write(self.users_db, "_id", "chats", users, self._hashed_users),
+                self._write(self.chats_db, "chat_id", "member", chats, self._hashed_chats),
+            )
+            if not users_done:
+                self._requeue(self._pending_users, users)
+            if not chats_done:
+                self._requeue(self._pending_chats, chats)
 
     async def on_chat_migrate(self, message: Message) -> None:
         new_chat = message.chat.id
         old_chat = message.migrate_from_chat_id
 
+        # Make sure nothing is written to the old chat after migrating
+        await self.flush()
         await asyncio.gather(
             self.users_db.update_many({"chats": old_chat}, {"$push": {"chats": new_chat}}),
             self.users_db.update_many({"chats": old_chat}, {"$pull": {"chats": old_chat}}),
@@ -97,6 +254,8 @@ class Users(plugin.Plugin):
 
         chat = message.chat
         user = message.left_chat_member
+        # Pending membership must land before it's removed below
+        await self.flush()
         if user.id == self.bot.uid:
             await asyncio.gather(
                 self.chats_db.update_one({"chat_id": chat.id}, {"$set": {"member": []}}),
@@ -131,59 +290,46 @@ class Users(plugin.Plugin):
         if not user or not chat:  # sanity check for service
             return
 
-        tasks = []
-        set_content = {
-            "username": util.tg.get_username(user),
-            "name": user.first_name,
-            "last_seen": int(time()),
-        }
-        user_data = await self.users_db.find_one({"_id": user.id})
-
-        if chat.type == ChatType.PRIVATE:
-            if self.predict_loaded:
-                if ch := message.forward_from_chat:
-                    tasks.append(await self.build_channel_task(ch))
-                if not user_data or "hash" not in user_data:
-                    set_content["hash"] = self.hash_id(user.id)
-                if usr := message.forward_from:
-                    tasks.append(await self.build_user_task(usr))
-
-            await asyncio.gather(
-                self.users_db.update_one({"_id": user.id}, {"$set": set_content}), *tasks
-            )
-            return
-
-        chat_data = await self.chats_db.find_one({"chat_id": chat.id})
-        chat_update = {
-            "$set": {
-                "chat_name": chat.title,
-                "type": chat.type.name.lower(),
-                "last_update": int(time()),
-            },
-            "$addToSet": {"member": user.id},
-        }
-        if self.predict_loaded:
-            if not user_data or "hash" not in user_data:
-                set_content["hash"] = self.hash_id(user.id)
-            if not chat_data or "hash" not in chat_data:
-                chat_update["$set"]["hash"] = self.hash_id(chat.id)
-            update = {
-                "$set": set_content,
-                "$setOnInsert": {"reputation": 0},
-                "$addToSet": {"chats": chat.id},
+        pending = self._queue_user(user.id)
+        pending.set.update(
+            {
+                "username": util.tg.get_username(user),
+                "name": user.first_name,
+                "last_seen": int(time()),
             }
+        )
+        if self.predict_loaded:
+            pending.hash = pending.hash or user.id not in self._hashed_users
             if ch := message.forward_from_chat:
-                tasks.append(await self.build_channel_task(ch))
+                self.queue_channel(ch)
             if usr := message.forward_from:
-                tasks.append(await self.build_user_task(usr))
-        else:
-            update = {"$set": set_content, "$addToSet": {"chats": chat.id}}
+                self.queue_forwarded_user(usr)
 
-        await asyncio.gather(
-            self.users_db.update_one({"_id": user.id}, update, upsert=True),
-            self.chats_db.update_one({"chat_id": chat.id}, chat_update, upsert=True),
-            *tasks,
-        )
+        if chat.type != ChatType.PRIVATE:
+            pending.add_to_set.add(chat.id)
+            pending.upsert = True
+            if self.predict_loaded:
+                pending.set_on_insert["reputation"] = 0
+
+            chat_pending = self._queue_chat(chat.id)
+            chat_pending.set.update(
+                {
+                    "chat_name": chat.title,
+                    "type": chat.type.name.lower(),
+                    "last_update": int(time()),
+                }
+            )
+            chat_pending.add_to_set.add(user.id)
+            chat_pending.upsert = True
+            if self.predict_loaded:
+                chat_pending.hash = chat_pending.hash or chat.id not in self._hashed_chats
+
+        # A flush already running takes care of it
+        if (
+            len(self._pending_users) + len(self._pending_chats) >= self.__flush_size
+            and not self._flush_lock.locked()
+        ):
+            await self.flush()
 
     async def _user_info(self, ctx: command.Context, user: User) -> None:
         """User Info"""
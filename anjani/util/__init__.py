@@ -22,6 +22,7 @@ from . import (  # skipcq: PY-W2000
     db,
     error,
     misc,
+    script,
     system,
     tg,
     time,
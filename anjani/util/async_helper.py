@@ -16,13 +16,108 @@
 
 import asyncio
 import functools
-from typing import Any, Callable, TypeVar
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from os import cpu_count
+from time import perf_counter
+from typing import Any, Callable, Mapping, MutableMapping, Optional, TypeVar
 
 Result = TypeVar("Result")
 
+# Default number of threads of each named pool
+POOL_SIZES: MutableMapping[str, int] = {
+    "db": min(32, (cpu_count() or 1) + 4),
+    "cpu": cpu_count() or 1,
+    "blocking-http": 8,
+    # Change streams poll for as long as they're open, one thread each
+    "stream": 16,
+}
 
-async def run_sync(func: Callable[..., Result], *args: Any, **kwargs: Any) -> Result:
-    """Runs the given sync function (optionally with arguments) on a separate thread."""
 
-    loop = asyncio.get_event_loop()
-    return await loop.run_in_executor(None, functools.partial(func, *args, **kwargs))
+class _Pool:
+    """Named thread pool with queue metrics"""
+
+    name: str
+    executor: ThreadPoolExecutor
+
+    def __init__(self, name: str, size: int) -> None:
+        # Imported here since core imports the utils on initialization
+        from anjani.core.metrics import ExecutorQueueDepth, ExecutorWaitSecond
+
+        self.name = name
+        self.executor = ThreadPoolExecutor(max_workers=size, thread_name_prefix=f"anjani-{name}")
+        self.queue_depth = ExecutorQueueDepth.labels(name)
+        self.wait_time = ExecutorWaitSecond.labels(name)
+
+    def submit(self, func: Callable[[], Result]) -> "asyncio.Future[Result]":
+        submitted = perf_counter()
+        # Left the queue either by starting or by being cancelled, whichever comes first
+        dequeued = threading.Lock()
+
+        def dequeue() -> bool:
+            if not dequeued.acquire(blocking=False):
+                return False
+
+            self.queue_depth.dec()
+            return True
+
+        def run() -> Result:
+            if dequeue():
+                self.wait_time.set(perf_counter() - submitted)
+            return func()
+
+        self.queue_depth.inc()
+        future = asyncio.get_event_loop().run_in_executor(self.executor, run)
+        future.add_done_callback(lambda fut: fut.cancelled() and dequeue())
+        return future
+
+
+_pools: MutableMapping[str, _Pool] = {}
+
+
+def setup_pools(sizes: Mapping[str, Optional[int]]) -> None:
+    """Override the size of named pools, must be called before the first :meth:`run_sync`"""
+    for name, size in sizes.items():
+        if name not in POOL_SIZES:
+            raise ValueError(f"Unknown pool '{name}'")
+        if name in _pools:
+            raise RuntimeError(f"Pool '{name}' is already running")
+
+        if size:
+            POOL_SIZES[name] = size
+
+
+def shutdown_pools() -> None:
+    """Shutdown every named pool, pending calls are left to finish"""
+    for pool in _pools.values():
+        pool.executor.shutdown(wait=False)
+
+    _pools.clear()
+
+
+def _get_pool(name: str) -> _Pool:
+    try:
+        return _pools[name]
+    except KeyError:
+        if name not in POOL_SIZES:
+            raise ValueError(f"Unknown pool '{name}'") from None
+
+        pool = _pools[name] = _Pool(name, POOL_SIZES[name])
+        return pool
+
+
+async def run_sync(
+    func: Callable[..., Result], *args: Any, pool: Optional[str] = None, **kwargs: Any
+) -> Result:
+    """Runs the given sync function (optionally with arguments) on a separate thread.
+
+    The function runs on the named ``pool`` ('db', 'cpu', 'blocking-http' or 'stream')
+    so a burst on one workload can't starve the others.
+    If no pool is given, the default executor of the loop is used.
+    """
+
+    if pool is None:
+        loop = asyncio.get_event_loop()
+        return await loop.run_in_executor(None, functools.partial(func, *args, **kwargs))
+
+    return await _get_pool(pool).submit(functools.partial(func, *args, **kwargs))
@@ -0,0 +1,114 @@
+"""Anjani circuit breaker"""
+# Copyright (C) 2020 - 2023  UserbotIndo Team, <https://github.com/userbotindo.git>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import asyncio
+import logging
+from time import monotonic
+from typing import Any, Awaitable, Callable, Optional, TypeVar
+
+Result = TypeVar("Result")
+
+
+class CircuitOpen(Exception):
+    """Raised instead of calling a service that keeps failing"""
+
+    def __init__(self, name: str) -> None:
+        super().__init__(f"Circuit '{name}' is open")
+
+
+class CircuitBreaker:
+    """Stops calling an external service after ``threshold`` consecutive failures.
+
+    While open every call fails fast with :obj:`CircuitOpen`. After
+    ``reset_timeout`` seconds a single call is let through as a probe, which
+    closes the circuit again on success. Calls taking longer than ``timeout``
+    seconds are cancelled and count as failures.
+    """
+
+    name: str
+    threshold: int
+    reset_timeout: float
+    timeout: Optional[float]
+    log: logging.Logger
+
+    _failures: int
+    _opened: Optional[float]
+    _probing: bool
+
+    def __init__(
+        self,
+        name: str,
+        *,
+        threshold: int = 5,
+        reset_timeout: float = 30,
+        timeout: Optional[float] = None,
+    ) -> None:
+        self.name = name
+        self.threshold = threshold
+        self.reset_timeout = reset_timeout
+        self.timeout = timeout
+        self.log = logging.getLogger(f"breaker.{name}")
+
+        self._failures = 0
+        self._opened = None
+        self._probing = False
+
+    @property
+    def is_open(self) -> bool:
+        return self._opened is not None
+
+    async def call(
+        self, func: Callable[..., Awaitable[Result]], *args: Any, **kwargs: Any
+    ) -> Result:
+        probe = False
+        if self._opened is not None:
+            if self._probing or monotonic() - self._opened < self.reset_timeout:
+                raise CircuitOpen(self.name)
+
+            probe = self._probing = True
+
+        try:
+            if self.timeout is not None:
+                res = await asyncio.wait_for(func(*args, **kwargs), self.timeout)
+            else:
+                res = await func(*args, **kwargs)
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            self._failure()
+            raise
+        else:
+            self._success()
+            return res
+        finally:
+            if probe:
+                self._probing = False
+
+    def _failure(self) -> None:
+        self._failures += 1
+        if self._opened is not None:
+            # Failed probe, wait for another round
+            self._opened = monotonic()
+        elif self._failures >= self.threshold:
+            self._opened = monotonic()
+            self.log.warning(f"Opened after {self._failures} consecutive failures")
+
+    def _success(self) -> None:
+        if self._opened is not None:
+            self.log.info("Closed, service is back")
+
+        self._failures = 0
+        self._opened = None
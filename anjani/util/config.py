@@ -13,8 +13,17 @@ class Config:
     BOT_TOKEN: str
     OWNER_ID: int
     WORKERS: int
+    DB_POOL_SIZE: Optional[int]
+    CPU_POOL_SIZE: Optional[int]
+    HTTP_POOL_SIZE: Optional[int]
+    STREAM_POOL_SIZE: Optional[int]
     DOWNLOAD_PATH: Optional[str]
 
+    UPDATE_QUEUE_SIZE: int
+    UPDATE_CHAT_CONCURRENCY: int
+    UPDATE_OVERLOAD_POLICY: str
+    UPDATE_SHED_PRIORITY: int
+
     DB_URI: str
 
     SW_API: Optional[str]
@@ -30,6 +39,10 @@ class Config:
 
     SPAM_PREDICTION_URL: Optional[str]
     SPAM_PREDICTION_API: Optional[str]
+    SPAM_PREDICTION_BATCH_URL: Optional[str]
+    SPAM_PREDICTION_TIMEOUT: float
+    SPAM_PREDICTION_CONCURRENCY: int
+    SPAM_CLASSIFIER_PATH: Optional[str]
 
     IS_CI: bool
 
@@ -43,8 +56,17 @@ class Config:
         self.BOT_TOKEN = getenv("BOT_TOKEN", "")
         self.OWNER_ID = int(getenv("OWNER_ID", 0))
         self.WORKERS = int(getenv("WORKERS", min(32, (cpu_count() or 0) + 4)))
+        self.DB_POOL_SIZE = int(getenv("DB_POOL_SIZE", 0)) or None
+        self.CPU_POOL_SIZE = int(getenv("CPU_POOL_SIZE", 0)) or None
+        self.HTTP_POOL_SIZE = int(getenv("HTTP_POOL_SIZE", 0)) or None
+        self.STREAM_POOL_SIZE = int(getenv("STREAM_POOL_SIZE", 0)) or None
         self.DOWNLOAD_PATH = getenv("DOWNLOAD_PATH", "./downloads")
 
+        self.UPDATE_QUEUE_SIZE = int(getenv("UPDATE_QUEUE_SIZE", 100))
+        self.UPDATE_CHAT_CONCURRENCY = int(getenv("UPDATE_CHAT_CONCURRENCY", 4))
+        self.UPDATE_OVERLOAD_POLICY = getenv("UPDATE_OVERLOAD_POLICY", "shed").lower()
+        self.UPDATE_SHED_PRIORITY = int(getenv("UPDATE_SHED_PRIORITY", 100))
+
         self.DB_URI = getenv("DB_URI", "")
 
         self.LOG_CHANNEL = getenv("LOG_CHANNEL")
@@ -68,6 +90,10 @@ class Config:
 
         self.SPAM_PREDICTION_URL = getenv("SPAM_PREDICTION_URL")
         self.SPAM_PREDICTION_API = getenv("SPAM_PREDICTION_API")
+        self.SPAM_PREDICTION_BATCH_URL = getenv("SPAM_PREDICTION_BATCH_URL")
+        self.SPAM_PREDICTION_TIMEOUT = float(getenv("SPAM_PREDICTION_TIMEOUT", 10))
+        self.SPAM_PREDICTION_CONCURRENCY = int(getenv("SPAM_PREDICTION_CONCURRENCY", 8))
+        self.SPAM_CLASSIFIER_PATH = getenv("SPAM_CLASSIFIER_PATH")
 
         self.IS_CI = getenv("IS_CI", "false").lower() == "true"
 
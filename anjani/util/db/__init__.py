@@ -18,5 +18,6 @@ from .client import AsyncClient  # skipcq: PY-W2000
 from .collection import AsyncCollection  # skipcq: PY-W2000
 from .cursor import AsyncCursor  # skipcq: PY-W2000
 from .db import AsyncDatabase  # skipcq: PY-W2000
+from .settings_cache import SettingsCache  # skipcq: PY-W2000
 
-__all__ = ["AsyncClient", "AsyncCollection", "AsyncCursor", "AsyncDatabase"]
+__all__ = ["AsyncClient", "AsyncCollection", "AsyncCursor", "AsyncDatabase", "SettingsCache"]
@@ -14,7 +14,8 @@
 # You should have received a copy of the GNU General Public License
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
-from typing import TYPE_CHECKING, Any, Generic, Union
+import inspect
+from typing import TYPE_CHECKING, Any, Callable, Generic, Union
 
 from bson.codec_options import CodecOptions
 from pymongo.client_session import ClientSession
@@ -28,6 +29,8 @@ from pymongo.read_preferences import _ServerMode
 from pymongo.typings import _DocumentType
 from pymongo.write_concern import WriteConcern
 
+from anjani import util
+
 if TYPE_CHECKING:
     from .command_cursor import _LatentCursor
 
@@ -35,6 +38,11 @@ if TYPE_CHECKING:
 class AsyncBase(Generic[_DocumentType]):
     """Base Class for AsyncIOMongoDB Instances"""
 
+    # Whether dispatch is a native asyncio driver object instead of a synchronous one
+    native: bool = False
+    # Thread pool of the synchronous dispatch calls
+    _pool: str = "db"
+
     dispatch: Union[
         "_LatentCursor[_DocumentType]",
         ClientSession,
@@ -79,6 +87,17 @@ class AsyncBase(Generic[_DocumentType]):
     def __repr__(self) -> str:
         return type(self).__name__ + f"({self.dispatch!r})"
 
+    async def _run(self, func: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        """Call a dispatch method, awaiting it on the native driver or in a thread otherwise"""
+        if not self.native:
+            return await util.run_sync(func, *args, pool=self._pool, **kwargs)
+
+        result = func(*args, **kwargs)
+        if inspect.isawaitable(result):
+            return await result
+
+        return result
+
 
 class AsyncBaseProperty(AsyncBase):
     """Base class property for AsyncIOMongoDB instances"""
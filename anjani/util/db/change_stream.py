@@ -20,8 +20,6 @@ from bson.timestamp import Timestamp
 from pymongo.change_stream import ChangeStream
 from pymongo.collation import Collation
 
-from anjani import util
-
 from .base import AsyncBase
 from .client_session import AsyncClientSession
 
@@ -35,8 +33,10 @@ class AsyncChangeStream(AsyncBase):
     """AsyncIO :obj:`~ChangeStream`
 
     *DEPRECATED* methods are removed in this class.
+    Each stream blocks a thread while polling, so they run on their own pool.
     """
 
+    _pool = "stream"
     _target: Union["AsyncClient", "AsyncDatabase", "AsyncCollection"]
 
     dispatch: ChangeStream
@@ -72,6 +72,7 @@ class AsyncChangeStream(AsyncBase):
         }
 
         super().__init__(None)  # type: ignore
+        self.native = target.native
 
     def __aiter__(self) -> "AsyncChangeStream":
         return self
@@ -97,13 +98,13 @@ class AsyncChangeStream(AsyncBase):
 
     async def _init(self) -> ChangeStream:
         if not self.dispatch:
-            self.dispatch = await util.run_sync(self._target.dispatch.watch, **self._options)
+            self.dispatch = await self._run(self._target.dispatch.watch, **self._options)
 
         return self.dispatch
 
     async def close(self):
         if self.dispatch:
-            await util.run_sync(self.dispatch.close)
+            await self._run(self.dispatch.close)
 
     async def next(self) -> Mapping[str, Any]:
         while self.alive:
@@ -115,7 +116,7 @@ class AsyncChangeStream(AsyncBase):
 
     async def try_next(self) -> Optional[Mapping[str, Any]]:
         self.dispatch = await self._init()
-        return await util.run_sync(self.dispatch.try_next)
+        return await self._run(self.dispatch.try_next)
 
     @property
     def alive(self) -> bool:
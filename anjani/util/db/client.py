@@ -41,13 +41,12 @@ from pymongo.topology_description import TopologyDescription
 from pymongo.typings import _Address
 from pymongo.write_concern import DEFAULT_WRITE_CONCERN, WriteConcern
 
-from anjani import util
-
 from .base import AsyncBaseProperty
 from .change_stream import AsyncChangeStream
 from .client_session import AsyncClientSession
 from .command_cursor import AsyncCommandCursor, CommandCursor
 from .db import AsyncDatabase
+from .native import AsyncMongoClient, is_available
 from .typings import ReadPreferences
 
 
@@ -55,15 +54,27 @@ class AsyncClient(AsyncBaseProperty):
     """AsyncIO :obj:`~MongoClient`
 
     *DEPRECATED* methods are removed in this class.
+
+    With ``native=True`` the client is backed by the asyncio API of pymongo,
+    so operations are awaited on the event loop instead of running on the
+    thread pool. The rest of the API stays the same.
     """
 
     dispatch: MongoClient
 
-    def __init__(self, *args: Any, **kwargs: Any) -> None:
+    def __init__(self, *args: Any, native: bool = False, **kwargs: Any) -> None:
         kwargs.update(
             {"driver": DriverInfo("AsyncIOMongoDB", version="staging", platform="AsyncIO")}
         )
-        dispatch = MongoClient(*args, **kwargs)
+        if native:
+            if not is_available():
+                raise RuntimeError("Native database driver requires pymongo>=4.9")
+
+            dispatch = AsyncMongoClient(*args, **kwargs)  # type: ignore
+        else:
+            dispatch = MongoClient(*args, **kwargs)
+
+        self.native = native
 
         # Propagate initialization to base
         super().__init__(dispatch)
@@ -75,7 +86,7 @@ class AsyncClient(AsyncBaseProperty):
         return hash(self.address)
 
     async def close(self) -> None:
-        await util.run_sync(self.dispatch.close)
+        await self._run(self.dispatch.close)
 
     async def drop_database(
         self,
@@ -85,7 +96,7 @@ class AsyncClient(AsyncBaseProperty):
         if isinstance(name_or_database, AsyncDatabase):
             name_or_database = name_or_database.name
 
-        return await util.run_sync(
+        return await self._run(
             self.dispatch.drop_database,
             name_or_database,
             session=session.dispatch if session else session,
@@ -132,13 +143,18 @@ class AsyncClient(AsyncBaseProperty):
         )
 
     async def list_database_names(self, session: Optional[AsyncClientSession] = None) -> List[str]:
-        return await util.run_sync(
+        return await self._run(
             self.dispatch.list_database_names, session=session.dispatch if session else session
         )
 
     async def list_databases(
         self, session: Optional[AsyncClientSession] = None, **kwargs: Any
     ) -> AsyncCommandCursor:
+        if self.native:
+            return await self.dispatch.list_databases(  # type: ignore
+                session=session.dispatch if session else session, **kwargs
+            )
+
         cmd = SON([("listDatabases", 1)])
         cmd.update(kwargs)
         database = self.get_database(
@@ -147,7 +163,7 @@ class AsyncClient(AsyncBaseProperty):
             read_preference=ReadPreference.PRIMARY,
             write_concern=DEFAULT_WRITE_CONCERN,
         )
-        res: Mapping[str, Any] = await util.run_sync(
+        res: Mapping[str, Any] = await self._run(
             database.dispatch._retryable_read_command,  # skipcq: PYL-W0212
             cmd,
             session=session.dispatch if session else session,
@@ -160,7 +176,7 @@ class AsyncClient(AsyncBaseProperty):
         return AsyncCommandCursor(CommandCursor(database["$cmd"], cursor, None))
 
     async def server_info(self, session: Optional[AsyncClientSession] = None) -> Mapping[str, Any]:
-        return await util.run_sync(
+        return await self._run(
             self.dispatch.server_info, session=session.dispatch if session else session
         )
 
@@ -174,7 +190,7 @@ class AsyncClient(AsyncBaseProperty):
         default_transaction_options: Optional[TransactionOptions] = None,
         snapshot: bool = False,
     ) -> AsyncGenerator[AsyncClientSession, None]:
-        session = await util.run_sync(
+        session = await self._run(
             self.dispatch.start_session,
             causal_consistency=causal_consistency,
             default_transaction_options=default_transaction_options,
@@ -31,8 +31,6 @@ from pymongo.client_session import ClientSession, SessionOptions
 from pymongo.read_concern import ReadConcern
 from pymongo.write_concern import WriteConcern
 
-from anjani import util
-
 from .base import AsyncBase
 from .errors import OperationFailure, PyMongoError
 from .typings import ReadPreferences, Results
@@ -53,6 +51,7 @@ class AsyncClientSession(AsyncBase):
 
     def __init__(self, client: "AsyncClient", dispatch: ClientSession) -> None:
         self._client = client
+        self.native = client.native
 
         # Propagate initialization to base
         super().__init__(dispatch)
@@ -61,19 +60,22 @@ class AsyncClientSession(AsyncBase):
         return self
 
     async def __aexit__(self, exc_type: Any, exc_val: Any, exc_tb: Any) -> None:
-        await util.run_sync(self.dispatch.__exit__, exc_type, exc_val, exc_tb)
+        if self.native:
+            await self.dispatch.__aexit__(exc_type, exc_val, exc_tb)
+        else:
+            await self._run(self.dispatch.__exit__, exc_type, exc_val, exc_tb)
 
     def __enter__(self) -> None:
         raise RuntimeError("Use 'async with' not just 'with'")
 
     async def abort_transaction(self) -> None:
-        return await util.run_sync(self.dispatch.abort_transaction)
+        return await self._run(self.dispatch.abort_transaction)
 
     async def commit_transaction(self) -> None:
-        return await util.run_sync(self.dispatch.commit_transaction)
+        return await self._run(self.dispatch.commit_transaction)
 
     async def end_session(self) -> None:
-        return await util.run_sync(self.dispatch.end_session)
+        return await self._run(self.dispatch.end_session)
 
     @asynccontextmanager
     async def start_transaction(
@@ -84,7 +86,7 @@ class AsyncClientSession(AsyncBase):
         read_preference: Optional[ReadPreferences] = None,
         max_commit_time_ms: Optional[int] = None,
     ) -> AsyncGenerator["AsyncClientSession", None]:
-        await util.run_sync(
+        await self._run(
             self.dispatch.start_transaction,
             read_concern=read_concern,
             write_concern=write_concern,
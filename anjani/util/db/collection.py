@@ -43,13 +43,12 @@ from pymongo.results import (
 from pymongo.typings import _DocumentType
 from pymongo.write_concern import WriteConcern
 
-from anjani import util
-
 from .base import AsyncBaseProperty
 from .change_stream import AsyncChangeStream
 from .client_session import AsyncClientSession
 from .command_cursor import AsyncLatentCommandCursor
 from .cursor import AsyncCursor, AsyncRawBatchCursor, Cursor
+from .native import AsyncNativeCursor, AsyncNativeLatentCursor
 from .typings import ReadPreferences, Request
 
 if TYPE_CHECKING:
@@ -79,10 +78,19 @@ class AsyncCollection(AsyncBaseProperty, Generic[_DocumentType]):
         session: Optional[AsyncClientSession] = None,
         **kwargs: Any,
     ) -> None:
-        dispatch = (
-            collection
-            if collection is not None
-            else Collection(
+        if collection is not None:
+            dispatch = collection
+        elif database.native:
+            # Native collections can't be created implicitly, see AsyncDatabase.create_collection
+            dispatch = database.dispatch.get_collection(
+                name,
+                codec_options=codec_options,
+                read_preference=read_preference,
+                write_concern=write_concern,
+                read_concern=read_concern,
+            )
+        else:
+            dispatch = Collection(
                 database.dispatch,
                 name,
                 create=create,
@@ -93,10 +101,10 @@ class AsyncCollection(AsyncBaseProperty, Generic[_DocumentType]):
                 session=session.dispatch if session else session,
                 **kwargs,
             )
-        )
         # Propagate initialization to base
         super().__init__(dispatch)
         self.database = database
+        self.native = database.native
 
     def __bool__(self) -> bool:
         return self.dispatch is not None
@@ -118,6 +126,15 @@ class AsyncCollection(AsyncBaseProperty, Generic[_DocumentType]):
         session: Optional[AsyncClientSession] = None,
         **kwargs: Any,
     ) -> AsyncLatentCommandCursor:
+        if self.native:
+            return AsyncNativeLatentCursor(  # type: ignore
+                self.dispatch.aggregate,
+                pipeline,
+                session=session.dispatch if session else session,
+                *args,
+                **kwargs,
+            )
+
         return AsyncLatentCommandCursor(
             self,
             self.dispatch.aggregate,
@@ -134,6 +151,14 @@ class AsyncCollection(AsyncBaseProperty, Generic[_DocumentType]):
         session: Optional[AsyncClientSession] = None,
         **kwargs: Any,
     ) -> AsyncLatentCommandCursor:
+        if self.native:
+            return AsyncNativeLatentCursor(  # type: ignore
+                self.dispatch.aggregate_raw_batches,
+                pipeline,
+                session=session.dispatch if session else session,
+                **kwargs,
+            )
+
         return AsyncLatentCommandCursor(
             self,
             self.dispatch.aggregate_raw_batches,
@@ -150,7 +175,7 @@ class AsyncCollection(AsyncBaseProperty, Generic[_DocumentType]):
         bypass_document_validation: bool = False,
         session: Optional[AsyncClientSession] = None,
     ) -> BulkWriteResult:
-        return await util.run_sync(
+        return await self._run(
             self.dispatch.bulk_write,
             request,
             ordered=ordered,
@@ -165,7 +190,7 @@ class AsyncCollection(AsyncBaseProperty, Generic[_DocumentType]):
         session: Optional[AsyncClientSession] = None,
         **kwargs: Any,
     ) -> int:
-        return await util.run_sync(
+        return await self._run(
             self.dispatch.count_documents,
             query,
             session=session.dispatch if session else session,
@@ -173,7 +198,7 @@ class AsyncCollection(AsyncBaseProperty, Generic[_DocumentType]):
         )
 
     async def create_index(self, keys: Union[str, List[Tuple[str, Any]]], **kwargs: Any) -> str:
-        return await util.run_sync(self.dispatch.create_index, keys, **kwargs)
+        return await self._run(self.dispatch.create_index, keys, **kwargs)
 
     async def create_indexes(
         self,
@@ -182,7 +207,7 @@ class AsyncCollection(AsyncBaseProperty, Generic[_DocumentType]):
         session: Optional[AsyncClientSession] = None,
         **kwargs: Any,
     ) -> List[str]:
-        return await util.run_sync(
+        return await self._run(
             self.dispatch.create_indexes,
             indexes,
             session=session.dispatch if session else session,
@@ -197,7 +222,7 @@ class AsyncCollection(AsyncBaseProperty, Generic[_DocumentType]):
         hint: Optional[Union[IndexModel, List[Tuple[str, Any]]]] = None,
         session: Optional[AsyncClientSession] = None,
     ) -> DeleteResult:
-        return await util.run_sync(
+        return await self._run(
             self.dispatch.delete_many,
             query,
             collation=collation,
@@ -213,7 +238,7 @@ class AsyncCollection(AsyncBaseProperty, Generic[_DocumentType]):
         hint: Optional[Union[IndexModel, List[Tuple[str, Any]]]] = None,
         session: Optional[AsyncClientSession] = None,
     ) -> DeleteResult:
-        return await util.run_sync(
+        return await self._run(
             self.dispatch.delete_one,
             query,
             collation=collation,
@@ -229,7 +254,7 @@ class AsyncCollection(AsyncBaseProperty, Generic[_DocumentType]):
         session: Optional[AsyncClientSession] = None,
         **kwargs: Any,
     ) -> List[str]:
-        return await util.run_sync(
+        return await self._run(
             self.dispatch.distinct,
             key,
             filter=query,
@@ -238,7 +263,7 @@ class AsyncCollection(AsyncBaseProperty, Generic[_DocumentType]):
         )
 
     async def drop(self, session: Optional[AsyncClientSession] = None) -> None:
-        await util.run_sync(self.dispatch.drop, session=session.dispatch if session else session)
+        await self._run(self.dispatch.drop, session=session.dispatch if session else session)
 
     async def drop_index(
         self,
@@ -247,7 +272,7 @@ class AsyncCollection(AsyncBaseProperty, Generic[_DocumentType]):
         session: Optional[AsyncClientSession] = None,
         **kwargs: Any,
     ) -> None:
-        await util.run_sync(
+        await self._run(
             self.dispatch.drop_index,
             index_or_name,
             session=session.dispatch if session else session,
@@ -255,20 +280,27 @@ class AsyncCollection(AsyncBaseProperty, Generic[_DocumentType]):
         )
 
     async def drop_indexes(self, session: Optional[AsyncClientSession] = None, **kwargs) -> None:
-        await util.run_sync(
+        await self._run(
             self.dispatch.drop_indexes, session=session.dispatch if session else session, **kwargs
         )
 
     async def estimated_document_count(self, **kwargs: Any) -> int:
-        return await util.run_sync(self.dispatch.estimated_document_count, **kwargs)
+        return await self._run(self.dispatch.estimated_document_count, **kwargs)
 
     def find(self, *args: Any, **kwargs: Any) -> AsyncCursor:
+        if self.native:
+            if "session" in kwargs:
+                session = kwargs["session"]
+                kwargs["session"] = session.dispatch if session else session
+
+            return AsyncNativeCursor(self.dispatch.find(*args, **kwargs), self)  # type: ignore
+
         return AsyncCursor(Cursor(self, *args, **kwargs), self)
 
     async def find_one(
         self, query: Optional[Mapping[str, Any]], *args: Any, **kwargs: Any
     ) -> Optional[Mapping[str, Any]]:
-        return await util.run_sync(self.dispatch.find_one, query, *args, **kwargs)
+        return await self._run(self.dispatch.find_one, query, *args, **kwargs)
 
     async def find_one_and_delete(
         self,
@@ -280,7 +312,7 @@ class AsyncCollection(AsyncBaseProperty, Generic[_DocumentType]):
         session: Optional[AsyncClientSession] = None,
         **kwargs: Any,
     ) -> Mapping[str, Any]:
-        return await util.run_sync(
+        return await self._run(
             self.dispatch.find_one_and_delete,
             query,
             projection=projection,
@@ -303,7 +335,7 @@ class AsyncCollection(AsyncBaseProperty, Generic[_DocumentType]):
         session: Optional[AsyncClientSession] = None,
         **kwargs: Any,
     ) -> Mapping[str, Any]:
-        return await util.run_sync(
+        return await self._run(
             self.dispatch.find_one_and_replace,
             query,
             replacement,
@@ -330,7 +362,7 @@ class AsyncCollection(AsyncBaseProperty, Generic[_DocumentType]):
         session: Optional[AsyncClientSession] = None,
         **kwargs: Any,
     ) -> Mapping[str, Any]:
-        return await util.run_sync(
+        return await self._run(
             self.dispatch.find_one_and_update,
             query,
             update,
@@ -350,13 +382,15 @@ class AsyncCollection(AsyncBaseProperty, Generic[_DocumentType]):
             kwargs["session"] = session.dispatch if session else session
 
         cursor = self.dispatch.find_raw_batches(*args, **kwargs)
+        if self.native:
+            return AsyncNativeCursor(cursor, self)  # type: ignore
 
         return AsyncRawBatchCursor(cursor, self)
 
     async def index_information(
         self, session: Optional[AsyncClientSession] = None
     ) -> Mapping[str, Any]:
-        return await util.run_sync(
+        return await self._run(
             self.dispatch.index_information, session=session.dispatch if session else session
         )
 
@@ -368,7 +402,7 @@ class AsyncCollection(AsyncBaseProperty, Generic[_DocumentType]):
         bypass_document_validation: bool = False,
         session: Optional[AsyncClientSession] = None,
     ) -> InsertManyResult:
-        return await util.run_sync(
+        return await self._run(
             self.dispatch.insert_many,
             documents,
             ordered=ordered,
@@ -383,7 +417,7 @@ class AsyncCollection(AsyncBaseProperty, Generic[_DocumentType]):
         bypass_document_validation: bool = False,
         session: Optional[AsyncClientSession] = None,
     ) -> InsertOneResult:
-        return await util.run_sync(
+        return await self._run(
             self.dispatch.insert_one,
             document,
             bypass_document_validation=bypass_document_validation,
@@ -393,6 +427,14 @@ class AsyncCollection(AsyncBaseProperty, Generic[_DocumentType]):
     def list_indexes(
         self, *args: Any, session: Optional[AsyncClientSession] = None, **kwargs: Any
     ) -> AsyncLatentCommandCursor:
+        if self.native:
+            return AsyncNativeLatentCursor(  # type: ignore
+                self.dispatch.list_indexes,
+                session=session.dispatch if session else session,
+                *args,
+                **kwargs,
+            )
+
         return AsyncLatentCommandCursor(
             self,
             self.dispatch.list_indexes,
@@ -402,14 +444,14 @@ class AsyncCollection(AsyncBaseProperty, Generic[_DocumentType]):
         )
 
     async def options(self, session: Optional[AsyncClientSession] = None) -> Mapping[str, Any]:
-        return await util.run_sync(
+        return await self._run(
             self.dispatch.options, session=session.dispatch if session else session
         )
 
     async def rename(
         self, new_name: str, *, session: Optional[AsyncClientSession] = None, **kwargs: Any
     ) -> Mapping[str, Any]:
-        return await util.run_sync(
+        return await self._run(
             self.dispatch.rename,
             new_name,
             session=session.dispatch if session else session,
@@ -427,7 +469,7 @@ class AsyncCollection(AsyncBaseProperty, Generic[_DocumentType]):
         hint: Optional[Union[IndexModel, List[Tuple[str, Any]]]] = None,
         session: Optional[AsyncClientSession] = None,
     ) -> UpdateResult:
-        return await util.run_sync(
+        return await self._run(
             self.dispatch.replace_one,
             query,
             replacement,
@@ -450,7 +492,7 @@ class AsyncCollection(AsyncBaseProperty, Generic[_DocumentType]):
         hint: Optional[Union[IndexModel, List[Tuple[str, Any]]]] = None,
         session: Optional[AsyncClientSession] = None,
     ) -> UpdateResult:
-        return await util.run_sync(
+        return await self._run(
             self.dispatch.update_many,
             query,
             update,
@@ -474,7 +516,7 @@ class AsyncCollection(AsyncBaseProperty, Generic[_DocumentType]):
         hint: Optional[Union[IndexModel, List[Tuple[str, Any]]]] = None,
         session: Optional[AsyncClientSession] = None,
     ) -> UpdateResult:
-        return await util.run_sync(
+        return await self._run(
             self.dispatch.update_one,
             query,
             update,
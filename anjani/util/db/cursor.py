@@ -41,9 +41,9 @@ if TYPE_CHECKING:
 
 class Cursor(_Cursor, Generic[_DocumentType]):
 
-    _Cursor__data: Deque[Any]
-    _Cursor__killed: bool
-    _Cursor__query_flags: int
+    _data: Deque[Any]
+    _killed: bool
+    _query_flags: int
 
     delegate: "AsyncCollection[_DocumentType]"
 
@@ -72,42 +72,42 @@ class Cursor(_Cursor, Generic[_DocumentType]):
 
     @property
     def _AsyncCursor__data(self) -> Deque[Any]:
-        return self.__data
+        return self._data
 
-    async def _AsyncCursor__die(self, synchronous: bool = False) -> None:
-        await util.run_sync(self.__die, synchronous=synchronous)
+    async def _AsyncCursor__die(self) -> None:
+        await util.run_sync(self._die_lock, pool="db")
 
     @property
     def _AsyncCursor__exhaust(self) -> bool:
-        return self.__exhaust
+        return self._exhaust
 
     @property
     def _AsyncCursor__killed(self) -> bool:
-        return self.__killed
+        return self._killed
 
     @property
     def _AsyncCursor__max_await_time_ms(self) -> Optional[int]:
-        return self.__max_await_time_ms
+        return self._max_await_time_ms
 
     @property
     def _AsyncCursor__max_time_ms(self) -> Optional[int]:
-        return self.__max_time_ms
+        return self._max_time_ms
 
     @property
     def _AsyncCursor__query_flags(self) -> int:
-        return self.__query_flags
+        return self._query_flags
 
     @property
     def _AsyncCursor__query_spec(self) -> Optional[Any]:
-        return self.__query_spec
+        return self._query_spec
 
     @property
     def _AsyncCursor__retrieved(self) -> int:
-        return self.__retrieved
+        return self._retrieved
 
     @property
     def _AsyncCursor__spec(self) -> Mapping[str, Any]:
-        return self.__spec
+        return self._spec
 
     @property
     def collection(self) -> "AsyncCollection[_DocumentType]":
@@ -143,10 +143,10 @@ class AsyncCursor(AsyncCursorBase, Generic[_DocumentType]):
         return self
 
     async def distinct(self, key: str) -> List[Any]:
-        return await util.run_sync(self.dispatch.distinct, key)
+        return await util.run_sync(self.dispatch.distinct, key, pool="db")
 
     async def explain(self) -> _DocumentType:
-        return await util.run_sync(self.dispatch.explain)
+        return await util.run_sync(self.dispatch.explain, pool="db")
 
     def hint(self, index: Union[str, List[Tuple[str, Any]]]) -> "AsyncCursor[_DocumentType]":
         self.dispatch = self.dispatch.hint(index)
@@ -196,15 +196,15 @@ class AsyncCursor(AsyncCursorBase, Generic[_DocumentType]):
 
     def _query_flags(self) -> int:
         # skipcq: PYL-W0212
-        return self.dispatch._Cursor__query_flags  # type: ignore
+        return self.dispatch._query_flags  # type: ignore
 
     def _data(self) -> Deque[Any]:
         # skipcq: PYL-W0212
-        return self.dispatch._Cursor__data  # type: ignore
+        return self.dispatch._data  # type: ignore
 
     def _killed(self) -> bool:
         # skipcq: PYL-W0212
-        return self.dispatch._Cursor__killed  # type: ignore
+        return self.dispatch._killed  # type: ignore
 
 
 class AsyncRawBatchCursor(AsyncCursor, Generic[_DocumentType]):
@@ -32,7 +32,8 @@ from typing import (
 
 from pymongo.client_session import ClientSession
 from pymongo.collection import Collection
-from pymongo.cursor import _QUERY_OPTIONS, Cursor, RawBatchCursor
+from pymongo.cursor import Cursor, RawBatchCursor
+from pymongo.cursor_shared import _QUERY_OPTIONS
 from pymongo.typings import _Address, _DocumentType
 
 from anjani import util
@@ -156,7 +157,7 @@ class AsyncCursorBase(AsyncBase, Generic[_DocumentType]):
                 future.set_exception(exc)
 
     async def _refresh(self) -> int:
-        return await util.run_sync(self.dispatch._refresh)  # skipcq: PYL-W0212
+        return await util.run_sync(self.dispatch._refresh, pool="db")  # skipcq: PYL-W0212
 
     def batch_size(self, batch_size: int) -> "AsyncCursorBase":
         self.dispatch.batch_size(batch_size)
@@ -165,11 +166,11 @@ class AsyncCursorBase(AsyncBase, Generic[_DocumentType]):
     async def close(self) -> None:
         if not self.closed:
             self.closed = True
-            await util.run_sync(self.dispatch.close)
+            await util.run_sync(self.dispatch.close, pool="db")
 
     async def next(self) -> Any:
         if self.alive and (self._buffer_size() or await self._get_more()):
-            return await util.run_sync(next, self.dispatch)
+            return await util.run_sync(next, self.dispatch, pool="db")
         raise StopAsyncIteration
 
     def to_list(self, length: Optional[int] = None) -> asyncio.Future[List[Mapping[str, Any]]]:
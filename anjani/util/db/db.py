@@ -25,13 +25,12 @@ from pymongo.database import Database
 from pymongo.read_concern import ReadConcern
 from pymongo.write_concern import WriteConcern
 
-from anjani import util
-
 from .base import AsyncBaseProperty
 from .change_stream import AsyncChangeStream
 from .client_session import AsyncClientSession
 from .collection import AsyncCollection
 from .command_cursor import AsyncCommandCursor, AsyncLatentCommandCursor, CommandCursor
+from .native import AsyncNativeLatentCursor
 from .typings import ReadPreferences
 
 if TYPE_CHECKING:
@@ -50,6 +49,7 @@ class AsyncDatabase(AsyncBaseProperty):
 
     def __init__(self, client: "AsyncClient", database: Database) -> None:
         self._client = client
+        self.native = client.native
 
         # Propagate initialization to base
         super().__init__(database)
@@ -70,6 +70,15 @@ class AsyncDatabase(AsyncBaseProperty):
         session: Optional[AsyncClientSession] = None,
         **kwargs: Any,
     ) -> AsyncLatentCommandCursor:
+        if self.native:
+            return AsyncNativeLatentCursor(  # type: ignore
+                self.dispatch.aggregate,
+                pipeline,
+                session=session.dispatch if session else session,
+                *args,
+                **kwargs,
+            )
+
         return AsyncLatentCommandCursor(
             self["$cmd.aggregate"],
             self.dispatch.aggregate,
@@ -91,7 +100,7 @@ class AsyncDatabase(AsyncBaseProperty):
         session: Optional[AsyncClientSession] = None,
         **kwargs: Any,
     ) -> Mapping[str, Any]:
-        return await util.run_sync(
+        return await self._run(
             self.dispatch.command,
             command,
             value=value,
@@ -121,7 +130,7 @@ class AsyncDatabase(AsyncBaseProperty):
         return AsyncCollection(
             self,
             name,
-            collection=await util.run_sync(
+            collection=await self._run(
                 self.dispatch.create_collection,
                 name,
                 codec_options=codec_options,
@@ -138,7 +147,7 @@ class AsyncDatabase(AsyncBaseProperty):
     async def dereference(
         self, dbref: DBRef, *, session: Optional[AsyncClientSession] = None, **kwargs: Any
     ) -> Optional[Mapping[str, Any]]:
-        return await util.run_sync(
+        return await self._run(
             self.dispatch.dereference,
             dbref,
             session=session.dispatch if session else session,
@@ -153,7 +162,7 @@ class AsyncDatabase(AsyncBaseProperty):
         if isinstance(name_or_collection, AsyncCollection):
             name_or_collection = name_or_collection.name
 
-        return await util.run_sync(
+        return await self._run(
             self.dispatch.drop_collection,
             name_or_collection,
             session=session.dispatch if session else session,
@@ -184,7 +193,7 @@ class AsyncDatabase(AsyncBaseProperty):
         query: Optional[Mapping[str, Any]] = None,
         **kwargs: Any,
     ) -> List[str]:
-        return await util.run_sync(
+        return await self._run(
             self.dispatch.list_collection_names,
             session=session.dispatch if session else session,
             filter=query,
@@ -198,10 +207,15 @@ class AsyncDatabase(AsyncBaseProperty):
         query: Optional[Mapping[str, Any]] = None,
         **kwargs: Any,
     ) -> AsyncCommandCursor:
+        if self.native:
+            return await self.dispatch.list_collections(  # type: ignore
+                session=session.dispatch if session else session, filter=query, **kwargs
+            )
+
         cmd = SON([("listCollections", 1)])
         cmd.update(query, **kwargs)
 
-        res: Mapping[str, Any] = await util.run_sync(
+        res: Mapping[str, Any] = await self._run(
             self.dispatch._retryable_read_command,  # skipcq: PYL-W0212
             cmd,
             session=session.dispatch if session else session,
@@ -220,7 +234,7 @@ class AsyncDatabase(AsyncBaseProperty):
         if isinstance(name_or_collection, AsyncCollection):
             name_or_collection = name_or_collection.name
 
-        return await util.run_sync(
+        return await self._run(
             self.dispatch.validate_collection,
             name_or_collection,
             scandata=scandata,
@@ -0,0 +1,209 @@
+"""Anjani database native driver"""
+# Copyright (C) 2020 - 2023  UserbotIndo Team, <https://github.com/userbotindo.git>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import asyncio
+from typing import Any, Awaitable, Callable, List, Mapping, Optional
+
+try:
+    # Native asyncio API is only available on pymongo>=4.9
+    from pymongo import AsyncMongoClient  # type: ignore
+except ImportError:
+    AsyncMongoClient = None
+
+
+def is_available() -> bool:
+    return AsyncMongoClient is not None
+
+
+class AsyncNativeLatentCursor:
+    """Lazily started cursor of the native driver
+
+    The native driver returns command cursors (``aggregate``, ``list_indexes``, ...)
+    from a coroutine. This defers the call to the first iteration so it can be used
+    the same way as :obj:`~AsyncLatentCommandCursor`, without awaiting it first.
+    """
+
+    dispatch: Optional[Any]
+
+    def __init__(self, start: Callable[..., Awaitable[Any]], *args: Any, **kwargs: Any) -> None:
+        self.start = start
+        self.args = args
+        self.kwargs = kwargs
+        self.dispatch = None
+
+    async def __aenter__(self) -> "AsyncNativeLatentCursor":
+        return self
+
+    async def __aexit__(self, exc_type: Any, exc_val: Any, exc_tb: Any) -> None:
+        await self.close()
+
+    def __aiter__(self) -> "AsyncNativeLatentCursor":
+        return self
+
+    async def __anext__(self) -> Mapping[str, Any]:
+        return await self.next()
+
+    async def _init(self) -> Any:
+        if self.dispatch is None:
+            self.dispatch = await self.start(*self.args, **self.kwargs)
+
+        return self.dispatch
+
+    def batch_size(self, batch_size: int) -> "AsyncNativeLatentCursor":
+        if self.dispatch is not None:
+            self.dispatch.batch_size(batch_size)
+        else:
+            self.kwargs["batchSize"] = batch_size
+
+        return self
+
+    async def close(self) -> None:
+        if self.dispatch is not None:
+            await self.dispatch.close()
+
+    async def next(self) -> Mapping[str, Any]:
+        cursor = await self._init()
+        return await cursor.__anext__()
+
+    async def to_list(self, length: Optional[int] = None) -> List[Mapping[str, Any]]:
+        cursor = await self._init()
+        return await cursor.to_list(length)
+
+    @property
+    def alive(self) -> bool:
+        if self.dispatch is None:
+            return True
+
+        return self.dispatch.alive
+
+
+class AsyncNativeCursor:
+    """Cursor of the native driver with the interface of :obj:`~AsyncCursor`
+
+    The native cursor is close to it, but returns its own collection, and some
+    of the chaining methods differ (``sort`` takes the direction positionally).
+    This keeps ``find()`` the same whichever driver is in use.
+    """
+
+    dispatch: Any
+    collection: Any
+    started: bool
+    closed: bool
+
+    def __init__(self, cursor: Any, collection: Any) -> None:
+        self.dispatch = cursor
+        self.collection = collection
+        self.started = False
+        self.closed = False
+
+    def __repr__(self) -> str:
+        return type(self).__name__ + f"({self.dispatch!r})"
+
+    async def __aenter__(self) -> "AsyncNativeCursor":
+        return self
+
+    async def __aexit__(self, exc_type: Any, exc_val: Any, exc_tb: Any) -> None:
+        await self.close()
+
+    def __aiter__(self) -> "AsyncNativeCursor":
+        return self
+
+    async def __anext__(self) -> Mapping[str, Any]:
+        return await self.next()
+
+    def _chain(self, name: str, *args: Any, **kwargs: Any) -> "AsyncNativeCursor":
+        getattr(self.dispatch, name)(*args, **kwargs)
+        return self
+
+    def allow_disk_use(self, allow_disk_use: bool) -> "AsyncNativeCursor":
+        return self._chain("allow_disk_use", allow_disk_use)
+
+    def batch_size(self, batch_size: int) -> "AsyncNativeCursor":
+        return self._chain("batch_size", batch_size)
+
+    def collation(self, collation: Any) -> "AsyncNativeCursor":
+        return self._chain("collation", collation)
+
+    def comment(self, comment: str) -> "AsyncNativeCursor":
+        return self._chain("comment", comment)
+
+    def hint(self, index: Any) -> "AsyncNativeCursor":
+        return self._chain("hint", index)
+
+    def limit(self, limit: int) -> "AsyncNativeCursor":
+        return self._chain("limit", limit)
+
+    def max(self, spec: List[Any]) -> "AsyncNativeCursor":
+        return self._chain("max", spec)
+
+    def max_await_time_ms(self, max_await_time_ms: int) -> "AsyncNativeCursor":
+        return self._chain("max_await_time_ms", max_await_time_ms)
+
+    def max_time_ms(self, max_time_ms: int) -> "AsyncNativeCursor":
+        return self._chain("max_time_ms", max_time_ms)
+
+    def min(self, spec: List[Any]) -> "AsyncNativeCursor":
+        return self._chain("min", spec)
+
+    def remove_option(self, mask: int) -> "AsyncNativeCursor":
+        return self._chain("remove_option", mask)
+
+    def skip(self, skip: int) -> "AsyncNativeCursor":
+        return self._chain("skip", skip)
+
+    def sort(self, key: Any, *, direction: Any = None) -> "AsyncNativeCursor":
+        return self._chain("sort", key, direction)
+
+    def where(self, code: Any) -> "AsyncNativeCursor":
+        return self._chain("where", code)
+
+    async def close(self) -> None:
+        if not self.closed:
+            self.closed = True
+            await self.dispatch.close()
+
+    async def distinct(self, key: str) -> List[Any]:
+        return await self.dispatch.distinct(key)
+
+    async def explain(self) -> Mapping[str, Any]:
+        return await self.dispatch.explain()
+
+    async def next(self) -> Any:
+        self.started = True
+        return await self.dispatch.next()
+
+    def to_list(self, length: Optional[int] = None) -> "asyncio.Future[List[Mapping[str, Any]]]":
+        if length is not None and length < 0:
+            raise ValueError("length must be non-negative")
+
+        self.started = True
+        return asyncio.ensure_future(self.dispatch.to_list(length))
+
+    @property
+    def address(self) -> Any:
+        return self.dispatch.address
+
+    @property
+    def alive(self) -> bool:
+        return self.dispatch.alive
+
+    @property
+    def cursor_id(self) -> Optional[int]:
+        return self.dispatch.cursor_id
+
+    @property
+    def session(self) -> Any:
+        return self.dispatch.session
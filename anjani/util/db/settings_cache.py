@@ -0,0 +1,120 @@
+"""Anjani database settings cache"""
+# Copyright (C) 2020 - 2023  UserbotIndo Team, <https://github.com/userbotindo.git>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Any, Hashable, Mapping, MutableMapping, Optional
+
+from .stream_cache import StreamCache
+
+if TYPE_CHECKING:
+    from .collection import AsyncCollection
+
+_MISSING = object()
+
+
+class SettingsCache(StreamCache):
+    """Bounded in-process cache of per-chat setting documents.
+
+    Documents are looked up by a single key field (``chat_id`` by default)
+    and kept in an LRU of at most ``max_size`` entries. Missing documents are
+    cached too, since most chats never touch their settings.
+
+    Coherence is maintained by watching the collection change stream, every
+    change drops the affected entry so the next :meth:`get` reads it again.
+    Callers writing to the collection should also call :meth:`invalidate`
+    so their own writes are visible immediately.
+    """
+
+    key: str
+    max_size: int
+
+    _data: MutableMapping[Hashable, Optional[Mapping[str, Any]]]
+    _ids: MutableMapping[Any, Hashable]
+    _generation: int
+
+    def __init__(
+        self, collection: "AsyncCollection", key: str = "chat_id", *, max_size: int = 4096
+    ) -> None:
+        super().__init__(collection, collection.name.lower())
+        self.key = key
+        self.max_size = max_size
+
+        self._data = OrderedDict()
+        self._ids = {}
+        self._generation = 0
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._data
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    async def get(self, key: Hashable) -> Optional[Mapping[str, Any]]:
+        """Return the setting document of the given key, reading through on a miss"""
+        data = self._data.get(key, _MISSING)
+        if data is not _MISSING:
+            self._data.move_to_end(key)  # type: ignore
+            return data  # type: ignore
+
+        generation = self._generation
+        data = await self.collection.find_one({self.key: key})
+        # Only keep the document when the stream is alive and nothing has been
+        # invalidated while we were reading, otherwise it might be stale already.
+        if self.ready and generation == self._generation:
+            self._put(key, data)
+
+        return data
+
+    def _put(self, key: Hashable, data: Optional[Mapping[str, Any]]) -> None:
+        self._data[key] = data
+        self._data.move_to_end(key)  # type: ignore
+        if data is not None:
+            self._ids[data["_id"]] = key
+
+        while len(self._data) > self.max_size:
+            _, old = self._data.popitem(last=False)  # type: ignore
+            if old is not None:
+                self._ids.pop(old["_id"], None)
+
+    def invalidate(self, *keys: Hashable) -> None:
+        """Drop the given keys from the cache, or everything if no key is given"""
+        self._generation += 1
+        if not keys:
+            self._data.clear()
+            self._ids.clear()
+            return
+
+        for key in keys:
+            data = self._data.pop(key, None)
+            if data is not None:
+                self._ids.pop(data["_id"], None)
+
+    def clear(self) -> None:
+        super().clear()
+        self.invalidate()
+
+    async def _watch(self) -> None:
+        async with self.collection.watch(full_document="updateLookup") as stream:
+            self.ready = True
+            async for change in stream:
+                document = change.get("fullDocument")
+                if document and self.key in document:
+                    self.invalidate(document[self.key])
+
+                # Deleted document or the key itself has been changed
+                key = self._ids.get(change.get("documentKey", {}).get("_id"), _MISSING)
+                if key is not _MISSING:
+                    self.invalidate(key)
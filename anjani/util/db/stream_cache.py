@@ -0,0 +1,99 @@
+"""Anjani change stream cache base"""
+# Copyright (C) 2020 - 2023  UserbotIndo Team, <https://github.com/userbotindo.git>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import asyncio
+import logging
+from functools import partial
+from typing import TYPE_CHECKING, Optional
+
+from pymongo.errors import OperationFailure, PyMongoError
+
+if TYPE_CHECKING:
+    from .collection import AsyncCollection
+
+# Server error code when change streams are not supported (standalone mongod)
+CHANGE_STREAM_UNSUPPORTED = 40573
+
+
+class StreamCache:
+    """Base of the caches kept coherent by watching a collection change stream.
+
+    Subclasses open the stream in :meth:`_watch` and set :attr:`ready` once
+    their data can be trusted. It is cleared, along with the data, whenever
+    the stream stops. The stream is restarted on errors, but not when the
+    server doesn't support change streams, leaving the cache disabled.
+
+    The streams poll on the 'stream' pool, so they never hold the threads
+    of the database queries.
+    """
+
+    collection: "AsyncCollection"
+    log: logging.Logger
+    ready: bool
+
+    _stream: Optional[asyncio.Task[None]]
+
+    def __init__(self, collection: "AsyncCollection", name: str) -> None:
+        self.collection = collection
+        self.log = logging.getLogger(f"cache.{name}")
+        self.ready = False
+
+        self._stream = None
+
+    def clear(self) -> None:
+        self.ready = False
+
+    def start(self) -> None:
+        """Start watching the change stream"""
+        self.stop()
+
+        loop = asyncio.get_event_loop()
+        self._stream = loop.create_task(self._watch())
+        self._stream.add_done_callback(partial(loop.call_soon_threadsafe, self._watch_callback))
+
+    def stop(self) -> None:
+        """Stop watching the change stream and drop the data"""
+        if self._stream is not None and not self._stream.done():
+            self._stream.cancel()
+
+        self._stream = None
+        self.clear()
+
+    def _watch_callback(self, future: asyncio.Future) -> None:
+        if future is not self._stream:
+            return
+
+        self.clear()
+        try:
+            future.result()
+        except asyncio.CancelledError:
+            pass
+        except OperationFailure as e:
+            if e.code == CHANGE_STREAM_UNSUPPORTED:
+                self.log.warning("Change stream is not supported, caching disabled")
+                return
+
+            self.log.error("MongoDB error:", exc_info=e)
+            self.start()
+        except PyMongoError as e:
+            self.log.error("MongoDB error:", exc_info=e)
+            self.start()
+        else:
+            # The stream got invalidated, e.g. the collection was dropped
+            self.start()
+
+    async def _watch(self) -> None:
+        raise NotImplementedError
@@ -0,0 +1,258 @@
+"""Anjani federation caches"""
+# Copyright (C) 2020 - 2023  UserbotIndo Team, <https://github.com/userbotindo.git>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+from collections import Counter, deque
+from typing import Any, Iterable, Mapping, MutableMapping, Optional, Set, Tuple
+
+from .db import AsyncCollection
+from .db.stream_cache import StreamCache
+
+
+class FedBanCache(StreamCache):
+    """In-memory sets of the ids banned in each federation.
+
+    The sets are a superset of the bans: new bans are added by the caller
+    and by watching the FED_BANS change stream, but bans removed by another
+    process are only dropped once a lookup finds them gone with :meth:`discard`.
+    So a miss is authoritative, while a hit has to be checked in the database.
+
+    Without a live change stream bans written elsewhere could be missed,
+    so :attr:`ready` is only set while the stream is being watched.
+    """
+
+    _bans: MutableMapping[str, Set[int]]
+    # Number of federations banning each id, for the lookups across every federation
+    _targets: "Counter[int]"
+
+    def __init__(self, collection: AsyncCollection) -> None:
+        super().__init__(collection, "fed_bans")
+
+        self._bans = {}
+        self._targets = Counter()
+
+    def __len__(self) -> int:
+        return sum(self._targets.values())
+
+    def contains(self, fed_id: str, target: int) -> bool:
+        bans = self._bans.get(fed_id)
+        return bans is not None and target in bans
+
+    def is_banned(self, target: int) -> bool:
+        """Check whether the id is banned in any federation"""
+        return target in self._targets
+
+    def add(self, fed_id: str, target: int) -> None:
+        try:
+            bans = self._bans[fed_id]
+        except KeyError:
+            bans = self._bans[fed_id] = set()
+
+        if target not in bans:
+            bans.add(target)
+            self._targets[target] += 1
+
+    def discard(self, fed_id: str, target: int) -> None:
+        bans = self._bans.get(fed_id)
+        if bans is None or target not in bans:
+            return
+
+        bans.remove(target)
+        if not bans:
+            del self._bans[fed_id]
+
+        self._targets[target] -= 1
+        if self._targets[target] <= 0:
+            del self._targets[target]
+
+    def drop(self, fed_id: str) -> None:
+        """Forget every ban of a federation"""
+        for target in list(self._bans.get(fed_id, ())):
+            self.discard(fed_id, target)
+
+    def clear(self) -> None:
+        super().clear()
+        self._bans.clear()
+        self._targets.clear()
+
+    async def _load(self) -> None:
+        async for ban in self.collection.find(
+            {}, {"_id": False, "fed_id": True, "target_id": True}, batch_size=10000
+        ):
+            self.add(ban["fed_id"], ban["target_id"])
+
+        self.ready = True
+        self.log.debug("Loaded %d federation bans", len(self))
+
+    async def _watch(self) -> None:
+        # Removals are left to discard(), only new bans matter here
+        pipeline = [{"$match": {"operationType": {"$in": ["insert", "replace"]}}}]
+        async with self.collection.watch(pipeline) as stream:
+            # Load after the stream is open so bans made in between aren't missed
+            await self._load()
+            async for change in stream:
+                ban = change["fullDocument"]
+                self.add(ban["fed_id"], ban["target_id"])
+
+
+class FedIndex(StreamCache):
+    """In-memory index of the chats of each federation and of the subscriptions.
+
+    Resolves the federation of a chat, and the transitive closure of the
+    federations it subscribes to (whose bans apply to it) or that subscribe
+    to it (where its bans are propagated), without any query. Closures are
+    computed on demand and kept until the subscription graph changes.
+    """
+
+    _chats: MutableMapping[int, str]
+    _names: MutableMapping[str, str]
+    _fed_chats: MutableMapping[str, Set[int]]
+    # Edges of the subscription graph in both directions
+    _subscribers: MutableMapping[str, Set[str]]
+    _subscriptions: MutableMapping[str, Set[str]]
+    _scopes: MutableMapping[str, Tuple[str, ...]]
+    _audiences: MutableMapping[str, Tuple[str, ...]]
+
+    def __init__(self, collection: AsyncCollection) -> None:
+        super().__init__(collection, "federations")
+
+        self._chats = {}
+        self._names = {}
+        self._fed_chats = {}
+        self._subscribers = {}
+        self._subscriptions = {}
+        self._scopes = {}
+        self._audiences = {}
+
+    def get(self, chat: int) -> Optional[str]:
+        """Get the federation of the chat"""
+        return self._chats.get(chat)
+
+    def name(self, fed_id: str) -> Optional[str]:
+        return self._names.get(fed_id)
+
+    def chats(self, fed_id: str) -> Set[int]:
+        return self._fed_chats.get(fed_id, set())
+
+    @staticmethod
+    def _closure(fed_id: str, edges: Mapping[str, Set[str]]) -> Tuple[str, ...]:
+        # Breadth first, so the nearest federations come first. Cycles are fine
+        res = {fed_id: None}
+        queue = deque([fed_id])
+        while queue:
+            for fid in edges.get(queue.popleft(), ()):
+                if fid not in res:
+                    res[fid] = None
+                    queue.append(fid)
+
+        return tuple(res)
+
+    def scope(self, fed_id: str) -> Tuple[str, ...]:
+        """Get the federation and every federation it subscribes to, directly or not"""
+        try:
+            return self._scopes[fed_id]
+        except KeyError:
+            scope = self._scopes[fed_id] = self._closure(fed_id, self._subscriptions)
+            return scope
+
+    def audience(self, fed_id: str) -> Tuple[str, ...]:
+        """Get the federation and every federation subscribed to it, directly or not"""
+        try:
+            return self._audiences[fed_id]
+        except KeyError:
+            audience = self._audiences[fed_id] = self._closure(fed_id, self._subscribers)
+            return audience
+
+    def join(self, fed_id: str, chat: int) -> None:
+        self.leave(chat)
+        self._chats[chat] = fed_id
+        self._fed_chats.setdefault(fed_id, set()).add(chat)
+
+    def leave(self, chat: int) -> None:
+        fed_id = self._chats.pop(chat, None)
+        if fed_id is not None:
+            self._fed_chats.get(fed_id, set()).discard(chat)
+
+    def subscribe(self, fed_id: str, subscriber: str) -> None:
+        """Subscribe ``subscriber`` to the bans of ``fed_id``"""
+        self._subscribers.setdefault(fed_id, set()).add(subscriber)
+        self._subscriptions.setdefault(subscriber, set()).add(fed_id)
+        self._scopes.clear()
+        self._audiences.clear()
+
+    def unsubscribe(self, fed_id: str, subscriber: str) -> None:
+        self._subscribers.get(fed_id, set()).discard(subscriber)
+        self._subscriptions.get(subscriber, set()).discard(fed_id)
+        self._scopes.clear()
+        self._audiences.clear()
+
+    def put(self, data: Mapping[str, Any]) -> None:
+        """Replace everything known about a federation with its document"""
+        fed_id = data["_id"]
+        self.remove(fed_id, keep_subscriptions=True)
+
+        self._names[fed_id] = data.get("name", "")
+        for chat in data.get("chats", ()):
+            self.join(fed_id, chat)
+        for subscriber in data.get("subscribers", ()):
+            self.subscribe(fed_id, subscriber)
+
+    def remove(self, fed_id: str, *, keep_subscriptions: bool = False) -> None:
+        """Forget a federation, ``keep_subscriptions`` keeps the federations it subscribes to"""
+        self._names.pop(fed_id, None)
+        for chat in self._fed_chats.pop(fed_id, ()):
+            if self._chats.get(chat) == fed_id:
+                del self._chats[chat]
+
+        # Subscribers are stored in the federation document, subscriptions aren't
+        for subscriber in self._subscribers.pop(fed_id, ()):
+            self._subscriptions.get(subscriber, set()).discard(fed_id)
+        if not keep_subscriptions:
+            for fid in self._subscriptions.pop(fed_id, ()):
+                self._subscribers.get(fid, set()).discard(fed_id)
+
+        self._scopes.clear()
+        self._audiences.clear()
+
+    def clear(self) -> None:
+        super().clear()
+        self._chats.clear()
+        self._names.clear()
+        self._fed_chats.clear()
+        self._subscribers.clear()
+        self._subscriptions.clear()
+        self._scopes.clear()
+        self._audiences.clear()
+
+    def load(self, feds: Iterable[Mapping[str, Any]]) -> None:
+        for data in feds:
+            self.put(data)
+
+    async def _watch(self) -> None:
+        async with self.collection.watch(full_document="updateLookup") as stream:
+            # Load after the stream is open so changes made in between aren't missed
+            self.load(
+                await self.collection.find(
+                    {}, {"name": True, "chats": True, "subscribers": True}
+                ).to_list()
+            )
+            self.ready = True
+            self.log.debug("Loaded %d federated chats", len(self._chats))
+
+            async for change in stream:
+                if change["operationType"] == "delete":
+                    self.remove(change["documentKey"]["_id"])
+                elif change.get("fullDocument"):
+                    self.put(change["fullDocument"])
@@ -0,0 +1,221 @@
+"""Anjani chat member cache"""
+# Copyright (C) 2020 - 2023  UserbotIndo Team, <https://github.com/userbotindo.git>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+from collections import OrderedDict
+from time import monotonic
+from typing import Iterable, MutableMapping, Optional, Tuple
+
+from pyrogram.enums.chat_member_status import ChatMemberStatus
+from pyrogram.types import ChatMember, ChatMemberUpdated
+
+Key = Tuple[int, int]
+
+ADMIN_STATUS = {ChatMemberStatus.ADMINISTRATOR, ChatMemberStatus.OWNER}
+
+
+class ChatMemberCache:
+    """TTL cache of chat members keyed by (chat_id, user_id).
+
+    Members live for ``ttl`` seconds, at most ``max_size`` of them, and the
+    expired ones are dropped as new ones come in. The bot's own membership
+    of each chat is kept apart for ``bot_ttl`` instead, since its rights only
+    change through a chat member update which refreshes the entry anyway,
+    and the flow of other members must not evict it.
+    """
+
+    ttl: float
+    bot_ttl: float
+    max_size: int
+    bot_id: Optional[int]
+
+    # In expiry order, all members get the same TTL
+    _data: MutableMapping[Key, Tuple[float, ChatMember]]
+    _bot: MutableMapping[int, Tuple[float, ChatMember]]
+
+    def __init__(self, *, ttl: float = 60, bot_ttl: float = 86400, max_size: int = 10000) -> None:
+        self.ttl = ttl
+        self.bot_ttl = bot_ttl
+        self.max_size = max_size
+        self.bot_id = None
+
+        self._data = OrderedDict()
+        self._bot = {}
+
+    def __len__(self) -> int:
+        return len(self._data) + len(self._bot)
+
+    def get(self, chat_id: int, user_id: int) -> Optional[ChatMember]:
+        if user_id == self.bot_id:
+            data, key = self._bot, chat_id
+        else:
+            data, key = self._data, (chat_id, user_id)
+
+        try:
+            expire, member = data[key]  # type: ignore
+        except KeyError:
+            return None
+
+        if expire < monotonic():
+            del data[key]  # type: ignore
+            return None
+
+        return member
+
+    def put(self, chat_id: int, user_id: int, member: ChatMember) -> None:
+        now = monotonic()
+        if user_id == self.bot_id:
+            self._bot[chat_id] = (now + self.bot_ttl, member)
+            return
+
+        key = (chat_id, user_id)
+        self._data[key] = (now + self.ttl, member)
+        self._data.move_to_end(key)  # type: ignore
+
+        while self._data:
+            key, (expire, _) = next(iter(self._data.items()))
+            if expire >= now and len(self._data) <= self.max_size:
+                break
+
+            del self._data[key]
+
+    def invalidate(self, chat_id: int, user_id: Optional[int] = None) -> None:
+        """Drop a member, or every member of the chat if no user is given"""
+        if user_id is None:
+            self._bot.pop(chat_id, None)
+            for key in [key for key in self._data if key[0] == chat_id]:
+                del self._data[key]
+        elif user_id == self.bot_id:
+            self._bot.pop(chat_id, None)
+        else:
+            self._data.pop((chat_id, user_id), None)
+
+    def update(self, update: ChatMemberUpdated) -> None:
+        """Apply a chat member update"""
+        member = update.new_chat_member
+        if not member or not member.user:
+            if update.old_chat_member and update.old_chat_member.user:
+                self.invalidate(update.chat.id, update.old_chat_member.user.id)
+
+            return
+
+        if member.status in {ChatMemberStatus.LEFT, ChatMemberStatus.BANNED}:
+            # Nothing we know about the chat is relevant once we're out
+            if member.user.id == self.bot_id:
+                self.invalidate(update.chat.id)
+            else:
+                self.invalidate(update.chat.id, member.user.id)
+        else:
+            self.put(update.chat.id, member.user.id, member)
+
+
+class ChatAdminCache:
+    """Size bounded TTL cache of the admins of each chat.
+
+    Admins are stored as a mapping of user id to whether it's a bot, so
+    membership checks are O(1). Chat member updates patch the cached roster
+    in place instead of dropping it.
+
+    Chats whose roster couldn't be fetched are remembered for ``failure_ttl``
+    with :meth:`fail`, so they aren't asked again on every message.
+    """
+
+    ttl: float
+    failure_ttl: float
+    max_size: int
+
+    _data: MutableMapping[int, Tuple[float, MutableMapping[int, bool]]]
+    _failed: MutableMapping[int, float]
+
+    def __init__(self, *, ttl: float = 600, failure_ttl: float = 30, max_size: int = 10000) -> None:
+        self.ttl = ttl
+        self.failure_ttl = failure_ttl
+        self.max_size = max_size
+
+        self._data = OrderedDict()
+        self._failed = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def get(self, chat_id: int) -> Optional[MutableMapping[int, bool]]:
+        try:
+            expire, admins = self._data[chat_id]
+        except KeyError:
+            return None
+
+        if expire < monotonic():
+            del self._data[chat_id]
+            return None
+
+        self._data.move_to_end(chat_id)  # type: ignore
+        return admins
+
+    def put(self, chat_id: int, admins: Iterable[ChatMember]) -> MutableMapping[int, bool]:
+        self._failed.pop(chat_id, None)
+        roster = {admin.user.id: admin.user.is_bot for admin in admins if admin.user}
+        self._data[chat_id] = (monotonic() + self.ttl, roster)
+        self._data.move_to_end(chat_id)  # type: ignore
+
+        while len(self._data) > self.max_size:
+            self._data.popitem(last=False)  # type: ignore
+
+        return roster
+
+    def fail(self, chat_id: int, ttl: Optional[float] = None) -> None:
+        """Remember that the roster of the chat can't be fetched, for ``ttl`` seconds"""
+        self._failed[chat_id] = monotonic() + max(ttl or 0, self.failure_ttl)
+        self._failed.move_to_end(chat_id)  # type: ignore
+
+        while len(self._failed) > self.max_size:
+            self._failed.popitem(last=False)  # type: ignore
+
+    def failed(self, chat_id: int) -> bool:
+        try:
+            expire = self._failed[chat_id]
+        except KeyError:
+            return False
+
+        if expire < monotonic():
+            del self._failed[chat_id]
+            return False
+
+        return True
+
+    def invalidate(self, chat_id: Optional[int] = None) -> None:
+        """Drop the roster of a chat, or every roster if no chat is given"""
+        if chat_id is None:
+            self._data.clear()
+            self._failed.clear()
+        else:
+            self._data.pop(chat_id, None)
+            self._failed.pop(chat_id, None)
+
+    def update(self, update: ChatMemberUpdated) -> None:
+        """Apply a chat member update to the cached roster, if any"""
+        # The rights of the bot may have changed, try fetching it again
+        self._failed.pop(update.chat.id, None)
+        admins = self.get(update.chat.id)
+        if admins is None:
+            return
+
+        member = update.new_chat_member or update.old_chat_member
+        if not member or not member.user:
+            return
+
+        if update.new_chat_member and update.new_chat_member.status in ADMIN_STATUS:
+            admins[member.user.id] = bool(member.user.is_bot)
+        else:
+            admins.pop(member.user.id, None)
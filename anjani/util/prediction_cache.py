@@ -0,0 +1,85 @@
+"""Anjani spam prediction cache"""
+# Copyright (C) 2020 - 2023  UserbotIndo Team, <https://github.com/userbotindo.git>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import asyncio
+from collections import OrderedDict
+from typing import Awaitable, Callable, MutableMapping
+
+
+class PredictionCache:
+    """LRU of spam probabilities keyed by the content hash of the text.
+
+    Concurrent lookups of the same hash share a single prediction, so a flood
+    of a copy-pasted text costs one prediction. Failed predictions aren't
+    cached and raise to every waiter.
+    """
+
+    max_size: int
+
+    _data: MutableMapping[str, float]
+    _inflight: MutableMapping[str, "asyncio.Future[float]"]
+
+    def __init__(self, *, max_size: int = 10000) -> None:
+        self.max_size = max_size
+
+        self._data = OrderedDict()
+        self._inflight = {}
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def put(self, content_hash: str, proba: float) -> None:
+        self._data[content_hash] = proba
+        self._data.move_to_end(content_hash)  # type: ignore
+        while len(self._data) > self.max_size:
+            self._data.popitem(last=False)  # type: ignore
+
+    def invalidate(self, content_hash: str) -> None:
+        self._data.pop(content_hash, None)
+
+    async def get(self, content_hash: str, predict: Callable[[], Awaitable[float]]) -> float:
+        """Get the spam probability of the text, calling ``predict`` on a miss"""
+        try:
+            proba = self._data[content_hash]
+        except KeyError:
+            pass
+        else:
+            self._data.move_to_end(content_hash)  # type: ignore
+            return proba
+
+        try:
+            return await asyncio.shield(self._inflight[content_hash])
+        except KeyError:
+            pass
+
+        future = self._inflight[content_hash] = asyncio.get_event_loop().create_future()
+        try:
+            proba = await predict()
+        except BaseException as e:
+            if isinstance(e, asyncio.CancelledError):
+                # Don't cancel the other waiters along with this one
+                e = ValueError("Prediction was cancelled")
+
+            future.set_exception(e)
+            # Mark it retrieved, there may be no other waiter
+            future.exception()
+            raise
+        else:
+            self.put(content_hash, proba)
+            future.set_result(proba)
+            return proba
+        finally:
+            del self._inflight[content_hash]
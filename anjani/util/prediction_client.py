@@ -0,0 +1,207 @@
+"""Anjani spam prediction API client"""
+# Copyright (C) 2020 - 2023  UserbotIndo Team, <https://github.com/userbotindo.git>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import asyncio
+import logging
+from random import uniform
+from time import monotonic
+from typing import Any, List, Mapping, Optional, Set, Tuple
+
+from aiohttp import ClientError, ClientSession, ClientTimeout
+
+from anjani.core.metrics import SpamPredictionBatchSize, SpamPredictionLatencySecond
+
+# Statuses worth another try, the service is overloaded or restarting
+_RETRY_STATUS = {429, 500, 502, 503, 504}
+
+
+class _Retry(Exception):
+    pass
+
+
+class PredictionClient:
+    """Client of the spam prediction API.
+
+    With a ``batch_url`` the texts requested within ``batch_delay`` seconds
+    are sent together, up to ``batch_size`` per request, as ``{"texts": [...]}``
+    and the service answers with the list of predictions in the same order.
+    Otherwise every text is its own request. Either way at most
+    ``concurrency`` requests are in flight, each one limited to ``timeout``
+    seconds and retried ``retries`` times with jittered exponential backoff.
+
+    Every failure is raised as :obj:`ValueError`.
+    """
+
+    session: ClientSession
+    url: str
+    batch_url: Optional[str]
+    batch_size: int
+    batch_delay: float
+    timeout: ClientTimeout
+    retries: int
+    backoff: float
+    log: logging.Logger
+
+    _headers: Mapping[str, str]
+    _slots: asyncio.Semaphore
+    _pending: List[Tuple[str, "asyncio.Future[Mapping[str, Any]]"]]
+    _timer: Optional[asyncio.TimerHandle]
+    _tasks: Set["asyncio.Task[None]"]
+
+    def __init__(
+        self,
+        session: ClientSession,
+        url: str,
+        api_key: str,
+        *,
+        batch_url: Optional[str] = None,
+        batch_size: int = 32,
+        batch_delay: float = 0.02,
+        concurrency: int = 8,
+        timeout: float = 10,
+        retries: int = 2,
+        backoff: float = 0.5,
+    ) -> None:
+        self.session = session
+        self.url = url
+        self.batch_url = batch_url
+        self.batch_size = batch_size
+        self.batch_delay = batch_delay
+        self.timeout = ClientTimeout(total=timeout)
+        self.retries = retries
+        self.backoff = backoff
+        self.log = logging.getLogger("spam.client")
+
+        self._headers = {"x-api-key": api_key}
+        self._slots = asyncio.Semaphore(concurrency)
+        self._pending = []
+        self._timer = None
+        self._tasks = set()
+
+    async def predict(self, text: str) -> Mapping[str, Any]:
+        """Get the prediction data of the text"""
+        if not self.batch_url:
+            data = await self._request(self.url, {"text": text}, 1)
+            if not data:
+                raise ValueError("Unexpected response")
+
+            return data
+
+        loop = asyncio.get_event_loop()
+        future = loop.create_future()
+        self._pending.append((text, future))
+        if len(self._pending) >= self.batch_size:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.batch_delay, self._flush)
+
+        return await future
+
+    def close(self) -> None:
+        """Fail the queued texts and cancel the requests in flight"""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+        batch, self._pending = self._pending, []
+        for _, future in batch:
+            if not future.done():
+                future.set_exception(ValueError("Prediction client closed"))
+
+        for task in self._tasks:
+            task.cancel()
+
+    def _flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+        batch, self._pending = self._pending, []
+        if not batch:
+            return
+
+        task = asyncio.get_event_loop().create_task(self._send_batch(batch))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _send_batch(
+        self, batch: List[Tuple[str, "asyncio.Future[Mapping[str, Any]]"]]
+    ) -> None:
+        try:
+            data = await self._request(
+                self.batch_url, {"texts": [text for text, _ in batch]}, len(batch)  # type: ignore
+            )
+            if not isinstance(data, list) or len(data) != len(batch):
+                raise ValueError("Unexpected batch response")
+        except asyncio.CancelledError:
+            self._fail(batch, ValueError("Prediction was cancelled"))
+            raise
+        except ValueError as e:
+            self._fail(batch, e)
+            return
+
+        for (_, future), res in zip(batch, data):
+            if future.done():
+                continue
+
+            if res:
+                future.set_result(res)
+            else:
+                future.set_exception(ValueError("Unexpected response"))
+
+    @staticmethod
+    def _fail(batch: List[Tuple[str, "asyncio.Future[Mapping[str, Any]]"]], err: Exception) -> None:
+        for _, future in batch:
+            if not future.done():
+                future.set_exception(err)
+
+    async def _request(self, url: str, payload: Mapping[str, Any], size: int) -> Any:
+        SpamPredictionBatchSize.observe(size)
+        for attempt in range(self.retries + 1):
+            try:
+                return await self._post(url, payload)
+            except _Retry as e:
+                err = str(e)
+            except (ClientError, asyncio.TimeoutError) as e:
+                err = repr(e)
+
+            if attempt == self.retries:
+                raise ValueError(f"Failed to get prediction: {err}")
+
+            delay = uniform(0, self.backoff * 2**attempt)
+            self.log.debug(f"Prediction request failed ({err}), retrying in {delay:.2f}s")
+            await asyncio.sleep(delay)
+
+    async def _post(self, url: str, payload: Mapping[str, Any]) -> Any:
+        async with self._slots:
+            start = monotonic()
+            try:
+                async with self.session.post(
+                    url, json=payload, headers=self._headers, timeout=self.timeout
+                ) as resp:
+                    if resp.status in _RETRY_STATUS:
+                        raise _Retry(resp.status)
+                    if resp.status != 200:
+                        raise ValueError(f"Failed to get prediction: {resp.status}")
+
+                    res = await resp.json()
+            finally:
+                SpamPredictionLatencySecond.observe(monotonic() - start)
+
+        try:
+            return res["data"]
+        except (KeyError, TypeError):
+            raise ValueError("Unexpected response") from None
@@ -0,0 +1,365 @@
+"""Anjani federation ban propagation"""
+# Copyright (C) 2020 - 2023  UserbotIndo Team, <https://github.com/userbotindo.git>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import asyncio
+import logging
+from datetime import datetime
+from time import monotonic
+from typing import Any, Iterable, Iterator, List, MutableMapping, Optional, Tuple
+from uuid import uuid4
+
+from pyrogram import Client
+from pymongo.errors import PyMongoError
+from pyrogram.errors import (
+    BadRequest,
+    FloodWait,
+    Forbidden,
+    MessageNotModified,
+    RPCError,
+    UserAdminInvalid,
+)
+
+from .db import AsyncCollection
+
+ACTIONS = {"ban", "unban"}
+
+
+class TokenBucket:
+    """Adaptive token bucket rate limiter.
+
+    The rate is halved whenever Telegram answers with a ``FloodWait`` and
+    crawls back up to ``max_rate`` with every successful call.
+    """
+
+    rate: float
+    min_rate: float
+    max_rate: float
+    capacity: float
+
+    _tokens: float
+    _updated: float
+    _lock: asyncio.Lock
+
+    def __init__(self, rate: float, *, min_rate: float = 1, capacity: Optional[float] = None):
+        self.rate = self.max_rate = rate
+        self.min_rate = min(min_rate, rate)
+        self.capacity = capacity or rate
+
+        self._tokens = self.capacity
+        self._updated = monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self) -> None:
+        now = monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    async def acquire(self) -> None:
+        async with self._lock:
+            while True:
+                self._refill()
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+    def flood(self, seconds: float) -> None:
+        """Slow down and hold every caller back for the ``FloodWait`` duration"""
+        self._refill()
+        self.rate = max(self.min_rate, self.rate / 2)
+        self._tokens = min(self._tokens, 0) - seconds * self.rate
+
+    def success(self) -> None:
+        if self.rate < self.max_rate:
+            self.rate = min(self.max_rate, self.rate + self.max_rate / 100)
+
+
+class BanPropagator:
+    """Background engine that bans or unbans a target across many chats.
+
+    Every propagation is a job document in the given collection holding the
+    chats still left to process, so unfinished jobs are picked up again by
+    :meth:`resume` after a restart. Calls to Telegram go through a shared
+    :obj:`TokenBucket`, at most ``concurrency`` at a time across all jobs,
+    and the job progress is checkpointed every ``report_interval`` seconds
+    along with an edit of the progress message, if any.
+
+    Jobs of the same target in the same federation run one after another in
+    the order they were submitted, so a quick unban can't be overtaken by the
+    ban before it in some chats.
+    """
+
+    client: Client
+    db: AsyncCollection
+    log: logging.Logger
+    bucket: TokenBucket
+    report_interval: float
+
+    _slots: asyncio.Semaphore
+    _tasks: MutableMapping[str, "asyncio.Task[None]"]
+    # Last job of each (fed_id, target), the next one waits for it
+    _tails: MutableMapping[Tuple[str, int], "asyncio.Task[None]"]
+
+    def __init__(
+        self,
+        client: Client,
+        db: AsyncCollection,
+        log: logging.Logger,
+        *,
+        rate: float = 20,
+        concurrency: int = 8,
+        report_interval: float = 5,
+    ) -> None:
+        self.client = client
+        self.db = db
+        self.log = log
+        self.bucket = TokenBucket(rate)
+        self.concurrency = concurrency
+        self.report_interval = report_interval
+
+        self._slots = asyncio.Semaphore(concurrency)
+        self._tasks = {}
+        self._tails = {}
+
+    async def submit(
+        self,
+        action: str,
+        fed_id: str,
+        target: int,
+        chats: Iterable[int],
+        *,
+        progress: Optional[Tuple[int, int]] = None,
+        log: Optional[int] = None,
+    ) -> str:
+        """Queue a propagation and start it right away.
+
+        ``progress`` is the (chat_id, message_id) of the message to edit with the
+        progress, and ``log`` is the chat that receives the failures once done.
+        """
+        if action not in ACTIONS:
+            raise ValueError(f"Unknown propagation action '{action}'")
+
+        chats = list(dict.fromkeys(chats))
+        job = {
+            "_id": str(uuid4()),
+            "action": action,
+            "fed_id": fed_id,
+            "target": target,
+            "chats": chats,
+            "total": len(chats),
+            "done": 0,
+            "failed": {},
+            "progress": list(progress) if progress else None,
+            "log": log,
+            "created": datetime.now(),
+        }
+        await self.db.insert_one(job)
+        self._start(job)
+        return job["_id"]
+
+    async def resume(self) -> None:
+        """Restart every job left unfinished by the previous run"""
+        async for job in self.db.find({}).sort("created", direction=1):
+            self._start(dict(job))
+
+    async def stop(self) -> None:
+        """Stop all running jobs, they're resumed on the next start"""
+        tasks = list(self._tasks.values())
+        for task in tasks:
+            task.cancel()
+
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._tasks.clear()
+        self._tails.clear()
+
+    def _start(self, job: MutableMapping[str, Any]) -> None:
+        if job["_id"] in self._tasks:
+            return
+
+        key = (job["fed_id"], job["target"])
+        task = asyncio.get_event_loop().create_task(self._run_after(self._tails.get(key), job))
+        self._tasks[job["_id"]] = self._tails[key] = task
+        task.add_done_callback(lambda _: self._on_done(job, task))
+
+    def _on_done(self, job: MutableMapping[str, Any], task: "asyncio.Task[None]") -> None:
+        self._tasks.pop(job["_id"], None)
+        key = (job["fed_id"], job["target"])
+        if self._tails.get(key) is task:
+            del self._tails[key]
+
+        if task.cancelled():
+            return
+
+        err = task.exception()
+        if err is not None:
+            self.log.error(
+                "Propagation %s of %s stopped, it's resumed on the next start",
+                job["action"],
+                job["target"],
+                exc_info=err,
+            )
+
+    async def _run_after(
+        self, previous: Optional["asyncio.Task[None]"], job: MutableMapping[str, Any]
+    ) -> None:
+        if previous is not None:
+            await asyncio.wait([previous])
+            # It's resumed on the next start, this one has to stay behind it
+            if previous.cancelled() or previous.exception():
+                raise RuntimeError("The previous propagation of the target stopped")
+
+        await self._run(job)
+
+    async def _apply(self, action: str, chat: int, target: int) -> None:
+        while True:
+            await self.bucket.acquire()
+            try:
+                async with self._slots:
+                    if action == "ban":
+                        await self.client.ban_chat_member(chat, target)
+                    else:
+                        await self.client.unban_chat_member(chat, target)
+            except FloodWait as flood:
+                self.log.info("Propagation hit a flood wait of %s seconds", flood.value)
+                self.bucket.flood(flood.value)  # type: ignore
+            else:
+                self.bucket.success()
+                return
+
+    async def _run(self, job: MutableMapping[str, Any]) -> None:
+        chats: Iterator[int] = iter(job["chats"])
+        processed: List[int] = []
+        failed: MutableMapping[str, str] = {}
+
+        async def worker() -> None:
+            # The iterator is shared, so each chat is only taken by one worker
+            for chat in chats:
+                try:
+                    await self._apply(job["action"], chat, job["target"])
+                except UserAdminInvalid:
+                    failed[str(chat)] = "user has higher admin privileges"
+                except RPCError as err:
+                    failed[str(chat)] = err.MESSAGE
+                except Exception as err:  # skipcq: PYL-W0703
+                    # A single bad chat mustn't stop the job
+                    failed[str(chat)] = repr(err)
+
+                if str(chat) in failed:
+                    self.log.warning(
+                        "Failed to f%s %s on %s caused by %s",
+                        job["action"],
+                        job["target"],
+                        chat,
+                        failed[str(chat)],
+                    )
+
+                processed.append(chat)
+
+        async def checkpoint() -> None:
+            if not processed:
+                return
+
+            done, errors = processed.copy(), dict(failed)
+            processed.clear()
+            failed.clear()
+
+            update: MutableMapping[str, Any] = {
+                "$pull": {"chats": {"$in": done}},
+                "$inc": {"done": len(done)},
+            }
+            if errors:
+                update["$set"] = {f"failed.{chat}": err for chat, err in errors.items()}
+
+            try:
+                await self.db.update_one({"_id": job["_id"]}, update)
+            except PyMongoError as err:
+                # Keep them for the next checkpoint, newer failures win
+                self.log.warning("Failed to checkpoint propagation %s: %s", job["_id"], err)
+                processed[:0] = done
+                failed.update({**errors, **failed})
+                return
+
+            job["done"] += len(done)
+            job["failed"].update(errors)
+
+        workers = [
+            asyncio.ensure_future(worker())
+            for _ in range(max(1, min(self.concurrency, len(job["chats"]))))
+        ]
+        waiter = asyncio.gather(*workers)
+        try:
+            while not waiter.done():
+                await asyncio.wait([waiter], timeout=self.report_interval)
+                await checkpoint()
+                if not waiter.done():
+                    await self._report(job)
+
+            await waiter
+        finally:
+            waiter.cancel()
+            await checkpoint()
+
+        # Whatever couldn't be checkpointed is still part of the report
+        job["done"] += len(processed)
+        job["failed"].update(failed)
+        await self.db.delete_one({"_id": job["_id"]})
+        await self._report(job, finished=True)
+        self.log.debug(
+            "Propagated %s of %s to %d chats, %d failed",
+            job["action"],
+            job["target"],
+            job["total"],
+            len(job["failed"]),
+        )
+
+    async def _report(self, job: MutableMapping[str, Any], *, finished: bool = False) -> None:
+        action = job["action"]
+        failed = job["failed"]
+        if finished:
+            text = (
+                f"Federation {action} of {job['target']} done in "
+                f"{job['total'] - len(failed)}/{job['total']} chats"
+            )
+        else:
+            text = (
+                f"Federation {action} of {job['target']} in progress: "
+                f"{job['done']}/{job['total']} chats"
+            )
+        if failed:
+            text += f", {len(failed)} failed"
+
+        try:
+            if job.get("progress"):
+                chat_id, message_id = job["progress"]
+                await self.client.edit_message_text(chat_id, message_id, text)
+
+            if finished and failed and job.get("log"):
+                await self.client.send_message(job["log"], _format_failures(action, failed))
+        except FloodWait as flood:
+            # Progress is only informative, just try again on the next report
+            self.bucket.flood(flood.value)  # type: ignore
+        except (MessageNotModified, BadRequest, Forbidden) as err:
+            self.log.warning("Failed to report propagation progress: %s", err)
+
+
+def _format_failures(action: str, failed: MutableMapping[str, str], limit: int = 50) -> str:
+    lines = [f"failed to f{action} on chat {chat} caused by {err}" for chat, err in failed.items()]
+    text = "\n\n".join(lines[:limit])
+    if len(lines) > limit:
+        text += f"\n\nand {len(lines) - limit} more"
+
+    return text
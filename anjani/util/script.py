@@ -0,0 +1,123 @@
+"""Anjani unicode script detection"""
+# Copyright (C) 2020 - 2023  UserbotIndo Team, <https://github.com/userbotindo.git>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import re
+import sys
+import unicodedata as ud
+from bisect import bisect_right
+from functools import lru_cache
+from typing import Iterable, List, NamedTuple, Optional, Set
+
+# Unicode blocks containing the right-to-left scripts we care about,
+# only the characters in them need to be looked up for is_rtl
+RTL_SCRIPTS = {"arabic", "hebrew"}
+RTL_BLOCKS = (
+    (0x0590, 0x08FF),  # Hebrew, Arabic, Syriac, ..., Arabic Extended-A
+    (0xFB1D, 0xFDFF),  # Alphabetic Presentation Forms, Arabic Presentation Forms-A
+    (0xFE70, 0xFEFF),  # Arabic Presentation Forms-B
+    (0x10EC0, 0x10EFF),  # Arabic Extended-C
+    (0x1EE00, 0x1EEFF),  # Arabic Mathematical Alphabetic Symbols
+)
+
+
+class ScriptTable(NamedTuple):
+    """Sorted, non overlapping codepoint ranges and the script of each range"""
+
+    starts: List[int]
+    ends: List[int]
+    scripts: List[str]
+
+    def get(self, codepoint: int) -> Optional[str]:
+        index = bisect_right(self.starts, codepoint) - 1
+        if index >= 0 and codepoint <= self.ends[index]:
+            return self.scripts[index]
+
+        return None
+
+
+def build_table(codepoints: Iterable[int], scripts: Optional[Set[str]] = None) -> ScriptTable:
+    """Build a table of the alphabetic codepoints, merging consecutive ones of the same script.
+
+    The script of a character is the first word of its unicode name, e.g.
+    'LATIN SMALL LETTER A' is 'latin'. If ``scripts`` is given, other scripts are left out.
+    """
+    table = ScriptTable([], [], [])
+    for codepoint in codepoints:
+        char = chr(codepoint)
+        if not char.isalpha():
+            continue
+
+        name = ud.name(char, "")
+        if not name:
+            continue
+
+        script = name.split(" ", 1)[0].lower()
+        if scripts is not None and script not in scripts:
+            continue
+
+        if table.scripts and table.scripts[-1] == script and table.ends[-1] == codepoint - 1:
+            table.ends[-1] = codepoint
+        else:
+            table.starts.append(codepoint)
+            table.ends.append(codepoint)
+            table.scripts.append(script)
+
+    return table
+
+
+_RTL_CANDIDATE = re.compile(
+    "[" + "".join(f"{chr(start)}-{chr(end)}" for start, end in RTL_BLOCKS) + "]"
+)
+
+
+@lru_cache(maxsize=None)
+def get_table() -> ScriptTable:
+    """Table of every alphabetic codepoint, built on the first call.
+
+    Building it takes a few hundred milliseconds, so it should be built ahead
+    of use off the event loop, e.g. with ``run_sync(get_table, pool="cpu")``.
+    """
+    return build_table(range(sys.maxunicode + 1))
+
+
+def is_rtl(text: str) -> bool:
+    """Check whether the text contains any Arabic or Hebrew letter, stopping at the first one"""
+    get = get_table().get
+    for match in _RTL_CANDIDATE.finditer(text):
+        if get(ord(match.group())) in RTL_SCRIPTS:
+            return True
+
+    return False
+
+
+def detect_scripts(text: str) -> Set[str]:
+    """Get the scripts of all letters in the text"""
+    get = get_table().get
+    scripts = set()
+    # Only look up each character once, messages repeat a lot of them
+    for char in set(text):
+        codepoint = ord(char)
+        if codepoint < 0x80:
+            if char.isalpha():
+                scripts.add("latin")
+
+            continue
+
+        script = get(codepoint)
+        if script is not None:
+            scripts.add(script)
+
+    return scripts
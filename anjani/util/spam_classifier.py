@@ -0,0 +1,263 @@
+"""Anjani local spam classifier"""
+# Copyright (C) 2020 - 2023  UserbotIndo Team, <https://github.com/userbotindo.git>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import asyncio
+import re
+from typing import Any, List, Mapping, Optional, Sequence, Set, Tuple
+from zlib import crc32
+
+from anjani.util.async_helper import run_sync
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+_WORD = re.compile(r"\w+")
+
+
+def is_available() -> bool:
+    return np is not None
+
+
+def get_label(data: Mapping[str, Any]) -> Optional[int]:
+    """Label of a SPAM_DUMP document, 1 for spam, 0 for ham and None if undecided.
+
+    Votes are lists of the voters, documents marked by the staff have counts instead.
+    """
+    spam, ham = data.get("spam") or 0, data.get("ham") or 0
+    spam = len(spam) if isinstance(spam, list) else int(spam)
+    ham = len(ham) if isinstance(ham, list) else int(ham)
+    if spam == ham:
+        return None
+
+    return int(spam > ham)
+
+
+class SpamClassifier:
+    """Logistic regression over hashed n-grams of the text.
+
+    Features are the word unigrams and bigrams, and the character 4-grams
+    of the lowercased text, hashed into ``n_features`` buckets. Each text is
+    a binary vector normalized to unit length, so a prediction is only a sum
+    of the weights of its buckets.
+    """
+
+    n_features: int
+    weights: "np.ndarray"
+    bias: float
+
+    def __init__(self, n_features: int = 2**20) -> None:
+        if np is None:
+            raise RuntimeError("numpy is required for the local spam classifier")
+        if n_features & (n_features - 1):
+            raise ValueError("Number of features must be a power of two")
+
+        self.n_features = n_features
+        self.weights = np.zeros(n_features, dtype=np.float32)
+        self.bias = 0.0
+
+    @staticmethod
+    def tokenize(text: str) -> List[str]:
+        text = text.lower()
+        words = _WORD.findall(text)
+        tokens = [f"w:{word}" for word in words]
+        tokens += [f"b:{first} {second}" for first, second in zip(words, words[1:])]
+
+        text = " ".join(text.split())
+        tokens += [f"c:{text[i : i + 4]}" for i in range(len(text) - 3)]
+        return tokens
+
+    def vectorize(self, text: str) -> "np.ndarray":
+        """Get the sorted, unique buckets of the text"""
+        tokens = self.tokenize(text)
+        buckets = np.fromiter(
+            (crc32(token.encode()) for token in tokens), dtype=np.int64, count=len(tokens)
+        )
+        return np.unique(buckets & (self.n_features - 1))
+
+    def _batch(
+        self, vectors: Sequence["np.ndarray"]
+    ) -> Tuple["np.ndarray", "np.ndarray", "np.ndarray"]:
+        """Flatten the vectors into (bucket, value, row) arrays"""
+        sizes = np.fromiter((len(vector) for vector in vectors), dtype=np.int64, count=len(vectors))
+        index = np.concatenate(vectors) if vectors else np.zeros(0, dtype=np.int64)
+        rows = np.repeat(np.arange(len(vectors)), sizes)
+        values = (1 / np.sqrt(np.maximum(sizes, 1)))[rows]
+        return index, values, rows
+
+    def _decision(self, index: "np.ndarray", values: "np.ndarray", rows: "np.ndarray", n: int):
+        return np.bincount(rows, weights=self.weights[index] * values, minlength=n) + self.bias
+
+    def predict(self, texts: Sequence[str]) -> "np.ndarray":
+        """Get the spam probability of each text"""
+        index, values, rows = self._batch([self.vectorize(text) for text in texts])
+        return 1 / (1 + np.exp(-self._decision(index, values, rows, len(texts))))
+
+    def fit(
+        self,
+        texts: Sequence[str],
+        labels: Sequence[int],
+        *,
+        epochs: int = 5,
+        batch_size: int = 256,
+        learning_rate: float = 0.5,
+        l2: float = 1e-6,
+        seed: int = 0,
+    ) -> "SpamClassifier":
+        """Train with mini-batch AdaGrad, only the buckets seen in a batch are updated"""
+        vectors = [self.vectorize(text) for text in texts]
+        target = np.asarray(labels, dtype=np.float64)
+        squared = np.zeros(self.n_features, dtype=np.float32)
+        bias_squared = 0.0
+        rng = np.random.default_rng(seed)
+
+        for _ in range(epochs):
+            order = rng.permutation(len(vectors))
+            for start in range(0, len(order), batch_size):
+                batch = order[start : start + batch_size]
+                index, values, rows = self._batch([vectors[i] for i in batch])
+                proba = 1 / (1 + np.exp(-self._decision(index, values, rows, len(batch))))
+                error = proba - target[batch]
+
+                buckets, inverse = np.unique(index, return_inverse=True)
+                grad = np.bincount(inverse, weights=error[rows] * values) / len(batch)
+                grad += l2 * self.weights[buckets]
+                squared[buckets] += grad**2
+                self.weights[buckets] -= learning_rate * grad / (np.sqrt(squared[buckets]) + 1e-8)
+
+                bias_grad = float(error.mean())
+                bias_squared += bias_grad**2
+                self.bias -= learning_rate * bias_grad / (bias_squared**0.5 + 1e-8)
+
+        return self
+
+    def save(self, path: str) -> None:
+        with open(path, "wb") as file:
+            np.savez_compressed(file, weights=self.weights, bias=np.float64(self.bias))
+
+    @classmethod
+    def load(cls, path: str) -> "SpamClassifier":
+        if np is None:
+            raise RuntimeError("numpy is required for the local spam classifier")
+
+        with np.load(path) as data:
+            weights = data["weights"].astype(np.float32)
+            model = cls(len(weights))
+            model.weights = weights
+            model.bias = float(data["bias"])
+
+        return model
+
+
+class BatchPredictor:
+    """Runs the predictions requested during one loop iteration as a single batch
+    on the 'cpu' pool"""
+
+    classifier: SpamClassifier
+    max_size: int
+
+    _pending: List[Tuple[str, "asyncio.Future[float]"]]
+    _tasks: Set["asyncio.Task[None]"]
+
+    def __init__(self, classifier: SpamClassifier, *, max_size: int = 256) -> None:
+        self.classifier = classifier
+        self.max_size = max_size
+
+        self._pending = []
+        self._tasks = set()
+
+    async def predict(self, text: str) -> float:
+        loop = asyncio.get_event_loop()
+        future = loop.create_future()
+        self._pending.append((text, future))
+        if len(self._pending) == 1:
+            loop.call_soon(self._flush)
+        elif len(self._pending) >= self.max_size:
+            self._flush()
+
+        return await future
+
+    def _flush(self) -> None:
+        batch, self._pending = self._pending, []
+        if not batch:
+            return
+
+        task = asyncio.get_event_loop().create_task(self._predict(batch))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _predict(self, batch: List[Tuple[str, "asyncio.Future[float]"]]) -> None:
+        try:
+            scores = await run_sync(
+                self.classifier.predict, [text for text, _ in batch], pool="cpu"
+            )
+        except asyncio.CancelledError:
+            self._fail(batch, ValueError("Prediction was cancelled"))
+            raise
+        except Exception as e:  # skipcq: PYL-W0703
+            self._fail(batch, e)
+            return
+
+        for (_, future), score in zip(batch, scores):
+            if not future.done():
+                future.set_result(float(score))
+
+    @staticmethod
+    def _fail(batch: List[Tuple[str, "asyncio.Future[float]"]], err: Exception) -> None:
+        for _, future in batch:
+            if not future.done():
+                future.set_exception(err)
+
+
+def _main() -> None:
+    from argparse import ArgumentParser
+
+    from pymongo import MongoClient
+
+    parser = ArgumentParser(description="Train the local spam classifier from SPAM_DUMP")
+    parser.add_argument("db_uri", help="MongoDB connection string")
+    parser.add_argument("output", help="Path of the model file to write")
+    parser.add_argument("--epochs", type=int, default=5)
+    parser.add_argument("--holdout", type=float, default=0.1, help="Share kept for evaluation")
+    args = parser.parse_args()
+
+    texts, labels = [], []
+    collection = MongoClient(args.db_uri).get_database("AnjaniBot").get_collection("SPAM_DUMP")
+    for data in collection.find({}, {"text": 1, "spam": 1, "ham": 1}):
+        label = get_label(data)
+        if label is not None and data.get("text"):
+            texts.append(data["text"])
+            labels.append(label)
+
+    split = int(len(texts) * (1 - args.holdout))
+    order = np.random.default_rng(0).permutation(len(texts))
+    train, test = order[:split], order[split:]
+    print(f"Training on {len(train)} samples, {int(sum(labels))} spam in total")
+
+    model = SpamClassifier().fit(
+        [texts[i] for i in train], [labels[i] for i in train], epochs=args.epochs
+    )
+    if len(test):
+        proba = model.predict([texts[i] for i in test])
+        accuracy = ((proba > 0.5) == np.asarray([labels[i] for i in test])).mean()
+        print(f"Accuracy on {len(test)} held out samples: {accuracy:.2%}")
+
+    model.save(args.output)
+
+
+if __name__ == "__main__":
+    _main()
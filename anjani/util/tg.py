@@ -26,6 +26,7 @@ from typing import (
     AsyncGenerator,
     Callable,
     List,
+    Mapping,
     Optional,
     Set,
     Tuple,
@@ -41,7 +42,9 @@ from pyrogram.errors import (
     ChatAdminRequired,
     ChatForbidden,
     ChatWriteForbidden,
+    FloodWait,
     MessageDeleteForbidden,
+    RPCError,
     UserNotParticipant,
 )
 from pyrogram.types import (
@@ -56,12 +59,15 @@ from typing_extensions import ParamSpecArgs, ParamSpecKwargs
 
 from anjani.util import types as _types
 from anjani.util.async_helper import run_sync
+from anjani.util.member_cache import ADMIN_STATUS, ChatAdminCache, ChatMemberCache
 
 if TYPE_CHECKING:
     from anjani.core import Anjani
 
 MESSAGE_CHAR_LIMIT = 4096
 STAFF: Set[int] = set()
+MEMBERS = ChatMemberCache()
+ADMINS = ChatAdminCache()
 TRUNCATION_SUFFIX = "... (truncated)"
 
 Button = Union[Tuple[Tuple[str, str, bool]], List[Tuple[str, str, bool]]]
@@ -234,12 +240,29 @@ Bot = ChatMember
 Member = ChatMember
 
 
+async def get_chat_member(client: Client, chat: int, user: Union[int, str]) -> ChatMember:
+    """Get a chat member through the shared member cache"""
+    if user == "me" and MEMBERS.bot_id is not None:
+        user = MEMBERS.bot_id
+
+    if isinstance(user, int):
+        member = MEMBERS.get(chat, user)
+        if member is not None:
+            return member
+
+    member = await client.get_chat_member(chat, user)
+    if member.user:
+        MEMBERS.put(chat, member.user.id, member)
+
+    return member
+
+
 async def fetch_permissions(
     client: Client, chat: int, user: int
 ) -> Tuple[Optional[Bot], Optional[Member]]:
     try:
         bot, member = await asyncio.gather(
-            client.get_chat_member(chat, "me"), client.get_chat_member(chat, user)
+            get_chat_member(client, chat, "me"), get_chat_member(client, chat, user)
         )
         return bot, member
     except UserNotParticipant:
@@ -263,6 +286,56 @@ async def get_chat_admins(
             yield member
 
 
+async def _get_admin_roster(client: Client, chat: int) -> Optional[Mapping[int, bool]]:
+    admins = ADMINS.get(chat)
+    if admins is not None or ADMINS.failed(chat):
+        return admins
+
+    try:
+        return ADMINS.put(chat, [member async for member in get_chat_admins(client, chat)])
+    except FloodWait as flood:
+        ADMINS.fail(chat, flood.value)  # type: ignore
+    except RPCError:
+        ADMINS.fail(chat)
+
+    return None
+
+
+async def get_admin_ids(
+    client: Client, chat: int, *, exclude_bot: bool = False
+) -> Optional[Set[int]]:
+    """Get the ids of the chat admins, through the shared admin cache.
+
+    Returns None while the admins of the chat can't be fetched.
+    """
+    admins = await _get_admin_roster(client, chat)
+    if admins is None:
+        return None
+
+    if exclude_bot:
+        return {admin for admin, is_bot in admins.items() if not is_bot}
+
+    return set(admins)
+
+
+async def is_admin(client: Client, chat: int, user: int) -> bool:
+    """Check whether the user is an admin of the chat.
+
+    Falls back to the member itself when the admins of the chat can't be
+    fetched, its errors are raised so nobody is taken for a regular member.
+    """
+    admins = await _get_admin_roster(client, chat)
+    if admins is not None:
+        return user in admins
+
+    try:
+        member = await get_chat_member(client, chat, user)
+    except UserNotParticipant:
+        return False
+
+    return member.status in ADMIN_STATUS
+
+
 # }
 
 
@@ -335,7 +408,9 @@ def __loop_safe(
                 One or more keyword values that should be formatted and inserted in the string.
                 based on the keyword on the language strings.
         """
-        return await run_sync(func, bot, chat_id, text_name, *args, noformat=noformat, **kwargs)
+        return await run_sync(
+            func, bot, chat_id, text_name, *args, noformat=noformat, pool="cpu", **kwargs
+        )
 
     return wrapper
 
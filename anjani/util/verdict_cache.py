@@ -0,0 +1,152 @@
+"""Anjani external verdict cache"""
+# Copyright (C) 2020 - 2023  UserbotIndo Team, <https://github.com/userbotindo.git>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import asyncio
+import logging
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from time import monotonic
+from typing import Any, Awaitable, Callable, MutableMapping, Tuple
+
+from pymongo.errors import PyMongoError
+
+from .db import AsyncCollection
+
+
+class VerdictCache:
+    """Two tier cache of the verdicts of external services on users.
+
+    Verdicts are kept in an in-process LRU of at most ``max_size`` entries,
+    backed by a collection with a TTL index so they survive restarts. A truthy
+    verdict (the user is flagged) lives for ``positive_ttl`` seconds and a
+    falsy one for ``negative_ttl`` seconds. Concurrent lookups of the same
+    user share a single call to the service, and failed calls aren't cached.
+    """
+
+    collection: AsyncCollection
+    positive_ttl: float
+    negative_ttl: float
+    max_size: int
+    log: logging.Logger
+
+    _data: MutableMapping[str, Tuple[float, Any]]
+    _inflight: MutableMapping[str, "asyncio.Future[Any]"]
+
+    def __init__(
+        self,
+        collection: AsyncCollection,
+        *,
+        positive_ttl: float = 21600,
+        negative_ttl: float = 1800,
+        max_size: int = 10000,
+    ) -> None:
+        self.collection = collection
+        self.positive_ttl = positive_ttl
+        self.negative_ttl = negative_ttl
+        self.max_size = max_size
+        self.log = logging.getLogger("cache.verdicts")
+
+        self._data = OrderedDict()
+        self._inflight = {}
+
+    async def setup(self) -> None:
+        """Create the TTL index, documents expire at their ``expire`` date"""
+        await self.collection.create_index("expire", expireAfterSeconds=0)
+
+    def _get_local(self, key: str) -> Tuple[bool, Any]:
+        try:
+            expire, verdict = self._data[key]
+        except KeyError:
+            return False, None
+
+        if expire < monotonic():
+            del self._data[key]
+            return False, None
+
+        self._data.move_to_end(key)  # type: ignore
+        return True, verdict
+
+    def _put_local(self, key: str, verdict: Any, ttl: float) -> None:
+        self._data[key] = (monotonic() + ttl, verdict)
+        self._data.move_to_end(key)  # type: ignore
+        while len(self._data) > self.max_size:
+            self._data.popitem(last=False)  # type: ignore
+
+    async def get(
+        self, service: str, user_id: int, fetch: Callable[[], Awaitable[Any]], default: Any = None
+    ) -> Any:
+        """Get the verdict of the service, calling ``fetch`` on a miss.
+
+        Returns ``default`` if ``fetch`` raises, the error is only logged.
+        """
+        key = f"{service}:{user_id}"
+        found, verdict = self._get_local(key)
+        if found:
+            return verdict
+
+        try:
+            return await asyncio.shield(self._inflight[key])
+        except KeyError:
+            pass
+
+        future = self._inflight[key] = asyncio.get_event_loop().create_future()
+        try:
+            verdict = await self._lookup(key, fetch, default)
+            future.set_result(verdict)
+            return verdict
+        except BaseException:
+            # Don't leave the other waiters hanging
+            future.set_result(default)
+            raise
+        finally:
+            del self._inflight[key]
+
+    async def _lookup(self, key: str, fetch: Callable[[], Awaitable[Any]], default: Any) -> Any:
+        now = datetime.utcnow()
+        try:
+            data = await self.collection.find_one({"_id": key, "expire": {"$gt": now}})
+        except PyMongoError as e:
+            self.log.warning(f"Failed to read verdict {key}: {e}")
+            data = None
+
+        if data is not None:
+            ttl = (data["expire"] - now).total_seconds()
+            self._put_local(key, data["verdict"], ttl)
+            return data["verdict"]
+
+        try:
+            verdict = await fetch()
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:  # skipcq: PYL-W0703
+            self.log.debug(f"Failed to get verdict {key}: {e!r}")
+            return default
+
+        ttl = self.positive_ttl if verdict else self.negative_ttl
+        self._put_local(key, verdict, ttl)
+        try:
+            await self.collection.update_one(
+                {"_id": key},
+                {"$set": {"verdict": verdict, "expire": now + timedelta(seconds=ttl)}},
+                upsert=True,
+            )
+        except PyMongoError as e:
+            self.log.warning(f"Failed to store verdict {key}: {e}")
+
+        return verdict
+
+    def invalidate(self, service: str, user_id: int) -> None:
+        self._data.pop(f"{service}:{user_id}", None)
@@ -0,0 +1,67 @@
+#!/usr/bin/env python
+# Copyright (C) 2020 - 2023  UserbotIndo Team, <https://github.com/userbotindo.git>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Micro-benchmark of the script detection against the unicodedata implementation.
+
+Run with: python -m test.bench_script
+"""
+
+import timeit
+import unicodedata as ud
+
+from anjani.util.script import detect_scripts, get_table, is_rtl
+
+SAMPLES = {
+    "latin": "The quick brown fox jumps over the lazy dog. " * 20,
+    "cyrillic": "Съешь же ещё этих мягких французских булок, да выпей чаю. " * 20,
+    "arabic-end": "The quick brown fox jumps over the lazy dog. " * 20 + "مرحبا",
+    "arabic-start": "مرحبا " + "The quick brown fox jumps over the lazy dog. " * 20,
+}
+
+
+def old_detect_alphabet(text):
+    return {ud.name(char).split(" ")[0].lower() for char in text if char.isalpha()}
+
+
+def old_is_rtl(text):
+    checkers = old_detect_alphabet(text)
+    return "arabic" in checkers or "hebrew" in checkers
+
+
+def bench(func, text, number):
+    return min(timeit.repeat(lambda: func(text), number=number, repeat=5)) / number * 1e6
+
+
+def main(number: int = 2000) -> None:
+    get_table()  # Don't count the lazy table build
+
+    print(f"{'sample':<14}{'function':<16}{'old (us)':>10}{'new (us)':>10}{'speedup':>9}")
+    for name, text in SAMPLES.items():
+        for label, old, new in (
+            ("rtl", old_is_rtl, is_rtl),
+            ("detect", old_detect_alphabet, detect_scripts),
+        ):
+            assert old(text) == new(text)
+            old_time = bench(old, text, number)
+            new_time = bench(new, text, number)
+            print(
+                f"{name:<14}{label:<16}{old_time:>10.2f}{new_time:>10.2f}"
+                f"{old_time / new_time:>8.1f}x"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+#!/usr/bin/env python
+# Copyright (C) 2020 - 2023  UserbotIndo Team, <https://github.com/userbotindo.git>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import asyncio
+import threading
+
+import pytest
+
+from anjani.util.async_helper import _Pool, run_sync
+
+
+def depth(pool):
+    return pool.queue_depth._value.get()
+
+
+@pytest.mark.asyncio
+async def test_queue_depth():
+    pool = _Pool("test", 1)
+    release = threading.Event()
+    running = pool.submit(release.wait)
+    queued = [pool.submit(lambda: None) for _ in range(3)]
+    try:
+        await asyncio.sleep(0.05)
+        assert depth(pool) == 3
+
+        # Cancelled while waiting, they never start
+        queued[0].cancel()
+        queued[1].cancel()
+        await asyncio.sleep(0)
+        assert depth(pool) == 1
+    finally:
+        release.set()
+
+    await asyncio.gather(running, queued[2])
+    assert depth(pool) == 0
+    pool.executor.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_run_sync():
+    assert await run_sync(sum, [1, 2, 3], pool="cpu") == 6
+    assert await run_sync(int, "ff", base=16) == 255
+    with pytest.raises(ValueError):
+        await run_sync(int, "1", pool="unknown")
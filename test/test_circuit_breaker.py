@@ -0,0 +1,143 @@
+#!/usr/bin/env python
+# Copyright (C) 2020 - 2023  UserbotIndo Team, <https://github.com/userbotindo.git>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import asyncio
+
+import pytest
+
+from anjani.util import circuit_breaker
+from anjani.util.circuit_breaker import CircuitBreaker, CircuitOpen
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class Service:
+    def __init__(self):
+        self.up = False
+        self.calls = 0
+
+    async def __call__(self):
+        self.calls += 1
+        if not self.up:
+            raise ValueError("down")
+
+        return "ok"
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(circuit_breaker, "monotonic", clock)
+    return clock
+
+
+async def fail(breaker, service, times):
+    for _ in range(times):
+        with pytest.raises(ValueError):
+            await breaker.call(service)
+
+
+@pytest.mark.asyncio
+async def test_open_and_close(clock):
+    breaker = CircuitBreaker("test", threshold=3, reset_timeout=30)
+    service = Service()
+    await fail(breaker, service, 2)
+    assert not breaker.is_open
+
+    await fail(breaker, service, 1)
+    assert breaker.is_open
+    with pytest.raises(CircuitOpen):
+        await breaker.call(service)
+    assert service.calls == 3
+
+    # Probe once the reset timeout passed
+    clock.now += 30
+    service.up = True
+    assert await breaker.call(service) == "ok"
+    assert not breaker.is_open
+    assert service.calls == 4
+
+
+@pytest.mark.asyncio
+async def test_success_resets(clock):
+    breaker = CircuitBreaker("test", threshold=2)
+    service = Service()
+    await fail(breaker, service, 1)
+    service.up = True
+    await breaker.call(service)
+    service.up = False
+    await fail(breaker, service, 1)
+    assert not breaker.is_open
+
+
+@pytest.mark.asyncio
+async def test_failed_probe(clock):
+    breaker = CircuitBreaker("test", threshold=1, reset_timeout=30)
+    service = Service()
+    await fail(breaker, service, 1)
+
+    clock.now += 30
+    await fail(breaker, service, 1)
+    assert breaker.is_open
+
+    # The probe failure restarts the wait
+    clock.now += 29
+    with pytest.raises(CircuitOpen):
+        await breaker.call(service)
+    clock.now += 1
+    service.up = True
+    assert await breaker.call(service) == "ok"
+
+
+@pytest.mark.asyncio
+async def test_single_probe(clock):
+    breaker = CircuitBreaker("test", threshold=1, reset_timeout=30)
+    service = Service()
+    await fail(breaker, service, 1)
+    clock.now += 30
+
+    release = asyncio.Event()
+
+    async def slow():
+        await release.wait()
+        return "ok"
+
+    probe = asyncio.ensure_future(breaker.call(slow))
+    await asyncio.sleep(0)
+    with pytest.raises(CircuitOpen):
+        await breaker.call(service)
+
+    release.set()
+    assert await probe == "ok"
+    assert not breaker.is_open
+
+
+@pytest.mark.asyncio
+async def test_timeout(clock):
+    breaker = CircuitBreaker("test", threshold=1, timeout=0.01)
+
+    async def hang():
+        await asyncio.sleep(1)
+
+    with pytest.raises(asyncio.TimeoutError):
+        await breaker.call(hang)
+    assert breaker.is_open
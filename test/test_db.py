@@ -0,0 +1,95 @@
+#!/usr/bin/env python
+# Copyright (C) 2020 - 2023  UserbotIndo Team, <https://github.com/userbotindo.git>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import os
+
+import pytest
+
+from anjani.util.db import AsyncClient
+from anjani.util.db.native import AsyncNativeCursor
+
+DB_URI = os.environ.get("TEST_DB_URI")
+
+
+class NativeCursor:
+    """Stand-in of the native driver cursor"""
+
+    def __init__(self, docs):
+        self.docs = list(docs)
+        self.calls = []
+        self.alive = True
+
+    def __getattr__(self, name):
+        def chain(*args):
+            self.calls.append((name, args))
+            return self
+
+        return chain
+
+    async def next(self):
+        if not self.docs:
+            raise StopAsyncIteration
+
+        return self.docs.pop(0)
+
+    async def to_list(self, length):
+        docs, self.docs = self.docs[:length], self.docs[length:] if length else []
+        return docs
+
+    async def close(self):
+        self.alive = False
+
+
+@pytest.mark.asyncio
+async def test_native_cursor():
+    docs = [{"_id": i} for i in range(3)]
+    cursor = AsyncNativeCursor(NativeCursor(docs), None)
+    assert cursor.sort("_id", direction=-1).skip(1).limit(2) is cursor
+    assert cursor.dispatch.calls == [("sort", ("_id", -1)), ("skip", (1,)), ("limit", (2,))]
+    assert [doc async for doc in cursor] == docs
+
+    cursor = AsyncNativeCursor(NativeCursor(docs), None)
+    assert await cursor.to_list(2) == docs[:2]
+    with pytest.raises(ValueError):
+        cursor.to_list(-1)
+
+    async with cursor:
+        pass
+    assert cursor.closed and not cursor.alive
+
+
+@pytest.mark.skipif(not DB_URI, reason="TEST_DB_URI is not set")
+@pytest.mark.parametrize("native", [False, True])
+@pytest.mark.asyncio
+async def test_find(native):
+    client = AsyncClient(DB_URI, connect=False, native=native)
+    collection = client.get_database("anjani_test").get_collection("find")
+    try:
+        await collection.delete_many({})
+        await collection.insert_many([{"_id": i, "even": i % 2 == 0} for i in range(10)])
+
+        cursor = collection.find({"even": True}).sort("_id", direction=-1).skip(1).limit(3)
+        assert [doc["_id"] async for doc in cursor] == [6, 4, 2]
+        assert await collection.find({"even": False}).to_list(2) == [
+            {"_id": 1, "even": False},
+            {"_id": 3, "even": False},
+        ]
+        assert await collection.find().distinct("even") == [False, True]
+        async with collection.find() as cursor:
+            assert await cursor.next() == {"_id": 0, "even": True}
+    finally:
+        await collection.drop()
+        await client.close()
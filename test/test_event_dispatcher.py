@@ -0,0 +1,131 @@
+#!/usr/bin/env python
+# Copyright (C) 2020 - 2023  UserbotIndo Team, <https://github.com/userbotindo.git>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import asyncio
+import bisect
+import logging
+from types import SimpleNamespace
+
+import pytest
+from pyrogram.types import Message
+
+from anjani import filters
+from anjani.core.event_dispatcher import DispatchPlan, EventDispatcher
+from anjani.listener import Listener
+from anjani.util.misc import StopPropagation
+
+
+async def on_message(*_):
+    pass
+
+
+def plan(*listeners):
+    sorted_listeners = []
+    for name, priority, concurrent in listeners:
+        lst = Listener("message", on_message, name, priority, concurrent=concurrent)
+        bisect.insort(sorted_listeners, lst)
+
+    return [[lst.plugin for lst, _, _ in band] for band in DispatchPlan(sorted_listeners).bands]
+
+
+def test_bands():
+    assert plan(
+        ("Filters", 95, True),
+        ("Users", 50, False),
+        ("Lockings", 95, False),
+        ("SpamShield", 65, True),
+        ("Notes", 95, True),
+        ("Federation", 65, True),
+        ("Stats", 100, True),
+        ("Misc", 95, True),
+    ) == [
+        ["Users"],
+        ["SpamShield", "Federation"],
+        ["Lockings"],
+        ["Filters", "Notes", "Misc"],
+        ["Stats"],
+    ]
+
+
+def test_sequential_bands():
+    assert plan(("A", 100, False), ("B", 100, False)) == [["A"], ["B"]]
+    assert plan(("A", 100, True), ("B", 100, False), ("C", 100, True)) == [["B"], ["A", "C"]]
+    assert plan() == []
+
+
+class Dispatcher(EventDispatcher):
+    client = None
+    log = logging.getLogger("test.dispatcher")
+
+    def update_plugin_events(self):
+        pass
+
+
+def recorder(calls, name, result=None):
+    async def on_message(message):
+        calls.append(name)
+        await asyncio.sleep(0)
+        if isinstance(result, BaseException):
+            raise result
+
+        return result
+
+    return on_message
+
+
+@pytest.mark.asyncio
+async def test_dispatch():
+    calls = []
+    bot = Dispatcher()
+    plug = SimpleNamespace(name="Test")
+
+    async def is_odd(_, __, message):
+        return message.id % 2 == 1
+
+    odd = filters.create(is_odd)
+    bot.register_listener(plug, "message", recorder(calls, "first", 1), priority=50)
+    bot.register_listener(plug, "message", recorder(calls, "odd", 2), filters=odd)
+    bot.register_listener(plug, "message", recorder(calls, "any", 3), concurrent=True)
+    bot.register_listener(plug, "message", recorder(calls, "last", 4), priority=110)
+
+    assert await bot.dispatch_event("message", Message(id=1)) == (1, 2, 3, 4)
+    assert calls == ["first", "odd", "any", "last"]
+
+    calls.clear()
+    assert await bot.dispatch_event("message", Message(id=2)) == (1, 3, 4)
+    assert await bot.dispatch_event("message", Message(id=2), max_priority=100) == (1,)
+    assert await bot.dispatch_event("edited_message", Message(id=1)) is None
+
+    # Recompiled as listeners go away
+    for lst in list(bot.listeners["message"]):
+        bot.unregister_listener(lst)
+    assert "message" not in bot._dispatch_plans
+
+
+@pytest.mark.asyncio
+async def test_dispatch_stop():
+    calls = []
+    bot = Dispatcher()
+    plug = SimpleNamespace(name="Test")
+    bot.register_listener(
+        plug, "message", recorder(calls, "stop", StopPropagation()), concurrent=True
+    )
+    bot.register_listener(plug, "message", recorder(calls, "same", 1), concurrent=True)
+    bot.register_listener(plug, "message", recorder(calls, "next", 2), priority=110)
+
+    # The rest of the band still runs, the next bands don't
+    assert await bot.dispatch_event("message", Message(id=1)) == (1,)
+    assert calls == ["stop", "same"]
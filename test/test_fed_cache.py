@@ -0,0 +1,153 @@
+#!/usr/bin/env python
+# Copyright (C) 2020 - 2023  UserbotIndo Team, <https://github.com/userbotindo.git>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import pytest
+
+from anjani.util.fed_cache import FedBanCache, FedIndex
+
+
+class Stream:
+    def __init__(self, changes):
+        self.changes = changes
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *_):
+        pass
+
+    async def __aiter__(self):
+        for change in self.changes:
+            yield change
+
+
+class Cursor:
+    def __init__(self, docs):
+        self.docs = docs
+
+    async def __aiter__(self):
+        for doc in self.docs:
+            yield doc
+
+
+class Collection:
+    def __init__(self, docs, changes):
+        self.docs = docs
+        self.changes = changes
+
+    def find(self, *_, **__):
+        return Cursor(self.docs)
+
+    def watch(self, *_, **__):
+        return Stream(self.changes)
+
+
+def test_bans():
+    cache = FedBanCache(None)
+    cache.add("a", 1)
+    cache.add("a", 1)
+    cache.add("b", 1)
+    cache.add("b", 2)
+    assert len(cache) == 3
+    assert cache.contains("a", 1) and not cache.contains("a", 2)
+    assert cache.is_banned(1) and cache.is_banned(2)
+
+    # Still banned while another federation bans it
+    cache.discard("a", 1)
+    assert not cache.contains("a", 1)
+    assert cache.is_banned(1)
+
+    cache.drop("b")
+    assert not cache.is_banned(1) and not cache.is_banned(2)
+    assert len(cache) == 0
+
+    cache.discard("c", 3)
+    cache.drop("c")
+
+
+@pytest.mark.asyncio
+async def test_watch():
+    bans = [{"fed_id": "a", "target_id": 1}]
+    changes = [{"fullDocument": {"fed_id": "b", "target_id": 2}}]
+    cache = FedBanCache(Collection(bans, changes))
+    await cache._watch()
+    assert cache.ready
+    assert cache.contains("a", 1) and cache.contains("b", 2)
+
+    cache.clear()
+    assert not cache.ready
+    assert not cache.is_banned(1)
+
+
+def test_index():
+    index = FedIndex(None)
+    index.load(
+        [
+            {"_id": "a", "name": "A", "chats": [-1, -2], "subscribers": ["b"]},
+            {"_id": "b", "name": "B", "chats": [-3]},
+        ]
+    )
+    assert index.get(-1) == "a" and index.get(-3) == "b"
+    assert index.get(-4) is None
+    assert index.name("a") == "A"
+    assert index.chats("a") == {-1, -2}
+
+    # A chat is in a single federation
+    index.join("b", -1)
+    assert index.get(-1) == "b"
+    assert index.chats("a") == {-2}
+    index.leave(-1)
+    assert index.get(-1) is None
+    assert index.chats("b") == {-3}
+
+
+def test_closure():
+    index = FedIndex(None)
+    # c subscribes to b and d, b subscribes to a
+    index.subscribe("a", "b")
+    index.subscribe("b", "c")
+    index.subscribe("d", "c")
+    scope = index.scope("c")
+    # Nearest federations first
+    assert scope[0] == "c" and set(scope[1:3]) == {"b", "d"} and scope[3] == "a"
+    assert index.audience("a") == ("a", "b", "c")
+
+    # Cycles end
+    index.subscribe("c", "a")
+    assert set(index.scope("a")) == {"a", "b", "c", "d"}
+    assert index.audience("a") == ("a", "b", "c")
+
+    index.unsubscribe("b", "c")
+    assert index.scope("c") == ("c", "d")
+    assert index.audience("a") == ("a", "b")
+
+
+def test_put():
+    index = FedIndex(None)
+    index.put({"_id": "a", "chats": [-1], "subscribers": ["b"]})
+    index.put({"_id": "b", "chats": [-2], "subscribers": ["c"]})
+    assert index.scope("c") == ("c", "b", "a")
+
+    # The document doesn't hold the subscriptions of b, they're kept
+    index.put({"_id": "b", "chats": [-3]})
+    assert index.get(-2) is None and index.get(-3) == "b"
+    assert index.scope("b") == ("b", "a")
+    assert index.scope("c") == ("c",)
+
+    index.remove("a")
+    assert index.get(-1) is None
+    assert index.scope("b") == ("b",)
+    assert index.name("a") is None
@@ -0,0 +1,163 @@
+#!/usr/bin/env python
+# Copyright (C) 2020 - 2023  UserbotIndo Team, <https://github.com/userbotindo.git>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+from types import SimpleNamespace
+
+import pytest
+from pymongo import UpdateOne
+
+from anjani import util  # noqa: F401  # skipcq: PY-W2000
+from anjani.plugins.federation import Federation
+from anjani.util.fed_cache import FedBanCache, FedIndex
+
+
+@pytest.mark.parametrize(
+    "line, ban",
+    [
+        ("1,Name,spam,2023-01-01 00:00:00\n", (1, "Name", "spam")),
+        ("1,Name,spam, scam links,2023-01-01 00:00:00\n", (1, "Name", "spam, scam links")),
+        ("1,Name,,2023-01-01 00:00:00\n", (1, "Name", "")),
+        ("1,Name,spam", (1, "Name", "spam")),
+        ("user_id,name,reason,time\n", None),
+        ("1,Name\n", None),
+        ("\n", None),
+    ],
+)
+def test_parse_backup_line(line, ban):
+    assert Federation._parse_backup_line(line) == ban
+
+
+class Cursor:
+    def __init__(self, docs):
+        self.docs = docs
+
+    async def __aiter__(self):
+        for doc in self.docs:
+            yield doc
+
+    async def to_list(self):
+        return self.docs
+
+
+class Collection:
+    def __init__(self, docs=()):
+        self.docs = list(docs)
+        self.ops = []
+        self.updates = []
+
+    def find(self, *_):
+        return Cursor(self.docs)
+
+    async def bulk_write(self, ops, ordered=True):
+        self.ops.extend(ops)
+
+    async def update_one(self, query, update):
+        self.updates.append((query, update))
+
+
+@pytest.mark.asyncio
+async def test_migrate_bans():
+    plugin = Federation(SimpleNamespace())
+    ban = {"name": "Spammer", "reason": "spam"}
+    plugin.db = Collection(
+        [
+            {"_id": "a", "banned": {"1": ban, "2": None}, "banned_chat": {"-100": {"title": "Ch"}}},
+            {"_id": "b", "banned": {}},
+        ]
+    )
+    plugin.bans_db = Collection()
+    await plugin._migrate_bans()
+
+    assert plugin.bans_db.ops == [
+        UpdateOne(
+            {"fed_id": "a", "target_id": 1},
+            {"$setOnInsert": {**ban, "type": "user"}},
+            upsert=True,
+        ),
+        UpdateOne({"fed_id": "a", "target_id": 2}, {"$setOnInsert": {"type": "user"}}, upsert=True),
+        UpdateOne(
+            {"fed_id": "a", "target_id": -100},
+            {"$setOnInsert": {"title": "Ch", "type": "chat"}},
+            upsert=True,
+        ),
+    ]
+    unset = {"$unset": {"banned": "", "banned_chat": ""}}
+    assert plugin.db.updates == [({"_id": "a"}, unset), ({"_id": "b"}, unset)]
+
+
+class Bans:
+    def __init__(self, bans):
+        self.bans = bans
+        self.queries = 0
+
+    def find(self, query):
+        self.queries += 1
+        bans = [
+            dict(ban)
+            for ban in self.bans
+            if ban["fed_id"] in query["fed_id"]["$in"] and ban["target_id"] == query["target_id"]
+        ]
+        return Cursor(bans)
+
+
+@pytest.mark.asyncio
+async def test_is_fbanned():
+    plugin = Federation(SimpleNamespace())
+    plugin.fed_index = FedIndex(None)
+    plugin.fed_index.load(
+        [
+            {"_id": "a", "name": "A", "chats": [-1]},
+            {"_id": "b", "name": "B", "subscribers": ["a"]},
+        ]
+    )
+    plugin.fed_index.ready = True
+    plugin.ban_cache = FedBanCache(None)
+    plugin.ban_cache.ready = True
+    plugin.bans_db = Bans([{"fed_id": "b", "target_id": 1}])
+    for fid, target in (("a", 1), ("b", 1), ("b", 2)):
+        plugin.ban_cache.add(fid, target)
+
+    # Not banned anywhere, no query
+    assert await plugin.is_fbanned(-1, 3) is None
+    assert plugin.bans_db.queries == 0
+
+    # The ban of the subscribed federation applies, the stale one is dropped
+    data = await plugin.is_fbanned(-1, 1)
+    assert data["fed_id"] == "b" and data["fed_name"] == "B" and data["subfed"]
+    assert not plugin.ban_cache.contains("a", 1)
+
+    # Chats outside of any federation
+    assert await plugin.is_fbanned(-2, 1) is None
+
+
+class Feds:
+    async def find_one_and_update(self, query, update, projection):
+        return {"_id": "a"} if query["chats"] == -1 else None
+
+
+@pytest.mark.asyncio
+async def test_chat_migrate():
+    plugin = Federation(SimpleNamespace())
+    plugin.db = Feds()
+    plugin.fed_index = FedIndex(None)
+    plugin.fed_index.load([{"_id": "a", "name": "A", "chats": [-1, -2]}])
+
+    await plugin.on_chat_migrate(
+        SimpleNamespace(chat=SimpleNamespace(id=-100), migrate_from_chat_id=-1)
+    )
+    assert plugin.fed_index.chats("a") == {-100, -2}
+    assert plugin.fed_index.get(-1) is None
+    assert plugin.fed_index.get(-100) == "a"
@@ -0,0 +1,223 @@
+#!/usr/bin/env python
+# Copyright (C) 2020 - 2023  UserbotIndo Team, <https://github.com/userbotindo.git>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import asyncio
+from collections import OrderedDict
+from types import SimpleNamespace
+
+import pytest
+
+from anjani import util  # noqa: F401  # skipcq: PY-W2000
+from anjani.plugins.filters import Filters
+
+
+class Collection:
+    def __init__(self, triggers):
+        self.triggers = triggers
+        self.reads = 0
+
+    async def find_one(self, query, projection):
+        self.reads += 1
+        (keyword,) = (key.split(".", 1)[1] for key in projection)
+        triggers = self.triggers.get(query["chat_id"], {})
+        return {"trigger": {keyword: triggers[keyword]}} if keyword in triggers else None
+
+
+@pytest.mark.asyncio
+async def test_payloads(monkeypatch):
+    monkeypatch.setattr(Filters, "_Filters__max_payloads", 2)
+    plugin = Filters(SimpleNamespace())
+    plugin.payloads = OrderedDict()
+    hello = {"text": "Hello", "type": 0, "content": None, "buttons": []}
+    plugin.db = Collection({-1: {"hi": hello, "bye": "Goodbye"}, -2: {"hi": hello}})
+
+    assert await plugin.get_filter(-1, "hi") == (hello, None)
+    assert await plugin.get_filter(-1, "hi") == (hello, None)
+    assert plugin.db.reads == 1
+
+    # Missing filters aren't cached
+    assert await plugin.get_filter(-1, "nope") is None
+    assert await plugin.get_filter(-1, "nope") is None
+    assert plugin.db.reads == 3
+
+    # The least recently used one goes first
+    assert await plugin.get_filter(-1, "bye") == ("Goodbye", None)
+    await plugin.get_filter(-1, "hi")
+    await plugin.get_filter(-2, "hi")
+    assert list(plugin.payloads) == [(-1, "hi"), (-2, "hi")]
+
+    plugin.uncache_payloads(-1)
+    assert list(plugin.payloads) == [(-2, "hi")]
+    plugin.uncache_payloads(-2, "hi")
+    assert not plugin.payloads
+
+
+def test_keyboard():
+    plugin = Filters(SimpleNamespace())
+    plugin.payloads = OrderedDict()
+    buttons = [["Site", "https://example.com", False], ["Docs", "https://example.com/docs", True]]
+    filt = {"text": "Links", "type": 1, "content": None, "buttons": buttons}
+
+    # Built once along with the payload
+    _, keyb = plugin.cache_payload(-1, "links", filt)
+    assert [[btn.text for btn in row] for row in keyb.inline_keyboard] == [["Site", "Docs"]]
+    assert plugin.payloads[(-1, "links")][1] is keyb
+
+
+def compiled_plugin(*triggers):
+    plugin = Filters(SimpleNamespace())
+    plugin.trigger = {-1: set(triggers)}
+    plugin.patterns = {}
+    plugin.compile_trigger(-1)
+    matched = []
+
+    async def get_filter(_, keyword):
+        matched.append(keyword)
+
+    plugin.get_filter = get_filter
+    return plugin, matched
+
+
+async def match(plugin, matched, text):
+    matched.clear()
+    message = SimpleNamespace(chat=SimpleNamespace(id=-1))
+    await plugin.reply_filter(message, plugin.patterns[-1], text)
+    return matched[0] if matched else None
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "text, trigger",
+    [
+        ("say hi!", "hi"),
+        ("this", None),
+        ("I like c++ a lot", "c++"),
+        ("c++x", None),
+        ("#tag.", "#tag"),
+        ("a#tag", None),
+        ("ready !go", "!go"),
+        ("ready!go", None),
+    ],
+)
+async def test_trigger_boundaries(text, trigger):
+    plugin, matched = compiled_plugin("hi", "c++", "#tag", "!go")
+    assert await match(plugin, matched, text) == trigger
+
+
+@pytest.mark.asyncio
+async def test_trigger_longest_first():
+    plugin, matched = compiled_plugin("hello", "hello world", "hello world again")
+    assert await match(plugin, matched, "hello world!") == "hello world"
+    assert await match(plugin, matched, "hello world again") == "hello world again"
+    assert await match(plugin, matched, "hello there") == "hello"
+
+
+@pytest.mark.asyncio
+async def test_trigger_case():
+    plugin, matched = compiled_plugin("Hello", "sos", "Straße")
+    assert await match(plugin, matched, "HELLO") == "Hello"
+    assert await match(plugin, matched, "STRAẞE") == "Straße"
+    # 'ſ'.lower() is itself, only the regex folds it to 's'
+    assert await match(plugin, matched, "ſoſ") == "sos"
+
+
+class FilterCollection:
+    def __init__(self):
+        self.updates = []
+
+    async def update_one(self, query, update, upsert=False):
+        self.updates.append(update)
+
+
+@pytest.mark.asyncio
+async def test_filter_case_replaced(monkeypatch):
+    monkeypatch.setattr(
+        "anjani.plugins.filters.get_message_info", lambda msg: (msg.text, 0, None, [])
+    )
+    plugin = Filters(SimpleNamespace())
+    plugin.trigger = {}
+    plugin.patterns = {}
+    plugin.payloads = OrderedDict()
+    plugin.db = FilterCollection()
+
+    async def text(*_):
+        return ""
+
+    plugin.text = text
+
+    async def add(trigger, reply):
+        msg = SimpleNamespace(text=reply, reply_to_message=None)
+        ctx = SimpleNamespace(chat=SimpleNamespace(id=-1), args=[trigger, reply], msg=msg)
+        ctx.message = msg
+        await plugin.cmd_filter(ctx)
+
+    await add("hi", "first")
+    await add("bye", "later")
+    await add("HI", "second")
+    assert plugin.trigger[-1] == {"HI", "bye"}
+    assert plugin.db.updates[-1]["$unset"] == {"trigger.hi": ""}
+    assert "$unset" not in plugin.db.updates[1]
+    assert (-1, "hi") not in plugin.payloads
+    assert (-1, "bye") in plugin.payloads
+    assert plugin.patterns[-1][1] == {"hi": "HI", "bye": "bye"}
+
+
+class SlowCollection(FilterCollection):
+    def __init__(self, filt):
+        super().__init__()
+        self.filt = filt
+        self.release = asyncio.Event()
+
+    async def find_one(self, query, projection):
+        filt = self.filt
+        await self.release.wait()
+        return {"trigger": {"hi": filt}}
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("deleted", [False, True])
+async def test_payload_changed_while_reading(monkeypatch, deleted):
+    monkeypatch.setattr(
+        "anjani.plugins.filters.get_message_info", lambda msg: (msg.text, 0, None, [])
+    )
+    plugin = Filters(SimpleNamespace())
+    plugin.trigger = {-1: {"hi"}}
+    plugin.payloads = OrderedDict()
+    plugin.db = SlowCollection("old")
+
+    async def text(*_):
+        return ""
+
+    plugin.text = text
+    read = asyncio.create_task(plugin.get_filter(-1, "hi"))
+    await asyncio.sleep(0)
+
+    if deleted:
+        await plugin.del_filter(-1, "hi")
+    else:
+        msg = SimpleNamespace(text="new", reply_to_message=None)
+        ctx = SimpleNamespace(chat=SimpleNamespace(id=-1), args=["hi", "new"], msg=msg)
+        ctx.message = msg
+        await plugin.cmd_filter(ctx)
+
+    plugin.db.release.set()
+    payload = await read
+    if deleted:
+        assert payload is None
+        assert not plugin.payloads
+    else:
+        assert payload[0]["text"] == "new"
+        assert plugin.payloads[(-1, "hi")][0]["text"] == "new"
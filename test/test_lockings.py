@@ -0,0 +1,117 @@
+#!/usr/bin/env python
+# Copyright (C) 2020 - 2023  UserbotIndo Team, <https://github.com/userbotindo.git>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+from types import SimpleNamespace
+
+import pytest
+from pyrogram.enums.message_entity_type import MessageEntityType
+
+from anjani import util  # noqa: F401  # skipcq: PY-W2000
+from anjani.plugins.lockings import LOCK_TYPES, MEDIA_LOCKS, Lockings, get_message_features
+
+ALL = sum(LOCK_TYPES.values())
+
+
+def message(**kwargs):
+    attrs = dict(
+        media=None,
+        forward_date=None,
+        reply_markup=None,
+        via_bot=None,
+        sender_chat=None,
+        entities=None,
+        text=None,
+        caption=None,
+    )
+    attrs.update(kwargs)
+    return SimpleNamespace(**attrs)
+
+
+def test_plain_message():
+    assert get_message_features(message(text="hello"), ALL) == 0
+
+
+@pytest.mark.parametrize("lock_type", MEDIA_LOCKS)
+def test_media_features(lock_type):
+    msg = message(media=lock_type, **{lock_type: object()})
+    assert get_message_features(msg, ALL) == LOCK_TYPES[lock_type]
+    assert get_message_features(msg, ALL & ~LOCK_TYPES[lock_type]) == 0
+
+
+@pytest.mark.parametrize(
+    "lock_type, attrs",
+    [
+        ("forward", {"forward_date": 1}),
+        ("button", {"reply_markup": object()}),
+        ("inline", {"via_bot": object()}),
+        ("anon", {"sender_chat": object()}),
+        ("url", {"entities": [SimpleNamespace(type=MessageEntityType.URL)]}),
+        ("rtl", {"text": "مرحبا بالعالم"}),
+        ("rtl", {"caption": "שלום עולם"}),
+    ],
+)
+def test_features(lock_type, attrs):
+    msg = message(**attrs)
+    assert get_message_features(msg, ALL) == LOCK_TYPES[lock_type]
+    assert get_message_features(msg, ALL & ~LOCK_TYPES[lock_type]) == 0
+
+
+def test_other_entities():
+    msg = message(text="hi @user", entities=[SimpleNamespace(type=MessageEntityType.MENTION)])
+    assert get_message_features(msg, ALL) == 0
+
+
+def test_rtl_not_wanted(monkeypatch):
+    calls = []
+    monkeypatch.setattr(util.script, "is_rtl", lambda text: calls.append(text) or True)
+
+    msg = message(text="مرحبا", forward_date=1)
+    assert get_message_features(msg, ALL & ~LOCK_TYPES["rtl"]) == LOCK_TYPES["forward"]
+    assert not calls
+
+    assert get_message_features(msg, ALL) == LOCK_TYPES["forward"] | LOCK_TYPES["rtl"]
+    assert calls == ["مرحبا"]
+
+
+class SettingsCache:
+    def __init__(self, docs):
+        self.docs = docs
+
+    async def get(self, key):
+        return self.docs.get(key)
+
+
+@pytest.mark.asyncio
+async def test_lock_mask():
+    plugin = Lockings(SimpleNamespace())
+    plugin.lock_masks = {}
+    doc = {"chat_id": -1, "type": ["photo", "url"]}
+    plugin.db_cache = SettingsCache({-1: doc})
+
+    assert await plugin.get_lock_mask(-1) == LOCK_TYPES["photo"] | LOCK_TYPES["url"]
+    assert await plugin.get_lock_mask(-2) == 0
+
+    # The same document isn't read again
+    doc["type"].append("sticker")
+    assert await plugin.get_lock_mask(-1) == LOCK_TYPES["photo"] | LOCK_TYPES["url"]
+
+    # A changed document is
+    plugin.db_cache.docs[-1] = {"chat_id": -1, "type": ["sticker"]}
+    assert await plugin.get_lock_mask(-1) == LOCK_TYPES["sticker"]
+
+    del plugin.db_cache.docs[-1]
+    assert await plugin.get_lock_mask(-1) == 0
+    assert -1 not in plugin.lock_masks
@@ -0,0 +1,69 @@
+#!/usr/bin/env python
+# Copyright (C) 2020 - 2023  UserbotIndo Team, <https://github.com/userbotindo.git>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+from types import SimpleNamespace
+
+import pytest
+from pyrogram.errors import ChannelPrivate
+
+from anjani import util
+from anjani.plugins.main import Main
+
+BOT_ID = 1234
+
+
+class Cursor:
+    def __init__(self, docs):
+        self.docs = docs
+
+    def sort(self, key, *, direction=None):
+        return self
+
+    def limit(self, limit):
+        self.docs = self.docs[:limit]
+        return self
+
+    async def __aiter__(self):
+        for doc in self.docs:
+            yield doc
+
+
+class Client:
+    async def get_chat_member(self, chat, user):
+        if chat == -300:
+            raise ChannelPrivate()
+        if chat == -400:
+            raise ValueError(f"Peer id invalid: {chat}")
+
+        return SimpleNamespace(user=SimpleNamespace(id=BOT_ID), chat=chat)
+
+
+@pytest.mark.asyncio
+async def test_prewarm_members(monkeypatch):
+    monkeypatch.setattr(Main, "_Main__prewarm_interval", 0)
+    chats = [{"chat_id": chat_id} for chat_id in (-100, -400, -200, -300)]
+    bot = SimpleNamespace(
+        client=Client(),
+        db=SimpleNamespace(get_collection=lambda _: SimpleNamespace(find=lambda *_: Cursor(chats))),
+    )
+    util.tg.MEMBERS.invalidate(-100)
+    util.tg.MEMBERS.bot_id = BOT_ID
+    await Main(bot)._prewarm_members()
+
+    assert util.tg.MEMBERS.get(-100, BOT_ID).chat == -100
+    assert util.tg.MEMBERS.get(-200, BOT_ID).chat == -200
+    assert util.tg.MEMBERS.get(-300, BOT_ID) is None
+    assert util.tg.MEMBERS.get(-400, BOT_ID) is None
@@ -0,0 +1,76 @@
+#!/usr/bin/env python
+# Copyright (C) 2020 - 2023  UserbotIndo Team, <https://github.com/userbotindo.git>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import asyncio
+
+import pytest
+
+from anjani.util.prediction_cache import PredictionCache
+
+
+class Predictor:
+    def __init__(self, *results):
+        self.results = list(results)
+        self.calls = 0
+
+    async def __call__(self):
+        self.calls += 1
+        await asyncio.sleep(0)
+        result = self.results.pop(0)
+        if isinstance(result, Exception):
+            raise result
+
+        return result
+
+
+@pytest.mark.asyncio
+async def test_single_flight():
+    cache = PredictionCache()
+    predict = Predictor(0.9)
+    assert await asyncio.gather(*(cache.get("hash", predict) for _ in range(5))) == [0.9] * 5
+    assert await cache.get("hash", predict) == 0.9
+    assert predict.calls == 1
+
+    cache.invalidate("hash")
+    predict.results.append(0.1)
+    assert await cache.get("hash", predict) == 0.1
+    assert predict.calls == 2
+
+
+@pytest.mark.asyncio
+async def test_failure():
+    cache = PredictionCache()
+    predict = Predictor(ValueError("Unexpected response"), 0.5)
+    results = await asyncio.gather(
+        cache.get("hash", predict), cache.get("hash", predict), return_exceptions=True
+    )
+    assert all(isinstance(res, ValueError) for res in results)
+    assert len(cache) == 0
+
+    # Not cached, the next lookup tries again
+    assert await cache.get("hash", predict) == 0.5
+    assert predict.calls == 2
+
+
+@pytest.mark.asyncio
+async def test_eviction():
+    cache = PredictionCache(max_size=2)
+    for i in range(3):
+        cache.put(str(i), i / 10)
+
+    assert len(cache) == 2
+    assert await cache.get("2", Predictor()) == 0.2
+    assert await cache.get("0", Predictor(0.5)) == 0.5
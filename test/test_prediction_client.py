@@ -0,0 +1,123 @@
+#!/usr/bin/env python
+# Copyright (C) 2020 - 2023  UserbotIndo Team, <https://github.com/userbotindo.git>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import asyncio
+
+import pytest
+
+from anjani import core  # noqa: F401  # skipcq: PY-W2000
+from anjani.util.prediction_client import PredictionClient
+
+
+class Response:
+    def __init__(self, status, data=None):
+        self.status = status
+        self.data = data
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *_):
+        pass
+
+    async def json(self):
+        return {"data": self.data}
+
+
+class Session:
+    def __init__(self, *responses):
+        self.responses = list(responses)
+        self.requests = []
+
+    def post(self, url, *, json, headers, timeout):
+        self.requests.append((url, json))
+        return self.responses.pop(0)
+
+
+def prediction(text):
+    return {"text": text, "spam": 0.5}
+
+
+@pytest.mark.asyncio
+async def test_single():
+    session = Session(Response(200, prediction("hi")))
+    client = PredictionClient(session, "url", "key")
+    assert await client.predict("hi") == prediction("hi")
+    assert session.requests == [("url", {"text": "hi"})]
+
+
+@pytest.mark.asyncio
+async def test_batch():
+    texts = ["a", "b", "c"]
+    session = Session(
+        Response(200, [prediction(text) for text in texts[:2]]),
+        Response(200, [prediction(texts[2])]),
+    )
+    client = PredictionClient(session, "url", "key", batch_url="batch", batch_size=2)
+    results = await asyncio.gather(*(client.predict(text) for text in texts))
+    assert results == [prediction(text) for text in texts]
+
+    # A full batch is sent right away, the rest after the delay
+    assert session.requests == [("batch", {"texts": ["a", "b"]}), ("batch", {"texts": ["c"]})]
+
+
+@pytest.mark.asyncio
+async def test_batch_mismatch():
+    session = Session(Response(200, [prediction("a"), None]), Response(200, [prediction("a")]))
+    client = PredictionClient(session, "url", "key", batch_url="batch")
+    results = await asyncio.gather(client.predict("a"), client.predict("b"), return_exceptions=True)
+    assert results[0] == prediction("a")
+    assert isinstance(results[1], ValueError)
+
+    # Fewer predictions than texts fails the whole batch
+    results = await asyncio.gather(client.predict("a"), client.predict("b"), return_exceptions=True)
+    assert all(isinstance(res, ValueError) for res in results)
+
+
+@pytest.mark.asyncio
+async def test_retry():
+    session = Session(Response(503), Response(429), Response(200, prediction("hi")))
+    client = PredictionClient(session, "url", "key", retries=2, backoff=0)
+    assert await client.predict("hi") == prediction("hi")
+    assert len(session.requests) == 3
+
+
+@pytest.mark.asyncio
+async def test_retry_exhausted():
+    session = Session(Response(503), Response(503))
+    client = PredictionClient(session, "url", "key", retries=1, backoff=0)
+    with pytest.raises(ValueError):
+        await client.predict("hi")
+    assert len(session.requests) == 2
+
+
+@pytest.mark.asyncio
+async def test_no_retry():
+    session = Session(Response(401))
+    client = PredictionClient(session, "url", "key", backoff=0)
+    with pytest.raises(ValueError):
+        await client.predict("hi")
+    assert len(session.requests) == 1
+
+
+@pytest.mark.asyncio
+async def test_close():
+    client = PredictionClient(Session(), "url", "key", batch_url="batch", batch_delay=10)
+    pending = asyncio.ensure_future(client.predict("hi"))
+    await asyncio.sleep(0)
+    client.close()
+    with pytest.raises(ValueError):
+        await pending
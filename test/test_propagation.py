@@ -0,0 +1,128 @@
+#!/usr/bin/env python
+# Copyright (C) 2020 - 2023  UserbotIndo Team, <https://github.com/userbotindo.git>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import asyncio
+import logging
+from time import monotonic
+
+import pytest
+from pymongo.errors import PyMongoError
+
+from anjani.util.propagation import BanPropagator, TokenBucket
+
+
+class Client:
+    def __init__(self):
+        self.banned = []
+
+    async def ban_chat_member(self, chat, target):
+        if chat == -2:
+            raise ValueError("Peer id invalid")
+
+        self.banned.append(chat)
+
+
+class Collection:
+    def __init__(self, fail=0):
+        self.fail = fail
+        self.updates = []
+        self.deleted = []
+
+    async def insert_one(self, job):
+        pass
+
+    async def update_one(self, query, update):
+        if self.fail:
+            self.fail -= 1
+            raise PyMongoError("Connection reset")
+
+        self.updates.append(update)
+
+    async def delete_one(self, query):
+        self.deleted.append(query["_id"])
+
+
+@pytest.mark.asyncio
+async def test_acquire_rate():
+    bucket = TokenBucket(50, capacity=1)
+    start = monotonic()
+    for _ in range(5):
+        await bucket.acquire()
+
+    # The first token is there already, the others come at the rate
+    assert 0.07 < monotonic() - start < 0.5
+
+
+def test_flood_backoff():
+    bucket = TokenBucket(20, min_rate=4)
+    bucket.flood(1)
+    assert bucket.rate == 10
+    assert bucket._tokens <= -10
+
+    bucket.flood(1)
+    bucket.flood(1)
+    assert bucket.rate == 4
+
+    for _ in range(100):
+        bucket.success()
+    assert bucket.rate == 20
+
+
+@pytest.mark.asyncio
+async def test_failed_chats():
+    client, db = Client(), Collection(fail=1)
+    propagator = BanPropagator(client, db, logging.getLogger("test"), report_interval=0.01)
+    job_id = await propagator.submit("ban", "fed", 1, [-1, -2, -3])
+    await asyncio.wait_for(asyncio.gather(*propagator._tasks.values()), 1)
+
+    assert sorted(client.banned) == [-3, -1]
+    assert db.deleted == [job_id]
+    # The failed checkpoint is written with the next one
+    assert sorted(db.updates[0]["$pull"]["chats"]["$in"]) == [-3, -2, -1]
+    assert "ValueError" in db.updates[0]["$set"]["failed.-2"]
+
+
+class OrderedClient:
+    def __init__(self):
+        self.calls = []
+        self.release = asyncio.Event()
+
+    async def ban_chat_member(self, chat, target):
+        await self.release.wait()
+        self.calls.append(("ban", chat, target))
+
+    async def unban_chat_member(self, chat, target):
+        self.calls.append(("unban", chat, target))
+
+
+@pytest.mark.asyncio
+async def test_same_target_in_order():
+    client = OrderedClient()
+    propagator = BanPropagator(client, Collection(), logging.getLogger("test"))
+    chats = [-1, -2, -3]
+    await propagator.submit("ban", "fed", 1, chats)
+    await propagator.submit("unban", "fed", 1, chats)
+    await propagator.submit("unban", "fed", 2, [-1])
+    await asyncio.sleep(0.01)
+
+    # Another target doesn't wait
+    assert client.calls == [("unban", -1, 2)]
+
+    client.release.set()
+    await asyncio.wait_for(asyncio.gather(*propagator._tasks.values()), 1)
+    actions = [action for action, _, target in client.calls if target == 1]
+    assert actions == ["ban"] * len(chats) + ["unban"] * len(chats)
+    assert not propagator._tails
@@ -0,0 +1,47 @@
+#!/usr/bin/env python
+# Copyright (C) 2020 - 2023  UserbotIndo Team, <https://github.com/userbotindo.git>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import unicodedata as ud
+
+from anjani.util.script import detect_scripts, is_rtl
+
+
+def reference(text):
+    """The per character unicodedata implementation the table replaced"""
+    return {ud.name(char).split(" ")[0].lower() for char in text if char.isalpha()}
+
+
+def test_detect_scripts():
+    text = "Hello мир 你好 שלום مرحبا 123 !?"
+    assert detect_scripts(text) == reference(text)
+    assert detect_scripts("") == set()
+    assert detect_scripts("1234 ,.!") == set()
+
+
+def test_is_rtl():
+    assert is_rtl("hello שלום")
+    assert is_rtl("مرحبا")
+    assert is_rtl("ﭐ")  # Arabic presentation form
+    assert not is_rtl("Hello World")
+    assert not is_rtl("٠١")  # Arabic-Indic digits aren't letters
+    assert not is_rtl("ܐܒ")  # Syriac shares the block range
+
+
+def test_is_rtl_matches_reference():
+    for codepoint in range(0x0590, 0x0900):
+        char = chr(codepoint)
+        if char.isalpha() and ud.name(char, ""):
+            assert is_rtl(char) == bool(reference(char) & {"arabic", "hebrew"})
@@ -0,0 +1,120 @@
+#!/usr/bin/env python
+# Copyright (C) 2020 - 2023  UserbotIndo Team, <https://github.com/userbotindo.git>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import asyncio
+
+import pytest
+from pymongo.errors import OperationFailure
+
+from anjani.util.db import SettingsCache
+from anjani.util.db.stream_cache import CHANGE_STREAM_UNSUPPORTED
+
+
+class ChangeStream:
+    def __init__(self, collection):
+        self.collection = collection
+
+    async def __aenter__(self):
+        if self.collection.error:
+            raise self.collection.error
+
+        return self
+
+    async def __aexit__(self, *_):
+        pass
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        return await self.collection.changes.get()
+
+
+class Collection:
+    name = "TEST"
+
+    def __init__(self, docs, error=None):
+        self.docs = docs
+        self.error = error
+        self.reads = 0
+        self.changes = asyncio.Queue()
+
+    async def find_one(self, query):
+        self.reads += 1
+        return next((doc for doc in self.docs if doc["chat_id"] == query["chat_id"]), None)
+
+    def watch(self, **_):
+        return ChangeStream(self)
+
+
+async def started(cache):
+    cache.start()
+    for _ in range(10):
+        await asyncio.sleep(0)
+
+
+@pytest.mark.asyncio
+async def test_hit():
+    collection = Collection([{"_id": 1, "chat_id": -100}])
+    cache = SettingsCache(collection)
+    await started(cache)
+    assert cache.ready
+
+    assert await cache.get(-100) == {"_id": 1, "chat_id": -100}
+    assert await cache.get(-100) == {"_id": 1, "chat_id": -100}
+    assert await cache.get(-200) is None
+    assert await cache.get(-200) is None
+    assert collection.reads == 2
+    assert len(cache) == 2
+    cache.stop()
+    assert not cache.ready and len(cache) == 0
+
+
+@pytest.mark.asyncio
+async def test_invalidate():
+    collection = Collection([{"_id": 1, "chat_id": -100}])
+    cache = SettingsCache(collection)
+    await started(cache)
+
+    await cache.get(-100)
+    cache.invalidate(-100)
+    assert -100 not in cache
+    await cache.get(-100)
+    assert collection.reads == 2
+
+    # Written by another process
+    collection.docs[0] = {"_id": 1, "chat_id": -100, "locked": True}
+    await collection.changes.put({"documentKey": {"_id": 1}, "fullDocument": collection.docs[0]})
+    await asyncio.sleep(0)
+    assert -100 not in cache
+    assert await cache.get(-100) == collection.docs[0]
+    cache.stop()
+
+
+@pytest.mark.asyncio
+async def test_stream_unsupported():
+    error = OperationFailure("not a replica set", CHANGE_STREAM_UNSUPPORTED)
+    collection = Collection([{"_id": 1, "chat_id": -100}], error)
+    cache = SettingsCache(collection)
+    await started(cache)
+    assert not cache.ready
+
+    # Reads go through to the database without caching
+    assert await cache.get(-100) == {"_id": 1, "chat_id": -100}
+    assert await cache.get(-100) == {"_id": 1, "chat_id": -100}
+    assert collection.reads == 2
+    assert len(cache) == 0
+    assert cache._stream is not None and cache._stream.done()
@@ -0,0 +1,90 @@
+#!/usr/bin/env python
+# Copyright (C) 2020 - 2023  UserbotIndo Team, <https://github.com/userbotindo.git>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import asyncio
+
+import pytest
+
+from anjani.util.spam_classifier import (
+    BatchPredictor,
+    SpamClassifier,
+    get_label,
+    is_available,
+)
+
+pytestmark = pytest.mark.skipif(not is_available(), reason="numpy is not installed")
+
+SPAM = [
+    "Earn $500 a day from home, message me now",
+    "Free crypto giveaway, send 1 BTC and get 2 back",
+    "Join my channel for free signals and earn daily profit",
+    "Investment opportunity, double your money in a week",
+]
+HAM = [
+    "Does anyone know how to set up the welcome message?",
+    "Thanks for the help, it works now",
+    "The meeting is moved to tomorrow morning",
+    "I think the bot needs admin rights to delete messages",
+]
+
+
+def test_get_label():
+    assert get_label({"spam": [1, 2], "ham": [3]}) == 1
+    assert get_label({"spam": [1], "ham": [2, 3]}) == 0
+    assert get_label({"spam": 1, "ham": 0}) == 1
+    assert get_label({"spam": [], "ham": []}) is None
+    assert get_label({}) is None
+
+
+def test_vectorize():
+    model = SpamClassifier(2**10)
+    vector = model.vectorize("Hello World hello")
+    assert (vector == model.vectorize("hello  world HELLO")).all()
+    assert (vector[1:] > vector[:-1]).all()
+    assert vector.min() >= 0 and vector.max() < 2**10
+    assert len(model.vectorize("")) == 0
+    assert "b:hello world" in model.tokenize("Hello World")
+
+    with pytest.raises(ValueError):
+        SpamClassifier(1000)
+
+
+def test_fit_predict():
+    model = SpamClassifier(2**16).fit(SPAM + HAM, [1] * len(SPAM) + [0] * len(HAM), epochs=20)
+    proba = model.predict(SPAM + HAM)
+    assert (proba[: len(SPAM)] > 0.5).all()
+    assert (proba[len(SPAM) :] < 0.5).all()
+    assert model.predict(["Earn free crypto daily"])[0] > model.predict(["Thanks, it works"])[0]
+    assert len(model.predict([])) == 0
+
+
+def test_save_load(tmp_path):
+    model = SpamClassifier(2**12).fit(SPAM + HAM, [1] * len(SPAM) + [0] * len(HAM))
+    path = str(tmp_path / "model.npz")
+    model.save(path)
+
+    loaded = SpamClassifier.load(path)
+    assert loaded.n_features == model.n_features
+    assert loaded.bias == model.bias
+    assert (loaded.predict(SPAM + HAM) == model.predict(SPAM + HAM)).all()
+
+
+@pytest.mark.asyncio
+async def test_batch_predictor():
+    model = SpamClassifier(2**12).fit(SPAM + HAM, [1] * len(SPAM) + [0] * len(HAM))
+    predictor = BatchPredictor(model, max_size=3)
+    scores = await asyncio.gather(*(predictor.predict(text) for text in SPAM + HAM))
+    assert scores == pytest.approx(list(model.predict(SPAM + HAM)), rel=1e-6)
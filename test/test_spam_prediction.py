@@ -0,0 +1,132 @@
+#!/usr/bin/env python
+# Copyright (C) 2020 - 2023  UserbotIndo Team, <https://github.com/userbotindo.git>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+from pyrogram.errors import FloodWait, MessageTooLong
+
+from anjani import util  # noqa: F401  # skipcq: PY-W2000
+from anjani.internal_plugins.spam_prediction import SpamPrediction
+
+
+class Collection:
+    def __init__(self):
+        self.docs = {}
+
+    async def find_one(self, query, projection):
+        return self.docs.get(query["_id"])
+
+    async def insert_one(self, doc):
+        self.docs[doc["_id"]] = doc
+
+
+class Client:
+    def __init__(self):
+        self.errors = []
+        self.sent = []
+
+    async def send_message(self, chat_id, text, **_):
+        if self.errors:
+            raise self.errors.pop(0)
+
+        self.sent.append(text)
+        return SimpleNamespace(id=len(self.sent))
+
+
+async def build_notice(self, message, text, proba_str, identifier, content_hash):
+    return f"notice {content_hash}", []
+
+
+@pytest.fixture
+def make_plugin(monkeypatch):
+    monkeypatch.setattr(SpamPrediction, "_build_notice", build_notice)
+    monkeypatch.setattr(SpamPrediction, "_SpamPrediction__notice_interval", 0)
+
+    def make():
+        plugin = SpamPrediction(SimpleNamespace(loop=asyncio.get_running_loop(), client=Client()))
+        plugin.db = Collection()
+        plugin._notices = {}
+        plugin._outbox = asyncio.Queue(2)
+        return plugin
+
+    return make
+
+
+def get_notice(plugin, content_hash):
+    return plugin._get_notice(None, "text", 0.9, "user", content_hash)
+
+
+@pytest.mark.asyncio
+async def test_notice(make_plugin):
+    plugin = make_plugin()
+    sender = asyncio.ensure_future(plugin._send_notices())
+    notice = get_notice(plugin, "a")
+    assert get_notice(plugin, "a") is notice
+    assert await notice == 1
+    assert plugin.bot.client.sent == ["notice a"]
+    assert plugin.db.docs["a"]["msg_id"] == 1
+    assert plugin._notices == {}
+
+    # Already logged, no new notice
+    assert await get_notice(plugin, "a") == 1
+    assert plugin.bot.client.sent == ["notice a"]
+    sender.cancel()
+
+
+@pytest.mark.asyncio
+async def test_notice_failure(make_plugin):
+    plugin = make_plugin()
+    plugin.bot.client.errors = [FloodWait(value=0), MessageTooLong()]
+    sender = asyncio.ensure_future(plugin._send_notices())
+
+    # Waits the flood out, then the failure doesn't stop the sender
+    first, second = get_notice(plugin, "a"), get_notice(plugin, "b")
+    assert await first is None
+    assert await second == 1
+    assert plugin.bot.client.sent == ["notice b"]
+    assert "a" not in plugin.db.docs
+    sender.cancel()
+
+
+@pytest.mark.asyncio
+async def test_notice_queue_full(make_plugin):
+    plugin = make_plugin()
+    notices = [get_notice(plugin, content_hash) for content_hash in "abc"]
+    await asyncio.sleep(0)
+    assert notices[2].done() and notices[2].result() is None
+
+    sender = asyncio.ensure_future(plugin._send_notices())
+    assert await asyncio.gather(*notices[:2]) == [1, 2]
+    sender.cancel()
+
+
+@pytest.mark.asyncio
+async def test_notice_cancelled(make_plugin):
+    plugin = make_plugin()
+    notice = get_notice(plugin, "a")
+    await asyncio.sleep(0)
+    notice.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await notice
+    assert plugin._notices == {}
+
+    # Cancelled while queued, it's skipped
+    sender = asyncio.ensure_future(plugin._send_notices())
+    assert await get_notice(plugin, "b") == 1
+    assert plugin.bot.client.sent == ["notice b"]
+    sender.cancel()
@@ -0,0 +1,64 @@
+#!/usr/bin/env python
+# Copyright (C) 2020 - 2023  UserbotIndo Team, <https://github.com/userbotindo.git>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+from types import SimpleNamespace
+
+import pytest
+from pymongo.errors import AutoReconnect
+
+from anjani import util
+from anjani.plugins.spam_shield import SpamShield
+
+
+class Users:
+    def __init__(self):
+        self.fail = True
+        self.updated = []
+
+    async def update_one(self, query, update):
+        if self.fail:
+            raise AutoReconnect()
+
+        self.updated.append(query["_id"])
+
+
+@pytest.mark.asyncio
+async def test_low_trust(monkeypatch):
+    async def fetch_permissions(*_):
+        return None, None
+
+    async def is_active(_):
+        return True
+
+    monkeypatch.setattr(util.tg, "fetch_permissions", fetch_permissions)
+    predict = SimpleNamespace(low_trust={1: 2.0})
+    shield = SpamShield(SimpleNamespace(plugins={"SpamPredict": predict}, client=None))
+    shield.spam_protection = True
+    shield.user_db = Users()
+    shield.is_active = is_active
+    message = SimpleNamespace(
+        chat=SimpleNamespace(id=-100), from_user=SimpleNamespace(id=1), text="hi"
+    )
+
+    # Kept for the next message when the flag isn't written
+    with pytest.raises(AutoReconnect):
+        await shield.on_message(message)
+    assert predict.low_trust == {1: 2.0}
+
+    shield.user_db.fail = False
+    await shield.on_message(message)
+    assert shield.user_db.updated == [1]
+    assert predict.low_trust == {}
@@ -0,0 +1,107 @@
+#!/usr/bin/env python
+# Copyright (C) 2020 - 2023  UserbotIndo Team, <https://github.com/userbotindo.git>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+from pymongo.errors import AutoReconnect
+
+from anjani import util  # noqa: F401  # skipcq: PY-W2000
+from anjani.plugins.stats import PluginStats
+
+
+class Collection:
+    def __init__(self):
+        self.doc = {}
+        self.down = False
+        self.updates = 0
+        self.release = None
+
+    async def find_one(self, query):
+        return dict(self.doc)
+
+    async def update_one(self, query, update, upsert=False):
+        if self.down:
+            raise AutoReconnect()
+
+        self.updates += 1
+        for key, value in update.get("$inc", {}).items():
+            self.doc[key] = self.doc.get(key, 0) + value
+        # Written, but not acknowledged yet
+        if self.release is not None:
+            await self.release.wait()
+
+    async def delete_many(self, query):
+        self.doc.clear()
+
+
+async def stats_plugin():
+    db = Collection()
+    bot = SimpleNamespace(db=SimpleNamespace(get_collection=lambda _: db), start_time_us=0)
+    stats = PluginStats(bot)
+    await stats.on_load()
+    return stats
+
+
+@pytest.mark.asyncio
+async def test_flush():
+    stats = await stats_plugin()
+    for _ in range(3):
+        await stats.on_stat_listen("received", 1)
+    await stats.on_stat_listen("processed", 2)
+    assert stats.db.updates == 0
+    assert await stats.get("received") == 3
+
+    await stats.flush()
+    assert stats.db.updates == 1
+    assert stats.db.doc == {"received": 3, "processed": 2}
+    assert await stats.get("received") == 3
+
+    # Nothing to write
+    await stats.flush()
+    assert stats.db.updates == 1
+
+
+@pytest.mark.asyncio
+async def test_flush_failure():
+    stats = await stats_plugin()
+    await stats.on_stat_listen("received", 1)
+
+    # Kept for the next flush along with the new ones
+    stats.db.down = True
+    await stats.flush()
+    await stats.on_stat_listen("received", 1)
+    stats.db.down = False
+    await stats.flush()
+    assert stats.db.doc == {"received": 2}
+
+
+@pytest.mark.asyncio
+async def test_get_while_flushing():
+    stats = await stats_plugin()
+    await stats.on_stat_listen("received", 2)
+    stats.db.release = asyncio.Event()
+    flush = asyncio.ensure_future(stats.flush())
+    await asyncio.sleep(0)
+
+    # Neither missed nor counted twice while the write is in flight
+    get = asyncio.ensure_future(stats.get("received"))
+    await asyncio.sleep(0)
+    await stats.on_stat_listen("received", 1)
+    stats.db.release.set()
+    await flush
+    assert await get == 3
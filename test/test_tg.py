@@ -14,9 +14,50 @@
 # You should have received a copy of the GNU General Public License
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
+from types import SimpleNamespace
+
+import pytest
+from pyrogram.enums import ChatMemberStatus
+from pyrogram.errors import ChannelPrivate, FloodWait, UserNotParticipant
 from pyrogram.types import InlineKeyboardButton, InlineKeyboardMarkup
 
-from anjani.util.tg import build_button, parse_button, revert_button, truncate
+from anjani.util import member_cache
+from anjani.util.member_cache import ChatMemberCache
+from anjani.util.tg import (
+    ADMINS,
+    MEMBERS,
+    build_button,
+    get_admin_ids,
+    is_admin,
+    parse_button,
+    revert_button,
+    truncate,
+)
+
+
+class Client:
+    def __init__(self, error=None):
+        self.error = error
+        self.calls = 0
+
+    async def get_chat_members(self, chat, filter=None):
+        self.calls += 1
+        if self.error:
+            raise self.error
+
+        for user_id, is_bot in ((1, False), (2, True)):
+            yield SimpleNamespace(
+                status=ChatMemberStatus.ADMINISTRATOR,
+                user=SimpleNamespace(id=user_id, is_bot=is_bot),
+            )
+
+    async def get_chat_member(self, chat, user):
+        self.calls += 1
+        if user == 3:
+            raise UserNotParticipant()
+
+        status = ChatMemberStatus.ADMINISTRATOR if user == 1 else ChatMemberStatus.MEMBER
+        return SimpleNamespace(status=status, user=SimpleNamespace(id=user, is_bot=False))
 
 
 def test_truncate():
@@ -89,3 +130,67 @@ def test_build_button():
         ]
     )
     assert build_button(button) == expected
+
+
+@pytest.mark.asyncio
+async def test_get_admin_ids():
+    ADMINS.invalidate()
+    client = Client()
+    assert await get_admin_ids(client, -100) == {1, 2}
+    assert await get_admin_ids(client, -100, exclude_bot=True) == {1}
+    assert await is_admin(client, -100, 1)
+    assert not await is_admin(client, -100, 4)
+    assert client.calls == 1
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("error", [ChannelPrivate(), FloodWait(value=60)])
+async def test_get_admin_ids_failed(error):
+    ADMINS.invalidate()
+    client = Client(error)
+    assert await get_admin_ids(client, -100) is None
+    assert await get_admin_ids(client, -100) is None
+    assert client.calls == 1
+
+    # Admins are still told apart, one by one
+    MEMBERS.invalidate(-100)
+    assert await is_admin(client, -100, 1)
+    assert not await is_admin(client, -100, 2)
+    assert not await is_admin(client, -100, 3)
+    assert client.calls == 4
+
+    # Fetched again once the failure is forgotten
+    client.error = None
+    ADMINS.invalidate(-100)
+    assert await get_admin_ids(client, -100) == {1, 2}
+
+
+def test_member_cache_bot_kept_apart(monkeypatch):
+    now = [0.0]
+    monkeypatch.setattr(member_cache, "monotonic", lambda: now[0])
+    cache = ChatMemberCache(ttl=60, bot_ttl=600, max_size=2)
+    cache.bot_id = 9
+    cache.put(-100, 9, "bot")
+    for user_id in range(5):
+        cache.put(-100, user_id, user_id)
+
+    # Other members never evict the bot
+    assert cache.get(-100, 9) == "bot"
+    assert cache.get(-100, 0) is None
+    assert cache.get(-100, 4) == 4
+    assert len(cache) == 3
+
+    # Expired members give up their slots to the next one
+    now[0] = 61
+    cache.put(-200, 1, 1)
+    assert len(cache) == 2
+    assert cache.get(-100, 9) == "bot"
+
+    now[0] = 700
+    assert cache.get(-100, 9) is None
+
+    cache.put(-100, 9, "bot")
+    cache.put(-200, 1, 1)
+    cache.invalidate(-100)
+    assert cache.get(-100, 9) is None
+    assert cache.get(-200, 1) == 1
@@ -0,0 +1,178 @@
+#!/usr/bin/env python
+# Copyright (C) 2020 - 2023  UserbotIndo Team, <https://github.com/userbotindo.git>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import asyncio
+
+import pytest
+from pyrogram.enums import ChatType
+from pyrogram.types import Chat, Message
+
+from anjani.core.update_scheduler import UpdateScheduler
+from anjani.internal_plugins.spam_prediction import SpamPrediction
+from anjani.plugins.federation import Federation
+from anjani.plugins.lockings import Lockings
+from anjani.plugins.spam_shield import SpamShield
+
+
+def message(chat_id, text):
+    return Message(id=0, chat=Chat(id=chat_id, type=ChatType.SUPERGROUP), text=text)
+
+
+def queued(scheduler, chat_id):
+    return [event.text for _, event in scheduler._queues[chat_id]]
+
+
+class Dispatcher:
+    def __init__(self):
+        self.calls = []
+
+    async def __call__(self, name, event, **kwargs):
+        self.calls.append((event.chat.id, event.text, kwargs.get("max_priority")))
+
+
+class BlockingDispatcher:
+    def __init__(self):
+        self.running = []
+        self.release = asyncio.Event()
+
+    async def __call__(self, name, event, **kwargs):
+        self.running.append(event.text)
+        await self.release.wait()
+        self.running.remove(event.text)
+
+
+async def drain(scheduler):
+    while len(scheduler) or scheduler._scheduled:
+        await asyncio.sleep(0)
+    await scheduler.stop()
+
+
+@pytest.mark.asyncio
+async def test_overflow_drop():
+    scheduler = UpdateScheduler(Dispatcher(), workers=0, queue_size=3, policy="drop")
+    scheduler.start()
+    for text in ("a", "/b", "c", "/d"):
+        scheduler.put("message", message(-100, text))
+    # The oldest plain message makes room
+    assert queued(scheduler, -100) == ["/b", "c", "/d"]
+
+    scheduler.put("message", message(-100, "/e"))
+    scheduler.put("message", message(-100, "f"))
+    assert queued(scheduler, -100) == ["/b", "/d", "/e"]
+
+    # Nothing but commands, the oldest one goes
+    scheduler.put("message", message(-100, "/g"))
+    assert queued(scheduler, -100) == ["/d", "/e", "/g"]
+    assert len(scheduler) == 3
+    await scheduler.stop()
+
+
+@pytest.mark.asyncio
+async def test_overflow_shed():
+    dispatch = Dispatcher()
+    scheduler = UpdateScheduler(dispatch, workers=1, queue_size=2, shed_priority=70)
+    scheduler.start()
+    for text in "abcde":
+        scheduler.put("message", message(-100, text))
+    assert len(scheduler) == 5
+
+    # Every message still reaches the listeners under the shed priority
+    await drain(scheduler)
+    assert dispatch.calls == [
+        (-100, "a", 70),
+        (-100, "b", 70),
+        (-100, "c", 70),
+        (-100, "d", 70),
+        (-100, "e", None),
+    ]
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("policy", ["drop", "shed"])
+async def test_shed(policy):
+    dispatch = Dispatcher()
+    scheduler = UpdateScheduler(dispatch, workers=1, queue_size=4, policy=policy, shed_priority=70)
+    scheduler.start()
+    for text in "abcd":
+        scheduler.put("message", message(-100, text))
+    await drain(scheduler)
+
+    shed = 70 if policy == "shed" else None
+    assert dispatch.calls == [
+        (-100, "a", shed),
+        (-100, "b", shed),
+        (-100, "c", None),
+        (-100, "d", None),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_round_robin():
+    dispatch = Dispatcher()
+    scheduler = UpdateScheduler(dispatch, workers=1)
+    scheduler.start()
+    for text in "abc":
+        scheduler.put("message", message(-100, text))
+    scheduler.put("message", message(-200, "/start"))
+    await drain(scheduler)
+
+    assert [(chat, text) for chat, text, _ in dispatch.calls] == [
+        (-100, "a"),
+        (-200, "/start"),
+        (-100, "b"),
+        (-100, "c"),
+    ]
+
+
+def test_enforcement_not_shed():
+    shed_priority = UpdateScheduler(Dispatcher(), workers=0).shed_priority
+    for func in (
+        Federation.on_chat_action,
+        Federation.on_message,
+        SpamShield.on_chat_action,
+        SpamShield.on_message,
+        SpamPrediction.on_message,
+        Lockings.on_message,
+    ):
+        assert getattr(func, "_listener_priority", 100) < shed_priority
+
+
+async def step(dispatch):
+    dispatch.release.set()
+    dispatch.release = asyncio.Event()
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+    return sorted(dispatch.running)
+
+
+@pytest.mark.asyncio
+async def test_chat_concurrency():
+    dispatch = BlockingDispatcher()
+    scheduler = UpdateScheduler(dispatch, workers=4, chat_concurrency=2)
+    scheduler.start()
+    for text in ("a", "b", "c", "/d", "e"):
+        scheduler.put("message", message(-100, text))
+    scheduler.put("message", message(-200, "f"))
+    await asyncio.sleep(0)
+    assert sorted(dispatch.running) == ["a", "b", "f"]
+
+    # Commands wait for the messages before them and run alone
+    assert await step(dispatch) == ["c"]
+    assert await step(dispatch) == ["/d"]
+    assert await step(dispatch) == ["e"]
+    dispatch.release.set()
+    await drain(scheduler)
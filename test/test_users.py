@@ -0,0 +1,108 @@
+#!/usr/bin/env python
+# Copyright (C) 2020 - 2023  UserbotIndo Team, <https://github.com/userbotindo.git>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+from pymongo.errors import PyMongoError
+
+from anjani import util  # noqa: F401  # skipcq: PY-W2000
+from anjani.plugins.users import Users
+
+
+class Collection:
+    def __init__(self, name, fail=0):
+        self.name = name
+        self.fail = fail
+        self.writes = []
+
+    def find(self, *_, **__):
+        return util.db.native.AsyncNativeCursor(Cursor(), self)
+
+    async def bulk_write(self, ops, ordered):
+        await asyncio.sleep(0)
+        if self.fail:
+            self.fail -= 1
+            raise PyMongoError("Connection reset")
+
+        self.writes.append(ops)
+
+
+class Cursor:
+    async def next(self):
+        raise StopAsyncIteration
+
+
+async def users_plugin(fail=0):
+    bot = SimpleNamespace(
+        db=SimpleNamespace(get_collection=lambda name: Collection(name, fail)),
+        plugins={"SpamPredict": None},
+        user=SimpleNamespace(username="bot"),
+    )
+    plugin = Users(bot)
+    await plugin.on_load()
+    return plugin
+
+
+@pytest.mark.asyncio
+async def test_flush():
+    plugin = await users_plugin()
+    plugin.queue_forwarded_user(SimpleNamespace(id=1, username="foo", usernames=None))
+    await plugin.flush()
+
+    assert not plugin._pending_users
+    assert plugin._hashed_users == {1}
+    (op,) = plugin.users_db.writes[0]
+    assert op._doc["$set"]["hash"] == plugin.hash_id(1)
+    assert op._doc["$setOnInsert"] == {"chats": []}
+
+
+@pytest.mark.asyncio
+async def test_flush_failed():
+    plugin = await users_plugin(fail=1)
+    plugin.queue_forwarded_user(SimpleNamespace(id=1, username="old", usernames=None))
+    flush = asyncio.ensure_future(plugin.flush())
+    await asyncio.sleep(0)
+    # Queued while the batch is being written
+    plugin.queue_forwarded_user(SimpleNamespace(id=1, username="new", usernames=None))
+    plugin._queue_user(1).add_to_set.add(-100)
+    await flush
+
+    assert not plugin._hashed_users
+    assert not plugin.users_db.writes
+    await plugin.flush()
+    assert plugin._hashed_users == {1}
+    (op,) = plugin.users_db.writes[0]
+    assert op._doc["$set"]["username"] == "new"
+    assert op._doc["$set"]["hash"] == plugin.hash_id(1)
+    assert op._doc["$addToSet"] == {"chats": {"$each": [-100]}}
+
+
+@pytest.mark.asyncio
+async def test_stop_while_flushing(monkeypatch):
+    monkeypatch.setattr(Users, "_Users__flush_interval", 0.01)
+    plugin = await users_plugin()
+    plugin.bot.loop = asyncio.get_running_loop()
+    plugin.queue_forwarded_user(SimpleNamespace(id=1, username="foo", usernames=None))
+    await plugin.on_start(0)
+    while not plugin._flush_lock.locked():
+        await asyncio.sleep(0)
+
+    # The batch being written when stopping still lands
+    await plugin.on_stop()
+    assert len(plugin.users_db.writes) == 1
+    assert plugin._flush_task.done()
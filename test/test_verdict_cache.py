@@ -0,0 +1,145 @@
+#!/usr/bin/env python
+# Copyright (C) 2020 - 2023  UserbotIndo Team, <https://github.com/userbotindo.git>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import asyncio
+
+import pytest
+from pymongo.errors import AutoReconnect
+
+from anjani.util import verdict_cache
+from anjani.util.verdict_cache import VerdictCache
+
+
+class Collection:
+    def __init__(self):
+        self.docs = {}
+        self.down = False
+
+    async def find_one(self, query):
+        if self.down:
+            raise AutoReconnect()
+
+        doc = self.docs.get(query["_id"])
+        if doc is None or doc["expire"] <= query["expire"]["$gt"]:
+            return None
+
+        return doc
+
+    async def update_one(self, query, update, upsert=False):
+        if self.down:
+            raise AutoReconnect()
+
+        self.docs[query["_id"]] = update["$set"]
+
+
+class Fetcher:
+    def __init__(self, *results):
+        self.results = list(results)
+        self.calls = 0
+
+    async def __call__(self):
+        self.calls += 1
+        await asyncio.sleep(0)
+        result = self.results.pop(0)
+        if isinstance(result, Exception):
+            raise result
+
+        return result
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(verdict_cache, "monotonic", clock)
+    return clock
+
+
+@pytest.mark.asyncio
+async def test_single_flight(clock):
+    collection = Collection()
+    cache = VerdictCache(collection)
+    fetch = Fetcher(True)
+    results = await asyncio.gather(*(cache.get("cas", 1, fetch) for _ in range(5)))
+    assert results == [True] * 5
+    assert fetch.calls == 1
+    assert collection.docs["cas:1"]["verdict"] is True
+
+    # Another service is another key
+    assert await cache.get("sw", 1, Fetcher(False)) is False
+
+
+@pytest.mark.asyncio
+async def test_ttl(clock):
+    collection = Collection()
+    cache = VerdictCache(collection, positive_ttl=60, negative_ttl=10)
+    fetch = Fetcher(False, True)
+    assert await cache.get("cas", 1, fetch) is False
+
+    clock.now += 9
+    assert await cache.get("cas", 1, fetch) is False
+    assert fetch.calls == 1
+
+    # Expired locally, the stored copy is gone with the TTL index as well
+    clock.now += 2
+    collection.docs.clear()
+    assert await cache.get("cas", 1, fetch) is True
+    assert fetch.calls == 2
+
+    clock.now += 59
+    assert await cache.get("cas", 1, fetch) is True
+    assert fetch.calls == 2
+
+
+@pytest.mark.asyncio
+async def test_stored(clock):
+    collection = Collection()
+    await VerdictCache(collection).get("cas", 1, Fetcher(True))
+
+    # A fresh process reads the verdict back instead of fetching it
+    cache = VerdictCache(collection)
+    fetch = Fetcher()
+    assert await cache.get("cas", 1, fetch) is True
+    assert fetch.calls == 0
+
+
+@pytest.mark.asyncio
+async def test_failure(clock):
+    collection = Collection()
+    cache = VerdictCache(collection)
+    fetch = Fetcher(ValueError("down"), ValueError("down"), True)
+    results = await asyncio.gather(
+        cache.get("cas", 1, fetch, default=False), cache.get("cas", 1, fetch, default=False)
+    )
+    assert results == [False, False]
+    assert fetch.calls == 1
+    assert not collection.docs
+
+    # Not cached, the next lookup tries again
+    assert await cache.get("cas", 1, fetch) is None
+    assert await cache.get("cas", 1, fetch) is True
+
+    # The database being down doesn't fail the lookup
+    collection.down = True
+    cache.invalidate("cas", 1)
+    assert await cache.get("cas", 1, Fetcher(False)) is False